@@ -0,0 +1,87 @@
+"""
+Latency залежностi [auth_service.get_current_user] пiд 200 конкурентними клiєнтами:
+блокуючий клiєнт Redis (як redis.Redis) проти асинхронного (redis.asyncio на пулi).
+
+Redis iмiтується з фiксованою затримкою вiдповiдi, тож результат не залежить вiд мережi.
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_auth_cache
+python -m benchmarks.bench_auth_cache 200 0.002
+"""
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+from src.entity.models import User
+from src.services import user_snapshot
+from src.services.auth import auth_service
+from src.services.user_cache import TTLCache
+
+REQUESTS_PER_CLIENT = 10
+# кожен клiєнт надсилає запит раз на INTERVAL секунд; latency рахується вiд моменту "приходу" запиту,
+# тож час очiкування у черзi event loop теж потрапляє до вимiру
+INTERVAL = 0.05
+
+
+class AsyncLatencyCache:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.data = {}
+
+    async def get(self, key):
+        await asyncio.sleep(self.latency)
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        await asyncio.sleep(self.latency)
+        self.data[key] = value
+
+
+class BlockingLatencyCache(AsyncLatencyCache):
+    # синхронний клiєнт зупиняє весь event loop на час мережевого round trip
+    async def get(self, key):
+        time.sleep(self.latency)
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        time.sleep(self.latency)
+        self.data[key] = value
+
+
+async def client(token: str, latencies: list[float], started_at: float):
+    for i in range(REQUESTS_PER_CLIENT):
+        arrival = started_at + i * INTERVAL
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await auth_service.get_current_user(token, None)
+        latencies.append((time.perf_counter() - arrival) * 1000)
+
+
+async def run(cache: AsyncLatencyCache, clients: int) -> list[float]:
+    user = User(id=1, username="bench", email="bench@example.com", password="secret", confirmed=True)
+    cache.data[user.email] = user_snapshot.dumps(user)
+    token = await auth_service.create_access_token(data={"sub": user.email})
+    latencies = []
+    # локальний рiвень кешу вимкнено (maxsize=0), щоб кожен запит iшов до Redis
+    with patch.object(auth_service, "cache", cache), patch("src.services.auth.local_users", TTLCache(0, 0)), \
+            contextlib.redirect_stdout(io.StringIO()):
+        started_at = time.perf_counter()
+        await asyncio.gather(*[client(token, latencies, started_at + i * INTERVAL / clients) for i in range(clients)])
+    return sorted(latencies)
+
+
+def main(clients: int, latency: float):
+    print(f"{clients} clients x {REQUESTS_PER_CLIENT} requests every {INTERVAL * 1000:.0f} ms, "
+          f"Redis latency {latency * 1000:.1f} ms")
+    for name, cache in [("blocking", BlockingLatencyCache(latency)), ("async", AsyncLatencyCache(latency))]:
+        latencies = asyncio.run(run(cache, clients))
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{name:>8} | p50 {statistics.median(latencies):9.3f} ms | p99 {p99:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, float(sys.argv[2]) if len(sys.argv) > 2 else 0.001)
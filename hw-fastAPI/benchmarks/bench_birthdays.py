@@ -0,0 +1,76 @@
+"""
+Порiвняння запиту найближчих днiв народження: extract(month/day) проти iндексованого Contact.birthday_ordinal.
+
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_birthdays
+python -m benchmarks.bench_birthdays 100000
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import and_, func, insert, or_, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.entity.models import Base, Contact
+from src.repository import contacts as rep_contacts
+
+SHIFT_DAYS = 7
+REPEAT = 5
+
+
+def extract_statement(forward_shift_days: int):
+    # попередня реалiзацiя search_contact_by_birthdate - для порiвняння
+    current_date = datetime.now().date()
+    end_of_shift_date = current_date + timedelta(forward_shift_days)
+    return select(Contact).where(or_(
+        and_(func.extract("month", Contact.birth_date) == current_date.month,
+             func.extract("day", Contact.birth_date) >= current_date.day,),
+        and_(func.extract("month", Contact.birth_date) <= end_of_shift_date.month,
+             func.extract("day", Contact.birth_date) <= end_of_shift_date.day)))
+
+
+async def fill(session_maker, rows: int):
+    async with session_maker() as session:
+        for chunk in range(0, rows, 10_000):
+            await session.execute(insert(Contact), [
+                {"first_name": f"Name{i}", "last_name": f"Last{i}", "email": f"contact{i}@example.com",
+                 "phone_number": f"{i:010d}", "birth_date": date(1950, 1, 1) + timedelta(days=i % 20_000)}
+                for i in range(chunk, min(chunk + 10_000, rows))])
+        await session.commit()
+
+
+async def measure(session_maker, call) -> tuple[float, int]:
+    async with session_maker() as session:
+        started = time.perf_counter()
+        for _ in range(REPEAT):
+            found = await call(session)
+        return (time.perf_counter() - started) / REPEAT * 1000, len(found)
+
+
+async def main(rows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        await fill(session_maker, rows)
+
+        async def extract_call(session):
+            return (await session.execute(extract_statement(SHIFT_DAYS))).scalars().all()
+
+        async def ordinal_call(session):
+            return await rep_contacts.search_contact_by_birthdate(SHIFT_DAYS, session)
+
+        print(f"{rows} contacts, next {SHIFT_DAYS} days, mean of {REPEAT} calls")
+        for name, call in [("extract", extract_call), ("ordinal", ordinal_call)]:
+            elapsed, found = await measure(session_maker, call)
+            print(f"{name:>8} | {elapsed:9.3f} ms | {found} rows")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
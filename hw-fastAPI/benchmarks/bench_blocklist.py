@@ -0,0 +1,113 @@
+"""
+Накладнi витрати black list на кожен запит: попереднiй [BlackListMiddleware] (BaseHTTPMiddleware,
+ip_address + лiнiйний перебiр списку мереж) проти ASGI middleware з [IPBlocklist] (iнтервали + bisect).
+load - час компiляцiї списку з N мереж.
+
+Middleware викликається напряму з ASGI scope поверх застосунку, який одразу вiдповiдає 200;
+адреси клiєнтiв випадковi, заблоковано близько половини мереж IPv4 та IPv6 з N.
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_blocklist
+python -m benchmarks.bench_blocklist 3 1000 50000
+"""
+import asyncio
+import random
+import sys
+import time
+from ipaddress import IPv4Network, IPv6Network, ip_address
+
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from src.services.blocklist import IPBlocklist
+from src.services.middleware import BlackListMiddleware
+
+CLIENTS = 1000
+
+
+class LegacyBlackListMiddleware(BaseHTTPMiddleware):
+    # middleware до змiни, список мереж передається ззовнi
+    def __init__(self, app, networks: list):
+        super().__init__(app)
+        self.networks = networks
+
+    async def dispatch(self, request: Request, call_next):
+        client_ip = request.client.host
+        if client_ip == "testclient":
+            return await call_next(request)
+        for banned_ip in self.networks:
+            if ip_address(client_ip) in banned_ip:
+                return JSONResponse(status_code=403, content={"detail": "You are banned"})
+        response = await call_next(request)
+        return response
+
+
+async def app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"2")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def networks(count: int, rng: random.Random) -> list:
+    result = []
+    for i in range(count):
+        if i % 4:
+            result.append(IPv4Network((rng.getrandbits(32), 24), strict=False))
+        else:
+            result.append(IPv6Network((rng.getrandbits(128), 48), strict=False))
+    return result
+
+
+def receiver():
+    # як у сервера: тiло запиту, а пiсля вiдповiдi - disconnect, на який чекає BaseHTTPMiddleware
+    messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+    async def receive():
+        return next(messages, {"type": "http.disconnect"})
+
+    return receive
+
+
+async def send(message):
+    pass
+
+
+async def per_request(middleware, scopes: list, seconds: float) -> float:
+    calls, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        await middleware(scopes[calls % len(scopes)], receiver(), send)
+        calls += 1
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+async def run(sizes: list[int]):
+    rng = random.Random(42)
+    print(f"{'networks':>8} | {'baseline':>10} | {'legacy':>12} | {'asgi':>10} | load")
+    for size in sizes:
+        blocked = networks(size, rng)
+        # половина клiєнтiв з заблокованих мереж, половина - випадковi адреси
+        hosts = [str(blocked[i % size].network_address + 1) if i % 2 else str(ip_address(rng.getrandbits(32)))
+                 for i in range(CLIENTS)]
+        scopes = [{"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b"",
+                   "client": (host, 1234)} for host in hosts]
+        lines = [str(network) for network in blocked]
+        started = time.perf_counter()
+        blocklist = IPBlocklist(lines)
+        load = (time.perf_counter() - started) * 1000
+        legacy = LegacyBlackListMiddleware(app, blocked)
+        asgi = BlackListMiddleware(app, blocklist)
+        for host in hosts[:100]:
+            assert any(ip_address(host) in network for network in blocked) == (host in blocklist), host
+        seconds = 0.5
+        baseline = await per_request(app, scopes, seconds)
+        before = await per_request(legacy, scopes, seconds)
+        after = await per_request(asgi, scopes, seconds)
+        print(f"{size:8d} | {baseline:7.1f} us | {before - baseline:9.1f} us | {after - baseline:7.1f} us | "
+              f"{load:.0f} ms")
+
+
+def main(sizes: list[int]):
+    asyncio.run(run(sizes))
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [3, 1000, 50000])
@@ -0,0 +1,75 @@
+"""
+Пропускна здатнiсть iмпорту контактiв (рядкiв/с): по одному через [create_contact] проти потокового
+[import_contacts] з CSV та NDJSON (валiдацiя чанками + multi-row INSERT ... ON CONFLICT).
+
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_bulk_import
+python -m benchmarks.bench_bulk_import 200000
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.entity.models import Base, User
+from src.repository import contacts as rep_contacts
+from src.schemas.contact import ContactSchema
+from src.services.bulk_import import import_contacts
+
+# вставка по одному рядку на порядки повiльнiша, тож для неї береться менша вибiрка
+SINGLE_ROWS = 2_000
+NETWORK_CHUNK = 64 * 1024
+
+
+def record(i: int) -> dict:
+    return {"first_name": f"Name{i}", "last_name": f"Last{i}", "email": f"contact{i}@example.com",
+            "phone_number": f"{i:010d}", "birth_date": f"19{60 + i % 40}-{1 + i % 12:02d}-{1 + i % 28:02d}"}
+
+
+def body(fmt: str, rows: int) -> bytes:
+    if fmt == "ndjson":
+        return "".join(json.dumps(record(i)) + "\n" for i in range(rows)).encode()
+    lines = ["first_name,last_name,email,phone_number,birth_date"]
+    lines += [",".join(record(i).values()) for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def stream(data: bytes):
+    for start in range(0, len(data), NETWORK_CHUNK):
+        yield data[start:start + NETWORK_CHUNK]
+
+
+async def run(variant: str, rows: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            user = User(username="bench", email="bench@example.com", password="secret", confirmed=True)
+            session.add(user)
+            await session.commit()
+            data = body(variant, rows) if variant != "single" else None
+            started = time.perf_counter()
+            if variant == "single":
+                for i in range(rows):
+                    await rep_contacts.create_contact(ContactSchema.model_validate(record(i)), session, user)
+            else:
+                report = await import_contacts(stream(data), variant, session, user)
+                assert report["inserted"] == rows, report
+            elapsed = time.perf_counter() - started
+        await engine.dispose()
+    return rows / elapsed
+
+
+def main(rows: int):
+    for variant, count in [("single", min(rows, SINGLE_ROWS)), ("csv", rows), ("ndjson", rows)]:
+        print(f"{variant:>7} | {count:7d} rows | {asyncio.run(run(variant, count)):9.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,86 @@
+"""
+Пiкова пам'ять процесу (RSS) при повному експортi контактiв: потоковий [export_contacts]
+проти завантаження всiх рядкiв одним запитом (scalars().all() + ContactResponseSchema).
+
+Кожен замiр виконується в окремому процесi, тож пiк RSS не успадковується мiж варiантами.
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_export
+python -m benchmarks.bench_export 100000 1000000
+"""
+import asyncio
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.entity.models import Base, Contact, User
+from src.schemas.contact import ContactResponseSchema
+from src.services.export import export_contacts
+
+
+async def fill(path: Path, rows: int):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine)() as session:
+        session.add(User(username="bench", email="bench@example.com", password="secret", confirmed=True))
+        await session.commit()
+        start = datetime(2020, 1, 1)
+        for chunk in range(0, rows, 10_000):
+            await session.execute(insert(Contact), [
+                {"first_name": f"Name{i}", "last_name": f"Last{i}", "email": f"contact{i}@example.com",
+                 "phone_number": f"{i:010d}", "birth_date": date(1980, 1, 1) + timedelta(days=i % 10_000),
+                 "created_at": start, "updated_at": start, "user_id": 1}
+                for i in range(chunk, min(chunk + 10_000, rows))])
+        await session.commit()
+    await engine.dispose()
+
+
+async def measure(path: Path, variant: str) -> tuple[int, float]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    size = 0
+    async with async_sessionmaker(engine)() as session:
+        user = await session.get(User, 1)
+        started = time.perf_counter()
+        if variant == "stream":
+            async for chunk in export_contacts(session, user, "ndjson"):
+                size += len(chunk)
+        else:
+            contacts = (await session.execute(select(Contact).filter_by(user_id=user.id))).unique().scalars().all()
+            for contact in contacts:
+                size += len(ContactResponseSchema.model_validate(contact).model_dump_json()) + 1
+        elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return size, elapsed
+
+
+def child(path: str, variant: str):
+    size, elapsed = asyncio.run(measure(Path(path), variant))
+    # ru_maxrss на Linux - у кiлобайтах
+    print(size, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def main(sizes: list[int]):
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench.db"
+            asyncio.run(fill(path, rows))
+            for variant in ("stream", "all"):
+                output = subprocess.run([sys.executable, "-m", "benchmarks.bench_export", "--child", str(path),
+                                         variant], capture_output=True, text=True, check=True).stdout
+                size, elapsed, rss = output.split()
+                print(f"{rows:8d} rows | {variant:>6} | {float(elapsed):6.2f} s | {int(size) / 2 ** 20:7.1f} MiB out | "
+                      f"peak RSS {int(rss) / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
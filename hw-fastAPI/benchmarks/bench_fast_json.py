@@ -0,0 +1,104 @@
+"""
+Серiалiзацiя вiдповiдей спискових маршрутiв: як FastAPI робив це з response_model (валiдацiя кожного рядка
+ContactResponseSchema з from_attributes, разом з EmailStr, + jsonable_encoder + JSONResponse)
+проти [contacts_serializer] (поля схеми за назвами + orjson, одразу в байти).
+
+Для кожного маршруту рядки беруться з тiєї ж функцiї репозиторiю, що й у маршрутi, на SQLite з N контактiв;
+вимiрюється лише серiалiзацiя, байти вiдповiдi обох варiантiв однаковi.
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_fast_json
+python -m benchmarks.bench_fast_json 500 50
+"""
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from main import app
+from src.entity.models import Base, Contact, User
+from src.repository import contacts as rep_contacts
+from src.services import serializers
+from src.services.serializers import contacts_serializer
+
+
+def routes() -> dict[str, APIRoute]:
+    # GET та POST /api/contacts/ мають один шлях, тож беруться лише GET
+    return {route.path: route for route in app.routes if isinstance(route, APIRoute) and "GET" in route.methods}
+
+
+async def fill(session, rows: int) -> User:
+    user = User(username="bench", email="bench@example.com", password="secret", confirmed=True)
+    session.add(user)
+    await session.commit()
+    today = date.today()
+    await session.execute(insert(Contact), [
+        {"first_name": f"John{i}", "last_name": f"Doe{i}", "email": f"john{i}@example.com",
+         "phone_number": f"{i:010d}", "birth_date": date(1980, today.month, today.day) + timedelta(days=i % 7),
+         "user_id": user.id}
+        for i in range(rows)])
+    await session.commit()
+    return user
+
+
+async def fastapi_body(route: APIRoute, rows) -> bytes:
+    # шлях FastAPI для значення, яке маршрут повертав до змiни
+    content = await serialize_response(field=route.response_field, response_content=rows)
+    return JSONResponse(content).body
+
+
+def measure(fn, repeat: int) -> float:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return statistics.median(latencies)
+
+
+async def run(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            user = await fill(session, rows)
+            table = routes()
+            cases = [
+                ("/api/contacts/", await rep_contacts.get_contacts(rows, 0, session, user)),
+                ("/api/contacts/all", await rep_contacts.get_contacts_all(rows, 0, session)),
+                ("/api/search/by_firstname/{contact_first_name}",
+                 await rep_contacts.search_contact_by_firstname("John", session)),
+                ("/api/search/by_complex/{value}", await rep_contacts.search_contact_complex("example", session)),
+                ("/api/birthday/{shift_days}", await rep_contacts.search_contact_by_birthdate(7, session)),
+            ]
+        await engine.dispose()
+    print(f"{'route':<46} | rows | response_model |   fast json | orjson off | speedup")
+    for path, result in cases:
+        route = table[path]
+        assert await fastapi_body(route, result) == contacts_serializer.dump(result), path
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await fastapi_body(route, result)
+        before = (time.perf_counter() - started) / repeat * 1000
+        after = measure(lambda: contacts_serializer.dump(result), repeat)
+        orjson, serializers.orjson = serializers.orjson, None
+        fallback = measure(lambda: contacts_serializer.dump(result), repeat)
+        serializers.orjson = orjson
+        print(f"{path:<46} | {len(result):4d} | {before:11.2f} ms | {after:8.2f} ms | {fallback:7.2f} ms | "
+              f"{before / after:6.0f}x")
+
+
+def main(rows: int, repeat: int):
+    asyncio.run(run(rows, repeat))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500, int(sys.argv[2]) if len(sys.argv) > 2 else 30)
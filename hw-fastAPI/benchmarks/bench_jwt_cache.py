@@ -0,0 +1,44 @@
+"""
+Вартiсть залежностi [auth_service.get_current_user] з кешем перевiрених JWT i без нього.
+<user> вже лежить у локальному кешi, тож вимiрюється саме декодування та перевiрка токена.
+
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_jwt_cache
+"""
+import asyncio
+import contextlib
+import io
+import time
+from unittest.mock import patch
+
+from src.entity.models import Role, User
+from src.services.auth import auth_service
+from src.services.user_cache import TTLCache, local_users
+from src.services.user_snapshot import UserSnapshot
+
+NUMBER = 20_000
+
+
+async def measure(token: str) -> float:
+    started = time.perf_counter()
+    for _ in range(NUMBER):
+        await auth_service.get_current_user(token, None)
+    return (time.perf_counter() - started) / NUMBER * 1e6
+
+
+async def main():
+    user = User(id=1, username="bench", email="bench@example.com", role=Role.user, avatar=None, confirmed=True)
+    local_users.set(user.email, UserSnapshot.from_user(user), ttl=3600)
+    token = await auth_service.create_access_token(data={"sub": user.email})
+    print(f"mean of {NUMBER} calls")
+    with contextlib.redirect_stdout(io.StringIO()):
+        # maxsize=0 - кожен виклик заново викликає jwt.decode
+        with patch.object(auth_service, "verified_tokens", TTLCache(0, 0)):
+            without_cache = await measure(token)
+        with_cache = await measure(token)
+    print(f" without cache | {without_cache:7.2f} us")
+    print(f"    with cache | {with_cache:7.2f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Сторiнка GET /api/contacts з 500 контактiв (максимальний limit): сутностi [Contact] з JOIN users (lazy="joined")
+проти проекцiї колонок [ContactResponseSchema] з [get_contacts].
+
+Для кожного варiанту вимiрюється latency читання сторiнки з БД (запит + створення об'єктiв), latency всього
+запиту (разом iз серiалiзацiєю сторiнки в JSON) та пiкова пам'ять читання (tracemalloc).
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_list_projection
+python -m benchmarks.bench_list_projection 500 200
+"""
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.entity.models import Base, Contact, User
+from src.repository import contacts as rep_contacts
+from src.schemas.contact import ContactResponseSchema
+from src.services.pagination import paginate
+
+contacts_adapter = TypeAdapter(list[ContactResponseSchema])
+
+
+async def legacy_get_contacts(limit: int, offset: int, db: AsyncSession, user: User):
+    # поведiнка до змiни
+    statement = paginate(select(Contact).filter_by(user_id=user.id), limit, offset)
+    return (await db.execute(statement)).scalars().all()
+
+
+VARIANTS = {"entity": legacy_get_contacts, "projection": rep_contacts.get_contacts}
+
+
+async def fill(session: AsyncSession, rows: int) -> User:
+    user = User(username="bench", email="bench@example.com", password="secret", confirmed=True)
+    session.add(user)
+    await session.commit()
+    await session.execute(insert(Contact), [
+        {"first_name": f"Name{i}", "last_name": f"Last{i}", "email": f"contact{i}@example.com",
+         "phone_number": f"{i:010d}", "birth_date": date(1980, 1, 1) + timedelta(days=i), "user_id": user.id}
+        for i in range(rows)])
+    await session.commit()
+    return await session.get(User, user.id)
+
+
+async def page(session_maker, variant: str, user: User, limit: int) -> tuple[float, float]:
+    # нова сесiя на запит, як get_db у застосунку
+    async with session_maker() as session:
+        started = time.perf_counter()
+        contacts = await VARIANTS[variant](limit, 0, session, user)
+        fetched = time.perf_counter()
+        assert len(contacts) == limit
+        contacts_adapter.dump_json(contacts_adapter.validate_python(contacts))
+        return (fetched - started) * 1000, (time.perf_counter() - started) * 1000
+
+
+async def fetch_peak(session_maker, variant: str, user: User, limit: int) -> int:
+    async with session_maker() as session:
+        tracemalloc.start()
+        contacts = await VARIANTS[variant](limit, 0, session, user)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del contacts
+    return peak
+
+
+async def run(limit: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            user = await fill(session, limit)
+        for variant in VARIANTS:
+            await page(session_maker, variant, user, limit)
+            fetch, total = zip(*[await page(session_maker, variant, user, limit) for _ in range(repeat)])
+            peak = await fetch_peak(session_maker, variant, user, limit)
+            print(f"{variant:>10} | fetch p50 {statistics.median(fetch):6.2f} ms | "
+                  f"fetch p95 {statistics.quantiles(fetch, n=20)[-1]:6.2f} ms | "
+                  f"request p50 {statistics.median(total):7.2f} ms | fetch peak {peak / 1024:7.1f} KiB")
+        await engine.dispose()
+
+
+def main(limit: int, repeat: int):
+    print(f"page of {limit} contacts, {repeat} requests, file SQLite")
+    asyncio.run(run(limit, repeat))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500, int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -0,0 +1,111 @@
+"""
+Latency GET /api/contacts пiд час хвилi логiнiв: bcrypt у event loop проти bcrypt на executor (thread / process).
+
+Застосунок запускається в процесi (httpx + ASGI) на SQLite у пам'ятi, Redis та лiмiтер вимкнено моками,
+тож вимiрюється саме вплив bcrypt на iншi запити того ж worker.
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_login_burst
+python -m benchmarks.bench_login_burst 64
+"""
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import time
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from fastapi_limiter import FastAPILimiter
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from src.database.db import get_db
+from src.entity.models import Base, User
+from src.services import hashing
+from src.services.auth import auth_service
+from src.services.hashing import PasswordHasher
+
+EMAIL = "bench@example.com"
+PASSWORD = "12345678"
+# пауза мiж запитами GET /api/contacts, latency кожного запиту рахується вiд вiдправки до вiдповiдi
+INTERVAL = 0.005
+
+
+class InlineHasher(PasswordHasher):
+    # поведiнка до змiни: bcrypt виконується прямо в корутинi та зупиняє event loop
+    async def hash(self, password, ip=None, account=None):
+        return hashing.hash_password(password)
+
+    async def verify(self, plain_password, hashed_password, ip=None, account=None):
+        return hashing.verify_password(plain_password, hashed_password)
+
+
+async def poll_contacts(client: httpx.AsyncClient, token: str, stop: asyncio.Event, latencies: list[float]):
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/api/contacts/", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200, (response.status_code, response.text)
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(INTERVAL)
+
+
+async def run(hasher: PasswordHasher, logins: int) -> tuple[list[float], float]:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker() as session:
+        session.add(User(username="bench", email=EMAIL, password=hashing.hash_password(PASSWORD), confirmed=True))
+        await session.commit()
+
+    async def override_get_db():
+        async with sessionmaker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    token = await auth_service.create_access_token(data={"sub": EMAIL})
+    latencies, stop = [], asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    with patch.object(auth_service, "password_hasher", hasher), \
+            patch.object(auth_service, "cache", new_callable=AsyncMock) as cache, \
+            patch("src.repository.users.invalidate_user", AsyncMock()), \
+            patch.object(FastAPILimiter, "redis", AsyncMock()), \
+            patch.object(FastAPILimiter, "identifier", AsyncMock()), \
+            patch.object(FastAPILimiter, "http_callback", AsyncMock()), \
+            contextlib.redirect_stdout(io.StringIO()):
+        cache.get.return_value = None
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # розiгрiв: перший запит прогрiває executor та кеш користувача
+            await client.post("/api/auth/login", data={"username": EMAIL, "password": PASSWORD})
+            poller = asyncio.create_task(poll_contacts(client, token, stop, latencies))
+            started = time.perf_counter()
+            responses = await asyncio.gather(*[client.post("/api/auth/login",
+                                                           data={"username": EMAIL, "password": PASSWORD})
+                                               for _ in range(logins)])
+            burst = time.perf_counter() - started
+            stop.set()
+            await poller
+    assert all(response.status_code == 200 for response in responses)
+    app.dependency_overrides.pop(get_db, None)
+    hasher.shutdown()
+    await engine.dispose()
+    return sorted(latencies), burst
+
+
+def main(logins: int):
+    print(f"GET /api/contacts with {INTERVAL * 1000:.0f} ms pause during a burst of {logins} logins")
+    # усi логiни йдуть з одного IP на один акаунт, тож черга не обмежує їх (queue_size = per_client = logins)
+    variants = [("inline", InlineHasher("thread", 1, logins + 1, logins + 1)),
+                ("thread", PasswordHasher("thread", 2, logins + 1, logins + 1)),
+                ("process", PasswordHasher("process", 2, logins + 1, logins + 1))]
+    for name, hasher in variants:
+        latencies, burst = asyncio.run(run(hasher, logins))
+        p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+        print(f"{name:>8} | burst {burst:6.2f} s | {len(latencies):5d} reads | "
+              f"p50 {statistics.median(latencies):8.2f} ms | p99 {p99:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
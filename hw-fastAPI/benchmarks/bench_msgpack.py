@@ -0,0 +1,68 @@
+"""
+Розмiр та швидкiсть сторiнок контактiв у JSON та MessagePack: кодування на серверi ([contacts_serializer])
+та декодування на клiєнтi (json / orjson / msgpack) для сторiнок з 10, 100 та 500 контактiв.
+Розмiр наводиться також пiсля gzip, як його бачить клiєнт за проксi зi стисненням.
+
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_msgpack
+python -m benchmarks.bench_msgpack 10 100 500 1000
+"""
+import gzip
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import msgpack
+import orjson
+
+from src.services.serializers import JSON, MSGPACK, contacts_serializer, response_format
+
+
+class Row:
+    def __init__(self, i: int):
+        self.id = i
+        self.first_name = f"Name{i}"
+        self.last_name = f"Last{i}"
+        self.email = f"contact{i}@example.com"
+        self.phone_number = f"{380500000000 + i}"
+        self.birth_date = date(1980, 1, 1) + timedelta(days=i)
+        self.crm_status = "operational"
+        self.created_at = datetime(2024, 1, 1, 12, 0, 0) + timedelta(seconds=i)
+        self.updated_at = self.created_at
+
+
+def per_second(fn, seconds: float = 0.5) -> float:
+    calls, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        fn()
+        calls += 1
+    return calls / (time.perf_counter() - started)
+
+
+def encode(rows: list, media_type: str) -> bytes:
+    token = response_format.set(media_type)
+    try:
+        return contacts_serializer.dump(rows)
+    finally:
+        response_format.reset(token)
+
+
+def main(sizes: list[int]):
+    print(f"{'rows':>5} | {'format':<8} | {'bytes':>7} | {'gzip':>6} | {'encode/s':>9} | {'decode/s':>9} | decoder")
+    for size in sizes:
+        rows = [Row(i) for i in range(size)]
+        body_json, body_msgpack = encode(rows, JSON), encode(rows, MSGPACK)
+        assert msgpack.unpackb(body_msgpack) == json.loads(body_json)
+        cases = [("json", body_json, lambda: encode(rows, JSON), json.loads, "json"),
+                 ("json", body_json, lambda: encode(rows, JSON), orjson.loads, "orjson"),
+                 ("msgpack", body_msgpack, lambda: encode(rows, MSGPACK), msgpack.unpackb, "msgpack")]
+        for name, body, encoder, decoder, decoder_name in cases:
+            encoded = per_second(encoder)
+            decoded = per_second(lambda: decoder(body))
+            print(f"{size:5d} | {name:<8} | {len(body):7d} | {len(gzip.compress(body)):6d} | {encoded:9.0f} | "
+                  f"{decoded:9.0f} | {decoder_name}")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10, 100, 500])
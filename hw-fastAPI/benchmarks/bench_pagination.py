@@ -0,0 +1,77 @@
+"""
+Порiвняння latency глибокої сторiнки: offset-пагiнацiя проти keyset (cursor) пагiнацiї.
+
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_pagination
+python -m benchmarks.bench_pagination 1000 10000 100000 1000000
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.entity.models import Base, Contact, User
+from src.repository import contacts as rep_contacts
+from src.services.pagination import encode_cursor
+
+LIMIT = 50
+REPEAT = 20
+
+
+async def fill(session_maker, rows: int) -> User:
+    async with session_maker() as session:
+        user = User(username="bench", email="bench@example.com", password="secret", confirmed=True)
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        start = datetime(2020, 1, 1)
+        for chunk in range(0, rows, 10_000):
+            await session.execute(insert(Contact), [
+                {"first_name": f"Name{i}", "last_name": f"Last{i}", "email": f"contact{i}@example.com",
+                 "phone_number": f"{i:010d}", "birth_date": date(1980, 1, 1) + timedelta(days=i % 10_000),
+                 "created_at": start + timedelta(seconds=i), "updated_at": start + timedelta(seconds=i),
+                 "user_id": user.id}
+                for i in range(chunk, min(chunk + 10_000, rows))])
+        await session.commit()
+        return user
+
+
+async def measure(session_maker, user: User, offset: int, cursor: str | None) -> float:
+    async with session_maker() as session:
+        started = time.perf_counter()
+        for _ in range(REPEAT):
+            await rep_contacts.get_contacts(LIMIT, offset, session, user, cursor)
+        return (time.perf_counter() - started) / REPEAT * 1000
+
+
+async def run(rows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        user = await fill(session_maker, rows)
+
+        # остання повна сторiнка - найгiрший випадок для offset
+        offset = rows - LIMIT
+        async with session_maker() as session:
+            last_id = (await session.execute(select(Contact.id).order_by(Contact.id).offset(offset - 1).limit(1))).scalar()
+        offset_ms = await measure(session_maker, user, offset, None)
+        cursor_ms = await measure(session_maker, user, 0, encode_cursor("id", [last_id]))
+        print(f"{rows:>10} rows | offset {offset_ms:8.3f} ms | cursor {cursor_ms:8.3f} ms")
+        await engine.dispose()
+
+
+async def main(sizes: list[int]):
+    print(f"page size {LIMIT}, last page, mean of {REPEAT} calls")
+    for rows in sizes:
+        await run(rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]))
@@ -0,0 +1,103 @@
+"""
+Навантажувальний тест пулу з'єднань: який DB_POOL_SIZE потрiбен кожному з N воркерiв.
+
+Клiєнти надсилають RATE запитiв за секунду (пуассонiвський потiк) на всi N воркерiв, тож на один воркер
+припадає RATE / N. Кожен запит бере з'єднання через [AcquireTimeout] (як маршрути читання) i тримає його
+QUERY мс - стiльки в середньому триває запит до Postgres. Пули кожного воркера незалежнi, тож досить
+вимiряти один воркер з [TimedQueuePool] на SQLite; час запиту iмiтується паузою, поки з'єднання зайняте.
+
+За законом Лiттла воркер у середньому тримає (RATE / N) * QUERY з'єднань; пул має покривати ще й пiки,
+а N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) не повинно перевищувати max_connections Postgres.
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_pool
+python -m benchmarks.bench_pool 4 800 10 100
+"""
+import asyncio
+import contextlib
+import io
+import random
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from src.database import db
+from src.database.db import AcquireTimeout, DatabaseSessionManager, TimedQueuePool
+
+DURATION = 3.0
+POOL_SIZES = (1, 2, 3, 4, 6, 8, 16)
+ACQUIRE_TIMEOUT = 0.1
+# пул, у якого p99 очiкування з'єднання не бiльший, вважається достатнiм
+WAIT_P99_TARGET_MS = 5.0
+
+
+async def request(manager: DatabaseSessionManager, query: float, latencies: list, rejected: list):
+    started = time.perf_counter()
+    async with manager.session() as session:
+        try:
+            await AcquireTimeout(ACQUIRE_TIMEOUT)(session)
+        except HTTPException:
+            rejected.append(1)
+            return
+        await session.execute(text("SELECT 1"))
+        await asyncio.sleep(query)
+    latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run(pool_size: int, rate: float, query: float) -> dict:
+    manager = DatabaseSessionManager("sqlite+aiosqlite://", poolclass=TimedQueuePool, pool_size=pool_size,
+                                     max_overflow=0, pool_timeout=30)
+    rng = random.Random(42)
+    latencies, rejected, tasks = [], [], []
+    with patch.object(db, "sessionmanager", manager), contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        arrival = started
+        while arrival - started < DURATION:
+            arrival += rng.expovariate(rate)
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(request(manager, query, latencies, rejected)))
+        await asyncio.gather(*tasks)
+    stats = manager.pool_stats()["waits"]
+    await manager._engine.dispose()
+    latencies.sort()
+    return {"requests": len(tasks), "rejected": len(rejected),
+            "p50": statistics.median(latencies) if latencies else 0.0,
+            "p99": latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0,
+            "wait_mean": stats["mean_ms"], "wait_over_target": sum(
+                count for bound, count in stats["buckets_ms"].items()
+                if bound == "inf" or float(bound) > WAIT_P99_TARGET_MS) / max(stats["count"], 1)}
+
+
+def main(workers: int, rate: float, query_ms: float, max_connections: int):
+    per_worker = rate / workers
+    busy = per_worker * query_ms / 1000
+    print(f"{workers} workers, {rate:.0f} req/s in total ({per_worker:.0f} per worker), query {query_ms:.0f} ms, "
+          f"max_connections {max_connections}: a worker holds {busy:.1f} connections on average")
+    print(f"{'pool':>4} | {'total':>5} | {'req p50':>9} | {'req p99':>9} | {'wait mean':>9} | "
+          f"wait > {WAIT_P99_TARGET_MS:.0f} ms | 503")
+    chosen = None
+    for size in POOL_SIZES:
+        result = asyncio.run(run(size, per_worker, query_ms / 1000))
+        total = size * workers
+        print(f"{size:4d} | {total:5d} | {result['p50']:6.1f} ms | {result['p99']:6.1f} ms | "
+              f"{result['wait_mean']:6.2f} ms | {result['wait_over_target']:11.1%} | "
+              f"{result['rejected']}/{result['requests']}")
+        if chosen is None and not result["rejected"] and result["wait_over_target"] <= 0.01 \
+                and total <= max_connections:
+            chosen = size
+    if chosen is None:
+        print(f"no pool size fits: more connections than max_connections={max_connections} or fewer workers needed")
+    else:
+        print(f"DB_POOL_SIZE={chosen}, DB_MAX_OVERFLOW<={max_connections // workers - chosen} "
+              f"for {workers} workers and max_connections={max_connections}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if len(args) > 0 else 4, float(args[1]) if len(args) > 1 else 800,
+         float(args[2]) if len(args) > 2 else 10, int(args[3]) if len(args) > 3 else 100)
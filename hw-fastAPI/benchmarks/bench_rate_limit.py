@@ -0,0 +1,119 @@
+"""
+Затримка, яку додає [RateLimiter] до кожного запиту, у режимах strict (evalsha у Redis на кожен запит,
+як у fastapi_limiter) та approximate (GCRA у пам'ятi воркера, лiчильники пишуться в Redis пачками
+кожнi RATE_LIMIT_SYNC_INTERVAL секунд фоновою задачею [sync_limits]).
+
+Redis iмiтується з фiксованою затримкою вiдповiдi, тож результат не залежить вiд мережi;
+лiмiт достатньо великий, щоб жоден запит не отримав 429. Рядок "no limiter" - це latency самого event loop
+пiд навантаженням: затримка лiмiтера - рiзниця з ним.
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_rate_limit
+python -m benchmarks.bench_rate_limit 200 0.001
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from fastapi import Response
+from fastapi_limiter import FastAPILimiter, default_identifier, http_default_callback
+from starlette.requests import Request
+
+from main import app
+from src.services import rate_limit
+from src.services.rate_limit import APPROXIMATE, STRICT, LocalLimits, RateLimiter, sync_limits
+
+REQUESTS_PER_CLIENT = 10
+INTERVAL = 0.05
+ROUNDS = 5
+
+
+class LatencyPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def incrby(self, key, amount):
+        self.commands.append(amount)
+
+    def pexpire(self, key, milliseconds):
+        self.commands.append(True)
+
+    async def execute(self):
+        await asyncio.sleep(self.redis.latency)
+        self.redis.round_trips += 1
+        return self.commands
+
+
+class LatencyRedis:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.round_trips = 0
+
+    async def evalsha(self, *args):
+        await asyncio.sleep(self.latency)
+        self.round_trips += 1
+        return 0
+
+    def pipeline(self, transaction: bool = True):
+        return LatencyPipeline(self)
+
+
+def request(client: int) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/api/contacts/", "headers": [], "app": app,
+                    "client": (f"10.0.{client // 256}.{client % 256}", 1234), "query_string": b""})
+
+
+async def client(limiter: RateLimiter | None, number: int, latencies: list[float], started_at: float):
+    req = request(number)
+    for i in range(REQUESTS_PER_CLIENT):
+        arrival = started_at + i * INTERVAL
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if limiter is not None:
+            await limiter(req, Response())
+        latencies.append((time.perf_counter() - arrival) * 1000)
+
+
+async def run(mode: str | None, clients: int, latency: float) -> tuple[list[float], int]:
+    redis = LatencyRedis(latency)
+    FastAPILimiter.redis, FastAPILimiter.prefix, FastAPILimiter.lua_sha = redis, "bench", "sha"
+    FastAPILimiter.identifier, FastAPILimiter.http_callback = default_identifier, http_default_callback
+    rate_limit.local_limits = LocalLimits()
+    limiter = RateLimiter(times=1000, seconds=60, mode=mode) if mode else None
+    sync = asyncio.create_task(sync_limits(redis, interval=0.1)) if mode == APPROXIMATE else None
+    latencies = []
+    started_at = time.perf_counter()
+    await asyncio.gather(*[client(limiter, i, latencies, started_at + i * INTERVAL / clients) for i in range(clients)])
+    if sync is not None:
+        sync.cancel()
+        await rate_limit.local_limits.sync(redis)
+    return sorted(latencies), redis.round_trips
+
+
+def percentiles(mode: str | None, clients: int, latency: float) -> tuple[float, float, int]:
+    # на однiй машинi поодинокi паузи event loop спотворюють p99, тож береться медiана кiлькох прогонiв
+    runs = []
+    for _ in range(ROUNDS):
+        latencies, round_trips = asyncio.run(run(mode, clients, latency))
+        runs.append((statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1], round_trips))
+    return statistics.median(p50 for p50, _, _ in runs), statistics.median(p99 for _, p99, _ in runs), runs[0][2]
+
+
+def main(clients: int, latency: float):
+    print(f"{clients} clients x {REQUESTS_PER_CLIENT} requests every {INTERVAL * 1000:.0f} ms, "
+          f"Redis latency {latency * 1000:.1f} ms")
+    for mode in (None, STRICT, APPROXIMATE):
+        p50, p99, round_trips = percentiles(mode, clients, latency)
+        print(f"{mode or 'no limiter':>11} | p50 {p50:7.3f} ms | p99 {p99:7.3f} ms | Redis round trips {round_trips:5d}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, float(sys.argv[2]) if len(sys.argv) > 2 else 0.001)
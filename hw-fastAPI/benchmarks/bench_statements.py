@@ -0,0 +1,145 @@
+"""
+Накладнi витрати репозиторiю на один виклик без часу самої БД: запити, якi будуються заново на кожен виклик
+(select(...).filter_by(...), як було), проти запитiв з [src.repository], побудованих один раз з bindparam.
+
+Час БД (cursor.execute) вимiрюється подiями before / after_cursor_execute рушiя i вiднiмається вiд часу виклику;
+решта - побудова запиту, його cache key, пошук (або компiляцiя) SQL у кешi engine та обробка рядкiв.
+Рядок "legacy, no cache" - тi самi запити з query_cache_size=0: скiльки коштувала б компiляцiя без кешу.
+Redis (bump_list_version) вимкнено моком; в update_contact до накладних витрат входить i commit().
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_statements
+python -m benchmarks.bench_statements 5000
+"""
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import DatabaseSessionManager
+from src.entity.models import Base, Contact, User, birthday_ordinal
+from src.repository import contacts as rep_contacts
+from src.repository import users as rep_users
+from src.repository.contacts import RESPONSE_COLUMNS
+from src.schemas.contact import ContactSchema
+
+CURRENT_DATE = date(2024, 3, 1)
+
+
+async def legacy_get_user_by_email(email: str, db: AsyncSession):
+    # реалiзацiї до змiни
+    return (await db.execute(select(User).filter_by(email=email))).scalar_one_or_none()
+
+
+async def legacy_get_contact(contact_id: int, db: AsyncSession, user: User):
+    statement = select(*RESPONSE_COLUMNS).where(Contact.id == contact_id, Contact.user_id == user.id)
+    return (await db.execute(statement)).one_or_none()
+
+
+async def legacy_get_contact_version(contact_id: int, db: AsyncSession, user: User):
+    statement = select(Contact.version).filter_by(id=contact_id, user_id=user.id)
+    return (await db.execute(statement)).scalar_one_or_none()
+
+
+async def legacy_update_contact(contact_id: int, body: ContactSchema, db: AsyncSession, user: User):
+    statement = (update(Contact).filter_by(id=contact_id, user_id=user.id)
+                 .values(first_name=body.first_name, last_name=body.last_name, email=body.email,
+                         phone_number=body.phone_number, birth_date=body.birth_date,
+                         birthday_ordinal=birthday_ordinal(body.birth_date), crm_status=body.crm_status,
+                         version=Contact.version + 1)
+                 .returning(*RESPONSE_COLUMNS)
+                 .execution_options(synchronize_session=False))
+    contact = (await db.execute(statement)).one_or_none()
+    await db.commit()
+    return contact
+
+
+async def legacy_search_by_birthdate(days: int, db: AsyncSession, current_date: date):
+    start_ordinal, end_ordinal = rep_contacts.birthday_window(current_date, days)
+    statement = (select(*RESPONSE_COLUMNS).where(Contact.birthday_ordinal.between(start_ordinal, end_ordinal))
+                 .order_by(Contact.birthday_ordinal < start_ordinal, Contact.birthday_ordinal, Contact.id))
+    return (await db.execute(statement)).all()
+
+
+LEGACY = {"get_user_by_email": legacy_get_user_by_email, "get_contact": legacy_get_contact,
+          "get_contact_version": legacy_get_contact_version, "update_contact": legacy_update_contact,
+          "search_by_birthdate": legacy_search_by_birthdate}
+PRECOMPILED = {"get_user_by_email": rep_users.get_user_by_email, "get_contact": rep_contacts.get_contact,
+               "get_contact_version": rep_contacts.get_contact_version, "update_contact": rep_contacts.update_contact,
+               "search_by_birthdate": rep_contacts.search_contact_by_birthdate}
+
+
+def calls(functions: dict, db: AsyncSession, user: User, i: int) -> dict:
+    body = ContactSchema(first_name=f"Name{i}", last_name="Last", email="contact1@example.com",
+                         phone_number="0123456789", birth_date=date(1980, 3, 5))
+    return {"get_user_by_email": functions["get_user_by_email"](user.email, db),
+            "get_contact": functions["get_contact"](1 + i % 50, db, user),
+            "get_contact_version": functions["get_contact_version"](1 + i % 50, db, user),
+            "update_contact": functions["update_contact"](1, body, db, user),
+            "search_by_birthdate": functions["search_by_birthdate"](7, db, current_date=CURRENT_DATE)}
+
+
+async def run(functions: dict, cache_size: int, repeat: int) -> tuple[dict, dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseSessionManager(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}", query_cache_size=cache_size)
+        engine = manager._engine
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with manager._session_maker() as db:
+            user = User(username="bench", email="bench@example.com", password="secret", confirmed=True)
+            db.add(user)
+            await db.flush()
+            user_id = user.id
+            db.add_all(Contact(first_name=f"Name{i}", last_name="Last", email=f"contact{i}@example.com",
+                               phone_number=f"{i:010d}", birth_date=date(1980, 1 + i % 12, 1 + i % 28),
+                               user_id=user_id)
+                       for i in range(1, 51))
+            await db.commit()
+        timer = {"started": 0.0, "db": 0.0}
+
+        def before(*args):
+            timer["started"] = time.perf_counter()
+
+        def after(*args):
+            timer["db"] += time.perf_counter() - timer["started"]
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before)
+        event.listen(engine.sync_engine, "after_cursor_execute", after)
+        overhead = {name: [] for name in functions}
+        # як i в маршрутах, користувач - знiмок з кешу, а не ORM-об'єкт, який commit() робить застарiлим
+        user = SimpleNamespace(id=user_id, email="bench@example.com")
+        with patch.object(rep_contacts, "bump_list_version", AsyncMock()):
+            async with manager._session_maker() as db:
+                for i in range(repeat):
+                    for name, call in calls(functions, db, user, i).items():
+                        timer["db"] = 0.0
+                        started = time.perf_counter()
+                        await call
+                        overhead[name].append((time.perf_counter() - started - timer["db"]) * 1e6)
+        statements = manager.statements.as_dict()
+        await engine.dispose()
+    return {name: statistics.median(values) for name, values in overhead.items()}, statements
+
+
+async def main(repeat: int):
+    variants = {"legacy": (LEGACY, 500), "legacy, no cache": (LEGACY, 0), "precompiled": (PRECOMPILED, 500)}
+    results = {}
+    print(f"{repeat} calls of each function, median overhead per call excluding cursor.execute")
+    for variant, (functions, cache_size) in variants.items():
+        results[variant], statements = await run(functions, cache_size, repeat)
+        print(f"{variant}: compiled cache hits {statements['hits']}, misses {statements['misses']}, "
+              f"uncached {statements['uncached']}, hit ratio {statements['hit_ratio']}")
+    print(f"{'function':>20} | " + " | ".join(f"{variant:>16}" for variant in variants))
+    for name in LEGACY:
+        print(f"{name:>20} | " + " | ".join(f"{results[variant][name]:13.1f} us" for variant in variants))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,81 @@
+"""
+Накладнi витрати стеку middleware на кожен запит: попереднiй стек (BaseHTTPMiddleware black list
++ @app.middleware("http") з re.search для кожного шаблону user-agent) проти ASGI [BlackListMiddleware]
++ [UserAgentBanMiddleware] (один об'єднаний regex + LRU вердиктiв).
+
+Middleware викликаються напряму з ASGI scope поверх застосунку, який одразу вiдповiдає 200;
+клiєнти надсилають 200 рiзних user-agent довжиною як у браузерiв, близько 5% з них - боти.
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_user_agents
+python -m benchmarks.bench_user_agents 2 20 200
+"""
+import asyncio
+import random
+import re
+import sys
+import time
+from ipaddress import ip_network
+
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from benchmarks.bench_blocklist import LegacyBlackListMiddleware, app, per_request
+from src.services.blocklist import DEFAULT_NETWORKS, IPBlocklist
+from src.services.middleware import BlackListMiddleware, UserAgentBanMiddleware
+from src.services.user_agents import UserAgentFilter
+
+USER_AGENTS = 200
+BROWSER = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+           "Chrome/{}.0.{}.{} Safari/537.36")
+
+
+def legacy_user_agent_middleware(patterns: list[str]):
+    # middleware з main.py до змiни
+    async def user_agent_ban_middleware(request, call_next):
+        user_agent = request.headers.get("user-agent", "")
+        for ban_pattern in patterns:
+            if re.search(ban_pattern, user_agent, re.IGNORECASE):
+                return JSONResponse(status_code=403, content={"detail": "You are banned"},)
+        response = await call_next(request)
+        return response
+
+    return user_agent_ban_middleware
+
+
+def ban_patterns(count: int) -> list[str]:
+    return ["yandexbot", "yandex-bot"] + [f"crawler{i}bot" for i in range(count - 2)]
+
+
+def scopes(patterns: list[str], rng: random.Random) -> list[dict]:
+    agents = [f"Mozilla/5.0 (compatible; {patterns[i % len(patterns)].replace('-', '')}/2.0)" if i % 20 == 0
+              else BROWSER.format(rng.randint(100, 120), rng.randint(1000, 6000), rng.randint(10, 200))
+              for i in range(USER_AGENTS)]
+    return [{"type": "http", "method": "GET", "path": "/", "query_string": b"", "client": ("8.8.8.8", 1234),
+             "headers": [(b"host", b"localhost"), (b"accept", b"*/*"), (b"user-agent", agent.encode())]}
+            for agent in agents]
+
+
+async def run(sizes: list[int]):
+    rng = random.Random(42)
+    print(f"{'patterns':>8} | {'baseline':>10} | {'legacy stack':>12} | {'asgi stack':>10} | verdict hit ratio")
+    for size in sizes:
+        patterns = ban_patterns(size)
+        requests = scopes(patterns, rng)
+        legacy = LegacyBlackListMiddleware(BaseHTTPMiddleware(app, legacy_user_agent_middleware(patterns)),
+                                           [ip_network(network) for network in DEFAULT_NETWORKS])
+        user_agents = UserAgentFilter(patterns)
+        asgi = BlackListMiddleware(UserAgentBanMiddleware(app, user_agents), IPBlocklist(DEFAULT_NETWORKS))
+        seconds = 0.5
+        baseline = await per_request(app, requests, seconds)
+        before = await per_request(legacy, requests, seconds)
+        after = await per_request(asgi, requests, seconds)
+        print(f"{size:8d} | {baseline:7.1f} us | {before - baseline:9.1f} us | {after - baseline:7.1f} us | "
+              f"{user_agents.stats()['hit_ratio']}")
+
+
+def main(sizes: list[int]):
+    asyncio.run(run(sizes))
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [2, 20, 200])
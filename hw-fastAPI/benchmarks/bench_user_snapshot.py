@@ -0,0 +1,31 @@
+"""
+Розмiр та час (де)серiалiзацiї <user> у кешi: pickle ORM-моделi [User] проти знiмка [UserSnapshot].
+
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_user_snapshot
+"""
+import pickle
+import timeit
+from datetime import datetime
+
+from src.entity.models import Role, User
+from src.services import user_snapshot
+
+NUMBER = 20_000
+
+
+def main():
+    user = User(id=1, username="deadpool", email="deadpool@example.com", password="$2b$12$" + "x" * 53,
+                role=Role.admin, avatar="https://res.cloudinary.com/demo/image/upload/v1/Py16-Web/deadpool.jpg",
+                refresh_token="eyJ" + "x" * 180, confirmed=True, created_at=datetime.now(), updated_at=datetime.now())
+    variants = [("pickle", pickle.dumps, pickle.loads), ("snapshot", user_snapshot.dumps, user_snapshot.loads)]
+    print(f"mean of {NUMBER} calls")
+    for name, dumps, loads in variants:
+        payload = dumps(user)
+        dumps_us = timeit.timeit(lambda: dumps(user), number=NUMBER) / NUMBER * 1e6
+        loads_us = timeit.timeit(lambda: loads(payload), number=NUMBER) / NUMBER * 1e6
+        print(f"{name:>8} | {len(payload):5d} bytes | dumps {dumps_us:7.2f} us | loads {loads_us:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Кiлькiсть запитiв до БД та час на один запис контакту: create / update / delete через SELECT + commit + refresh()
+(як було) проти одного INSERT / UPDATE / DELETE ... RETURNING з [src.repository.contacts].
+
+Запити рахуються подiєю before_cursor_execute рушiя, COMMIT рахується окремо (це теж round trip).
+Redis (bump_list_version) вимкнено моком, тож вимiрюється лише робота з БД.
+Запуск (з каталогу hw-fastAPI):
+python -m benchmarks.bench_write_round_trips
+python -m benchmarks.bench_write_round_trips 5000
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.entity.models import Base, Contact, User
+from src.repository import contacts as rep_contacts
+from src.schemas.contact import ContactResponseSchema, ContactSchema
+
+
+async def legacy_create(body: ContactSchema, db: AsyncSession, user: User):
+    # поведiнка до змiни
+    contact = Contact(**body.model_dump(exclude_unset=True), user_id=user.id)
+    db.add(contact)
+    await db.commit()
+    await db.refresh(contact)
+    return contact
+
+
+async def legacy_update(contact_id: int, body: ContactSchema, db: AsyncSession, user: User):
+    contact = (await db.execute(select(Contact).filter_by(id=contact_id, user_id=user.id))).scalar_one_or_none()
+    if contact:
+        contact.first_name = body.first_name
+        contact.last_name = body.last_name
+        contact.email = body.email
+        contact.phone_number = body.phone_number
+        contact.birth_date = body.birth_date
+        contact.crm_status = body.crm_status
+        await db.commit()
+        await db.refresh(contact)
+    return contact
+
+
+async def legacy_delete(contact_id: int, db: AsyncSession, user: User):
+    contact = (await db.execute(select(Contact).filter_by(id=contact_id, user_id=user.id))).scalar_one_or_none()
+    if contact:
+        await db.delete(contact)
+        await db.commit()
+    return contact
+
+
+VARIANTS = {
+    "legacy": (legacy_create, legacy_update, legacy_delete),
+    "returning": (rep_contacts.create_contact, rep_contacts.update_contact, rep_contacts.delete_contact),
+}
+
+
+def body(i: int, name: str = "Name") -> ContactSchema:
+    return ContactSchema(first_name=f"{name}{i}", last_name=f"Last{i}", email=f"contact{i}@example.com",
+                         phone_number=f"{i:010d}", birth_date=date(1980, 1 + i % 12, 1 + i % 28))
+
+
+async def run(variant: str, rows: int) -> dict[str, tuple[float, float]]:
+    create, update, delete = VARIANTS[variant]
+    counter = {"queries": 0}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        def count(*args):
+            counter["queries"] += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        event.listen(engine.sync_engine, "commit", count)
+        # як у застосунку (DatabaseSessionManager): expire_on_commit=True
+        async with async_sessionmaker(engine)() as session:
+            user = User(username="bench", email="bench@example.com", password="secret", confirmed=True)
+            session.add(user)
+            await session.commit()
+            await session.refresh(user)
+            session.expunge(user)
+            results = {}
+            with patch.object(rep_contacts, "bump_list_version", AsyncMock()):
+                for name, operation in [("create", lambda i: create(body(i), session, user)),
+                                        ("update", lambda i: update(i + 1, body(i, "Renamed"), session, user)),
+                                        ("delete", lambda i: delete(i + 1, session, user))]:
+                    counter["queries"] = 0
+                    started = time.perf_counter()
+                    for i in range(rows):
+                        contact = await operation(i)
+                        # вiдповiдь маршруту серiалiзується так само для обох варiантiв
+                        ContactResponseSchema.model_validate(contact)
+                    elapsed = time.perf_counter() - started
+                    results[name] = (counter["queries"] / rows, elapsed / rows * 1000)
+        await engine.dispose()
+    return results
+
+
+def main(rows: int):
+    print(f"{rows} contacts, file SQLite")
+    for variant in VARIANTS:
+        for name, (queries, ms) in asyncio.run(run(variant, rows)).items():
+            print(f"{variant:>9} | {name} | {queries:4.1f} queries/op | {ms:6.3f} ms/op")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -1,5 +1,4 @@
-import re
-import redis.asyncio as aioredis
+import asyncio
 from ipaddress import ip_address, ip_network
 from typing import Callable
 
@@ -7,14 +6,21 @@ from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi_limiter import FastAPILimiter
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from redis.exceptions import RedisError
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-from src.database.db import get_db
+from src.database.db import get_db, watch_replicas
+from src.database.redis_pool import redis_client, redis_pool
 from src.routes import auth, birthday_contacts, contacts, search_contacts, users
 from src.conf.config import config
-from src.services.middleware import BlackListMiddleware
+from src.services.hashing import password_hasher
+from src.services.blocklist import watch_blocklist
+from src.services.middleware import BlackListMiddleware, UserAgentBanMiddleware
+from src.services.user_agents import watch_user_agents
+from src.services.rate_limit import APPROXIMATE, local_limits, sync_limits
+from src.services.user_cache import listen_invalidations
 
 # Запуск проекту:
 # uvicorn main:app --host localhost --port 8000 --reload
@@ -29,6 +35,8 @@ origins = ["*"]
 
 
 app.add_middleware(BlackListMiddleware)
+# боти з USER_AGENT_BAN_LIST; список змiнюється адмiнiстратором без перезапуску (src/services/user_agents.py)
+app.add_middleware(UserAgentBanMiddleware)
 
 
 # app.add_middleware(
@@ -66,23 +74,6 @@ app.add_middleware(BlackListMiddleware)
 
 
 
-# Окрiм того, яблоки та яблочники не прокатяться
-# user_agent_ban_list = [r"Macintosh", r"iPhone", r"iPad", r"AppleWebKit"]
-user_agent_ban_list = [r"yandexbot", r"yandex-bot"]
-
-@app.middleware("http")
-async def user_agent_ban_middleware(request: Request, call_next: Callable):
-    user_agent = request.headers.get("user-agent", "")
-    
-    for ban_pattern in user_agent_ban_list:
-        if re.search(ban_pattern, user_agent, re.IGNORECASE):
-            return JSONResponse(status_code=status.HTTP_403_FORBIDDEN, content={"detail": "You are banned"},)
-
-    response = await call_next(request)
-    return response
-
-
-
 # routed [auth] розташовується вище за всiх
 app.include_router(auth.router, prefix="/api")
 app.include_router(contacts.router, prefix="/api")
@@ -94,12 +85,35 @@ app.include_router(users.router, prefix="/api")
 # Ratelimit iнiцiюється тут з тегом "startup", а потiм ще додається його реалiзацiя у src/routes
 @app.on_event("startup")
 async def startup():
-    redis_memory = await aioredis.Redis(
-        host=config.REDIS_DOMAIN,
-        port=config.REDIS_PORT,
-        db=0,
-        password=config.REDIS_PASSWORD,)
-    await FastAPILimiter.init(redis_memory)
+    # лiмiтер працює на тому ж пулi з'єднань, що й кеш <user> у src/services/auth.py
+    await FastAPILimiter.init(redis_client)
+    # фонова пiдписка на iнвалiдацiю локального кешу <user> (src/services/user_cache.py)
+    app.state.invalidation_listener = asyncio.create_task(listen_invalidations())
+    # black list перечитується з BLOCKLIST_FILE / BLOCKLIST_REDIS_KEY без перезапуску (src/services/blocklist.py)
+    app.state.blocklist_watcher = asyncio.create_task(watch_blocklist())
+    app.state.user_agents_watcher = asyncio.create_task(watch_user_agents())
+    # реплiки читання перевiряються у фонi i виводяться з ротацiї, поки вiдстають чи недоступнi (src/database/db.py)
+    app.state.replicas_watcher = asyncio.create_task(watch_replicas())
+    # у режимi approximate лiмiти рахуються в пам'ятi воркера i пачками пишуться в Redis (src/services/rate_limit.py)
+    if config.RATE_LIMIT_MODE == APPROXIMATE:
+        app.state.limits_sync = asyncio.create_task(sync_limits())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.invalidation_listener.cancel()
+    app.state.blocklist_watcher.cancel()
+    app.state.user_agents_watcher.cancel()
+    app.state.replicas_watcher.cancel()
+    if config.RATE_LIMIT_MODE == APPROXIMATE:
+        app.state.limits_sync.cancel()
+        # останнi пропущенi запити воркера теж мають потрапити до спiльних лiчильникiв
+        try:
+            await local_limits.sync(redis_client)
+        except (RedisError, OSError) as err:
+            print(err)
+    await redis_pool.disconnect()
+    password_hasher.shutdown()
 
 
 @app.get("/")
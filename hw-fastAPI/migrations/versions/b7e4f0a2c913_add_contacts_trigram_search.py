@@ -0,0 +1,44 @@
+"""add contacts trigram search
+
+Revision ID: b7e4f0a2c913
+Revises: a3c9d1e7b5f2
+Create Date: 2026-10-17 12:40:03.771529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.entity.models import CONTACTS_SEARCH_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4f0a2c913'
+down_revision: Union[str, None] = 'a3c9d1e7b5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_FIELDS = ['first_name', 'last_name', 'email']
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    # на SQLite останнiй DDL ('rebuild') заповнює FTS5 таблицю вже iснуючими контактами
+    for statement in CONTACTS_SEARCH_DDL.get(dialect, []):
+        op.execute(statement)
+    if dialect == 'postgresql':
+        for field in TRGM_FIELDS:
+            op.create_index(f'ix_contacts_{field}_trgm', 'contacts', [field], unique=False,
+                            postgresql_using='gin', postgresql_ops={field: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for field in reversed(TRGM_FIELDS):
+            op.drop_index(f'ix_contacts_{field}_trgm', table_name='contacts')
+    elif dialect == 'sqlite':
+        for trigger in ['contacts_fts_au', 'contacts_fts_ad', 'contacts_fts_ai']:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS contacts_fts")
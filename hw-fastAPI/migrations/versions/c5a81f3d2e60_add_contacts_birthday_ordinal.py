@@ -0,0 +1,47 @@
+"""add contacts birthday ordinal
+
+Revision ID: c5a81f3d2e60
+Revises: b7e4f0a2c913
+Create Date: 2026-10-17 14:05:27.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.entity.models import CONTACTS_SEARCH_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a81f3d2e60'
+down_revision: Union[str, None] = 'b7e4f0a2c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def restore_search_triggers() -> None:
+    # batch_alter_table на SQLite перестворює таблицю <contacts>, а разом з нею зникають i FTS5 тригери
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in CONTACTS_SEARCH_DDL['sqlite']:
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('birthday_ordinal', sa.Integer(), nullable=True))
+    # backfill iснуючих контактiв: month * 100 + day
+    contacts = sa.table('contacts', sa.column('birth_date', sa.Date), sa.column('birthday_ordinal', sa.Integer))
+    op.execute(contacts.update().values(
+        birthday_ordinal=sa.cast(sa.extract('month', contacts.c.birth_date), sa.Integer) * 100
+        + sa.cast(sa.extract('day', contacts.c.birth_date), sa.Integer)))
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.alter_column('birthday_ordinal', existing_type=sa.Integer(), nullable=False)
+    restore_search_triggers()
+    op.create_index(op.f('ix_contacts_birthday_ordinal'), 'contacts', ['birthday_ordinal'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_contacts_birthday_ordinal'), table_name='contacts')
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.drop_column('birthday_ordinal')
+    restore_search_triggers()
@@ -0,0 +1,34 @@
+"""add contacts version
+
+Revision ID: d9e2b6a47c18
+Revises: c5a81f3d2e60
+Create Date: 2026-10-17 16:42:11.518337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.entity.models import CONTACTS_SEARCH_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e2b6a47c18'
+down_revision: Union[str, None] = 'c5a81f3d2e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NOT NULL з DEFAULT додається без перестворення таблицi i на Postgres, i на SQLite
+    op.add_column('contacts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.drop_column('version')
+    # batch_alter_table на SQLite перестворює таблицю <contacts>, а разом з нею зникають i FTS5 тригери
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in CONTACTS_SEARCH_DDL['sqlite']:
+            op.execute(statement)
@@ -2,4 +2,15 @@ ACCOUNT_EXIST = "Account already exists!"
 WRONG_CREDENTIALS = "Wrong credentials"
 EMAIL_NOT_CONFIRMED = "Email not confirmed"
 ENTITY_NOT_FOUND = "ENTITY NOT FOUND."
-TEST_EMAIL = "deadpool@example.com"
\ No newline at end of file
+TEST_EMAIL = "deadpool@example.com"
+INVALID_CURSOR = "Invalid pagination cursor."
+HASH_QUEUE_FULL = "Too many login attempts in progress, try again later."
+BULK_UNSUPPORTED_TYPE = "Send the contacts as text/csv, application/x-ndjson or application/msgpack."
+BULK_BAD_JSON = "Line is not a JSON object."
+BULK_BAD_MSGPACK = "Item is not a MessagePack map."
+BULK_BAD_CSV_ROW = "Number of columns does not match the header."
+CONTACT_EMAIL_EXISTS = "Contact with this email already exists."
+CONTACT_CHANGED = "Contact was changed by another request, reload it and try again."
+BANNED = "You are banned"
+DB_POOL_BUSY = "Database is busy, try again later."
+REDIS_UNAVAILABLE = "Shared storage is unavailable, the change was not applied, try again later."
@@ -1,15 +1,232 @@
+import asyncio
 import contextlib
+import itertools
+import time
+from bisect import bisect_left
+from typing import Iterable
 
+from fastapi import Depends, HTTPException, status
+from redis.exceptions import RedisError
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine.interfaces import CacheStats
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from src.conf import messages
 from src.conf.config import config
+from src.database.redis_pool import redis_client
+from src.services.user_cache import TTLCache
+
+# Ключ Redis, поки вiн живий, читання користувача йдуть на primary (read-your-writes)
+PIN_PREFIX = "db:primary:"
+
+# межi кошикiв гiстограми очiкування з'єднання, мс; останнiй кошик - усе, що довше
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolStats:
+    def __init__(self):
+        """
+        The __init__ function sets the histogram of the waits for a pool connection and the timeouts to zero.
+
+        :param self: Represent the instance of the class
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def observe(self, wait_ms: float):
+        """
+        The observe function counts one checkout of a connection, which took wait_ms milliseconds.
+
+        :param self: Represent the instance of the class
+        :param wait_ms: float: The wait for the connection in milliseconds
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.buckets[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+        self.count += 1
+        self.total_ms += wait_ms
+        self.max_ms = max(self.max_ms, wait_ms)
+
+    def as_dict(self) -> dict:
+        """
+        The as_dict function returns the histogram, keyed by the upper bound of each bucket in milliseconds.
+
+        :param self: Represent the instance of the class
+        :return: A dict with the buckets, count, mean, max and timeouts
+        :doc-author: Trelent
+        """
+        bounds = [str(bound) for bound in WAIT_BUCKETS_MS] + ["inf"]
+        return {"buckets_ms": dict(zip(bounds, self.buckets)), "count": self.count,
+                "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+                "max_ms": round(self.max_ms, 3), "timeouts": self.timeouts}
+
+
+class StatementCacheStats:
+    """
+    The StatementCacheStats class counts, how the statements of the engine were compiled:
+        taken from the compiled cache of the engine (hits), compiled and cached (misses) or compiled without the cache.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        """
+        The __init__ function subscribes the counters to the executions of the engine.
+
+        :param self: Represent the instance of the class
+        :param engine: AsyncEngine: The engine to watch
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.engine = engine
+        self.counts = dict.fromkeys(CacheStats, 0)
+        event.listen(engine.sync_engine, "after_cursor_execute", self.observe)
+
+    def observe(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            self.counts[context.cache_hit] += 1
+
+    def as_dict(self) -> dict:
+        """
+        The as_dict function returns the counters together with the number of the statements in the compiled cache.
+
+        :param self: Represent the instance of the class
+        :return: A dict with the hits, misses, uncached, hit_ratio and size
+        :doc-author: Trelent
+        """
+        hits, misses = self.counts[CacheStats.CACHE_HIT], self.counts[CacheStats.CACHE_MISS]
+        cache = self.engine.sync_engine._compiled_cache
+        return {"hits": hits, "misses": misses, "uncached": sum(self.counts.values()) - hits - misses,
+                "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                "size": len(cache) if cache is not None else 0}
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    The TimedQueuePool class is the default pool of the async engine, which also measures
+        how long each checkout waited for a free connection (or for a new one to be opened).
+    """
+
+    stats: PoolStats | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.timeouts += 1
+            raise
+        if self.stats is not None:
+            self.stats.observe((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() створює новий пул: статистика переходить до нього
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def engine_options(url: str) -> dict:
+    """
+    The engine_options function collects the pool settings of the engine from the config.
+        The prepared statement cache is the option of asyncpg, so it is passed only to the asyncpg engines.
+
+    :param url: str: The url of the database
+    :return: The keyword arguments of create_async_engine
+    :doc-author: Trelent
+    """
+    options = dict(poolclass=TimedQueuePool, pool_size=config.DB_POOL_SIZE, max_overflow=config.DB_MAX_OVERFLOW,
+                   pool_timeout=config.DB_POOL_TIMEOUT, pool_recycle=config.DB_POOL_RECYCLE,
+                   pool_pre_ping=config.DB_POOL_PRE_PING, query_cache_size=config.DB_QUERY_CACHE_SIZE)
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {"prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+REPLICA_LAG_QUERY = ("SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                     "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END")
+
+
+def _pool_state(pool) -> dict:
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {}
+    return {"size": pool.size(), "checked_out": pool.checkedout(), "checked_in": pool.checkedin(),
+            "overflow": pool.overflow()}
+
+
+class Replica:
+    def __init__(self, url: str, options: dict):
+        """
+        The __init__ function creates the engine of the read replica with the same pool settings as the primary.
+            The replica is in rotation until the first failed health check.
+
+        :param self: Represent the instance of the class
+        :param url: str: The url of the replica
+        :param options: dict: The keyword arguments of create_async_engine
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.url = make_url(url).render_as_string(hide_password=True)
+        self.engine: AsyncEngine = create_async_engine(url, **options)
+        self.session_maker = async_sessionmaker(autoflush=False, autocommit=False, bind=self.engine)
+        self.stats = PoolStats()
+        self.engine.pool.stats = self.stats
+        self.statements = StatementCacheStats(self.engine)
+        self.healthy = True
+        self.lag = 0.0
+
+    async def check(self, max_lag: float, timeout: float):
+        """
+        The check function takes the replica out of rotation, when it does not answer within the timeout
+            or lags behind the primary more than max_lag seconds, and returns it back, when it recovers.
+
+        :param self: Represent the instance of the class
+        :param max_lag: float: The maximal replication lag in seconds
+        :param timeout: float: The maximal time of the check in seconds
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        # на Postgres - вiдставання вiд primary; реплiка, яка вже програла весь отриманий WAL, не вiдстає,
+        # навiть якщо останнiй запис на primary був давно
+        query = REPLICA_LAG_QUERY if self.engine.dialect.name == "postgresql" else "SELECT 0"
+        try:
+            lag = await asyncio.wait_for(self._scalar(query), timeout)
+            self.lag = float(lag or 0)
+            self.healthy = self.lag <= max_lag
+        except (asyncio.TimeoutError, exc.SQLAlchemyError, OSError) as err:
+            print(err)
+            self.healthy = False
+
+    async def _scalar(self, query: str):
+        async with self.engine.connect() as conn:
+            return await conn.scalar(text(query))
+
+    def pool_stats(self) -> dict:
+        return {"url": self.url, "healthy": self.healthy, "lag": self.lag, **_pool_state(self.engine.pool),
+                "waits": self.stats.as_dict(), "statements": self.statements.as_dict()}
 
 
 class DatabaseSessionManager:
-    def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
+    def __init__(self, url: str, replicas: Iterable[str] = (), **options):
+        options = options or engine_options(url)
+        self._engine: AsyncEngine | None = create_async_engine(url, **options)
         self._session_maker: async_sessionmaker = async_sessionmaker(autoflush=False, autocommit=False,
                                                                      bind=self._engine)
+        self.stats = PoolStats()
+        self._engine.pool.stats = self.stats
+        self.statements = StatementCacheStats(self._engine)
+        self.replicas = [Replica(replica, options) for replica in replicas]
+        self._next_replica = itertools.count()
+        # user_id користувачiв, чиї читання зараз iдуть на primary. Запис живе DB_READ_YOUR_WRITES_WINDOW,
+        # а розмiр обмежений: витiснений пiн однаково знайдеться в Redis
+        self._pinned = TTLCache(maxsize=config.DB_READ_YOUR_WRITES_CACHE_SIZE, ttl=config.DB_READ_YOUR_WRITES_WINDOW)
 
     @contextlib.asynccontextmanager
     async def session(self):
@@ -24,10 +241,159 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    def replica_session(self) -> AsyncSession:
+        """
+        The replica_session function opens the session of the next healthy replica (round robin).
+            When no replica is healthy, the session of the primary is returned.
+
+        :param self: Represent the instance of the class
+        :return: The new session, which the caller closes
+        :doc-author: Trelent
+        """
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return self._session_maker()
+        return healthy[next(self._next_replica) % len(healthy)].session_maker()
+
+    async def pin_primary(self, user_id: int, redis=redis_client):
+        """
+        The pin_primary function sends the reads of the user to the primary for DB_READ_YOUR_WRITES_WINDOW seconds
+            after the write of the user, so the user sees the own write, while the replicas catch up.
+            The pin is kept in this worker and in Redis for the other workers; without replicas it is not needed.
+
+        :param self: Represent the instance of the class
+        :param user_id: int: The id of the user, who wrote
+        :param redis: The Redis client
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        if not self.replicas:
+            return
+        window = config.DB_READ_YOUR_WRITES_WINDOW
+        self._pinned.set(user_id, True, window)
+        try:
+            await redis.set(f"{PIN_PREFIX}{user_id}", 1, px=int(window * 1000))
+        except RedisError as err:
+            print(err)
+
+    async def use_primary(self, user_id: int, redis=redis_client) -> bool:
+        """
+        The use_primary function decides, whether the reads of the user must go to the primary:
+            there is no healthy replica or the user has written within DB_READ_YOUR_WRITES_WINDOW.
+            When Redis is unavailable, the primary is chosen, because it is always up to date.
+
+        :param self: Represent the instance of the class
+        :param user_id: int: The id of the user
+        :param redis: The Redis client
+        :return: True for the primary, False for a replica
+        :doc-author: Trelent
+        """
+        if not any(replica.healthy for replica in self.replicas):
+            return True
+        if self._pinned.get(user_id):
+            return True
+        try:
+            return bool(await redis.exists(f"{PIN_PREFIX}{user_id}"))
+        except RedisError as err:
+            print(err)
+            return True
+
+    async def check_replicas(self):
+        """
+        The check_replicas function health-checks all replicas at once.
 
-sessionmanager = DatabaseSessionManager(config.DB_URL)
+        :param self: Represent the instance of the class
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        await asyncio.gather(*[replica.check(config.DB_REPLICA_MAX_LAG, config.DB_REPLICA_HEALTH_TIMEOUT)
+                               for replica in self.replicas])
+
+    def pool_stats(self) -> dict:
+        """
+        The pool_stats function reports the state of the pool of this worker
+        together with the histogram of the waits for a connection and the counters of the compiled statement cache,
+        and the same for every replica.
+
+        :param self: Represent the instance of the class
+        :return: A dict with the size, checked_out, checked_in, overflow, waits, statements and replicas
+        :doc-author: Trelent
+        """
+        return {**_pool_state(self._engine.pool), "waits": self.stats.as_dict(),
+                "statements": self.statements.as_dict(), "replicas": [replica.pool_stats() for replica in self.replicas]}
+
+
+sessionmanager = DatabaseSessionManager(config.DB_URL, config.DB_REPLICA_URLS)
 
 
 async def get_db():
     async with sessionmanager.session() as session:
         yield session
+
+
+async def acquire(session: AsyncSession, seconds: float):
+    """
+    The acquire function checks out the connection of the session from the pool in advance
+        and waits for it no longer than seconds. The timeout is counted in the stats of the pool
+        of the session: the primary or the replica.
+
+    :param session: AsyncSession: The session of the request
+    :param seconds: float: The maximal wait for a connection in seconds
+    :return: Nothing
+    :doc-author: Trelent
+    :raises HTTPException: 503 with Retry-After, when the pool has no free connection in time
+    """
+    try:
+        await asyncio.wait_for(session.connection(), seconds)
+    except (asyncio.TimeoutError, exc.TimeoutError) as err:
+        stats = getattr(getattr(session.bind, "pool", None), "stats", None)
+        # таймаут самого пулу вже врахував TimedQueuePool
+        if stats is not None and not isinstance(err, exc.TimeoutError):
+            stats.timeouts += 1
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=messages.DB_POOL_BUSY,
+                            headers={"Retry-After": "1"})
+
+
+class AcquireTimeout:
+    """
+    The AcquireTimeout class is the dependency of a route, which takes the connection of the request session
+        from the pool in advance and waits for it no longer than the timeout of the route:
+        when the pool is exhausted, the request fails fast with 503 instead of waiting DB_POOL_TIMEOUT.
+    """
+
+    def __init__(self, seconds: float):
+        """
+        The __init__ function sets the timeout of the route.
+
+        :param self: Represent the instance of the class
+        :param seconds: float: The maximal wait for a connection in seconds
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.seconds = seconds
+
+    async def __call__(self, db: AsyncSession = Depends(get_db)):
+        """
+        The __call__ function checks out the connection of the session of the route (get_db is cached per request).
+
+        :param self: Represent the instance of the class
+        :param db: AsyncSession: The session of the request
+        :return: Nothing
+        :doc-author: Trelent
+        :raises HTTPException: 503 with Retry-After, when the pool has no free connection in time
+        """
+        await acquire(db, self.seconds)
+
+
+async def watch_replicas(interval: float = config.DB_REPLICA_HEALTH_INTERVAL):
+    """
+    The watch_replicas function is the background task of a worker, which health-checks the replicas
+    every interval seconds and so takes them out of rotation and back.
+
+    :param interval: float: The pause between the checks in seconds
+    :return: Nothing, it runs until cancelled
+    :doc-author: Trelent
+    """
+    while sessionmanager.replicas:
+        await sessionmanager.check_replicas()
+        await asyncio.sleep(interval)
@@ -0,0 +1,21 @@
+import redis.asyncio as aioredis
+
+from src.conf.config import config
+
+
+# Один спiльний асинхронний пул з'єднань на воркер: його використовують i кеш <user> у [Auth], i [FastAPILimiter].
+# Таймаути обмежують, на скiльки повiльний Redis може затримати запит.
+redis_pool = aioredis.ConnectionPool(host=config.REDIS_DOMAIN, port=config.REDIS_PORT, db=0,
+                                     password=config.REDIS_PASSWORD,
+                                     max_connections=config.REDIS_MAX_CONNECTIONS,
+                                     socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+                                     socket_connect_timeout=config.REDIS_CONNECT_TIMEOUT,)
+
+redis_client = aioredis.Redis(connection_pool=redis_pool)
+
+# Окреме з'єднання для pub/sub: пiдписка довго чекає на повiдомлення, тож <socket_timeout> тут вимкнено,
+# а живучiсть з'єднання перевiряє <health_check_interval>
+redis_pubsub_client = aioredis.Redis(host=config.REDIS_DOMAIN, port=config.REDIS_PORT, db=0,
+                                     password=config.REDIS_PASSWORD,
+                                     socket_connect_timeout=config.REDIS_CONNECT_TIMEOUT,
+                                     health_check_interval=30,)
@@ -5,14 +5,31 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, Integer, ForeignKey, DateTime, func, Enum
 from sqlalchemy.orm import DeclarativeBase
 
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, DateTime, func, Enum
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, DateTime, func, Enum, Index, DDL, event
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from sqlalchemy.ext.declarative import declarative_base
 
 
 Base = declarative_base()
 
 
+def birthday_ordinal(birth_date: date) -> int:
+    """
+    The birthday_ordinal function turns the birth date into the number month * 100 + day, e.g. 31 January -> 131.
+        The number does not depend on the year, so the upcoming birthdays are a range of the indexed column.
+
+    :param birth_date: date: The birth date of the contact
+    :return: The birthday ordinal
+    :doc-author: Trelent
+    """
+    return birth_date.month * 100 + birth_date.day
+
+
+def _default_birthday_ordinal(context) -> int:
+    # для Core INSERT, що оминають ORM (i, вiдповiдно, @validates нижче)
+    return birthday_ordinal(context.get_current_parameters()['birth_date'])
+
+
 class Contact(Base):
     __tablename__ = 'contacts'
 
@@ -22,13 +39,71 @@ class Contact(Base):
     email = Column(String(64), unique=True, nullable=False, index=True)
     phone_number = Column(String(24), nullable=False, index=True)
     birth_date = Column(Date, nullable=False, index=True)
+    # month * 100 + day з <birth_date>, тримається у синхронi при кожному записi <birth_date>
+    birthday_ordinal = Column(Integer, nullable=False, index=True, default=_default_birthday_ordinal)
     crm_status = Column(String, default='operational')
+    # лiчильник змiн для оптимiстичного блокування: кожен UPDATE контакту збiльшує його на 1
+    version = Column(Integer, nullable=False, default=1, server_default='1')
     created_at: Mapped[date] = mapped_column('created_at', DateTime, default=func.now(), nullable=True)
     updated_at: Mapped[date] = mapped_column('updated_at', DateTime, default=func.now(), onupdate=func.now(),
                                              nullable=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=True)
     user: Mapped["User"] = relationship("User", backref="contacts", lazy="joined")
 
+    # складенi iндекси для keyset-пагiнацiї: сторiнка користувача читається з iндексу по (user_id, id)
+    # або (user_id, created_at, id) без сканування пропущених рядкiв
+    __table_args__ = (
+        Index('ix_contacts_user_id_id', 'user_id', 'id'),
+        Index('ix_contacts_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        # trigram GIN iндекси (pg_trgm) обслуговують ilike('%q%'), з яким звичайний B-tree не допоможе
+        Index('ix_contacts_first_name_trgm', 'first_name', postgresql_using='gin',
+              postgresql_ops={'first_name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_contacts_last_name_trgm', 'last_name', postgresql_using='gin',
+              postgresql_ops={'last_name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_contacts_email_trgm', 'email', postgresql_using='gin',
+              postgresql_ops={'email': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+
+    @validates('birth_date')
+    def validate_birth_date(self, key, value):
+        # у юнiт-тестах контакти iнодi створюються з рядковою датою, яка не потрапляє до БД
+        if isinstance(value, date):
+            self.birthday_ordinal = birthday_ordinal(value)
+        return value
+
+
+# Пошуковий бекенд: на Postgres - розширення pg_trgm, на SQLite - FTS5 таблиця з trigram токенайзером,
+# яку тригери тримають у синхронi з <contacts>. Тi ж самi DDL виконує мiграцiя b7e4f0a2c913.
+CONTACTS_SEARCH_DDL = {
+    'postgresql': [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    ],
+    'sqlite': [
+        "DROP TABLE IF EXISTS contacts_fts",
+        "CREATE VIRTUAL TABLE contacts_fts USING fts5(first_name, last_name, email, content='contacts', "
+        "content_rowid='id', tokenize='trigram')",
+        "CREATE TRIGGER IF NOT EXISTS contacts_fts_ai AFTER INSERT ON contacts BEGIN "
+        "INSERT INTO contacts_fts(rowid, first_name, last_name, email) "
+        "VALUES (new.id, new.first_name, new.last_name, new.email); END",
+        "CREATE TRIGGER IF NOT EXISTS contacts_fts_ad AFTER DELETE ON contacts BEGIN "
+        "INSERT INTO contacts_fts(contacts_fts, rowid, first_name, last_name, email) "
+        "VALUES ('delete', old.id, old.first_name, old.last_name, old.email); END",
+        "CREATE TRIGGER IF NOT EXISTS contacts_fts_au AFTER UPDATE OF first_name, last_name, email ON contacts BEGIN "
+        "INSERT INTO contacts_fts(contacts_fts, rowid, first_name, last_name, email) "
+        "VALUES ('delete', old.id, old.first_name, old.last_name, old.email); "
+        "INSERT INTO contacts_fts(rowid, first_name, last_name, email) "
+        "VALUES (new.id, new.first_name, new.last_name, new.email); END",
+        "INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')",
+    ],
+}
+
+# розширення має з'явитися до того, як будуть створенi iндекси з gin_trgm_ops
+event.listen(Contact.__table__, 'before_create',
+             DDL(CONTACTS_SEARCH_DDL['postgresql'][0]).execute_if(dialect='postgresql'))
+for statement in CONTACTS_SEARCH_DDL['sqlite']:
+    event.listen(Contact.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(Contact.__table__, 'before_drop', DDL("DROP TABLE IF EXISTS contacts_fts").execute_if(dialect='sqlite'))
+
 
 class Role(enum.Enum):
     admin: str = "admin"
@@ -1,46 +1,95 @@
-from datetime import datetime, timedelta
+import calendar
+from datetime import date, datetime, timedelta
 from fastapi import HTTPException
-from sqlalchemy import Date, func, select, and_, or_
+from sqlalchemy import Date, Integer, func, select, insert, update, delete, and_, or_, any_, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.entity.models import Contact, User
-from src.schemas.contact import ContactSchema, ContactResponseSchema
+from src.database.db import sessionmanager
+from src.entity.models import Contact, User, birthday_ordinal
+from src.schemas.contact import ContactSchema, ContactResponseSchema, ContactBulkFilterSchema, ContactPatchSchema
+from src.services.list_cache import bump_list_version
+from src.services.pagination import paginate
+from src.services.search import search_statement, dialect_name
 
+# колонки [ContactResponseSchema] + <version> для ETag. Читання та INSERT / UPDATE / DELETE ... RETURNING
+# повертають саме їх легкими рядками, а не сутнiсть [Contact]: для неї ORM приєднав би users (lazy="joined"),
+# створив би [User] на кожен рядок i тримав би всi об'єкти в identity map сесiї
+RESPONSE_COLUMNS = (Contact.id, Contact.first_name, Contact.last_name, Contact.email, Contact.phone_number,
+                     Contact.birth_date, Contact.crm_status, Contact.created_at, Contact.updated_at, Contact.version)
 
-async def get_contacts(limit: int, offset: int, db: AsyncSession, user: User):
+# гарячi запити будуються один раз з параметрами bindparam: [sqlalchemy] запам'ятовує cache key на самому
+# об'єктi запиту, а скомпiльований SQL бере з кешу engine (query_cache_size), тож на виклик лишається
+# тiльки пiдстановка параметрiв. Запити, форма яких залежить вiд аргументiв (пагiнацiя, пошук, bulk),
+# будуються як i ранiше - їх скомпiльована форма однаково потрапляє в кеш за структурою
+CONTACT_BY_ID = select(*RESPONSE_COLUMNS).where(Contact.id == bindparam("contact_id"),
+                                                Contact.user_id == bindparam("owner_id"))
+CONTACT_VERSION = select(Contact.version).where(Contact.id == bindparam("contact_id"),
+                                                Contact.user_id == bindparam("owner_id"))
+# iмена параметрiв UPDATE не можуть збiгатися з назвами колонок, тому <owner_id> i <new_...>
+UPDATE_CONTACT = (update(Contact).where(Contact.id == bindparam("contact_id"), Contact.user_id == bindparam("owner_id"))
+                  .values(first_name=bindparam("new_first_name"), last_name=bindparam("new_last_name"),
+                          email=bindparam("new_email"), phone_number=bindparam("new_phone_number"),
+                          birth_date=bindparam("new_birth_date"), birthday_ordinal=bindparam("new_birthday_ordinal"),
+                          crm_status=bindparam("new_crm_status"), version=Contact.version + 1)
+                  .returning(*RESPONSE_COLUMNS)
+                  .execution_options(synchronize_session=False))
+# If-Match: список версiй - один розгортуваний параметр, тож SQL у кешi не залежить вiд його довжини
+UPDATE_CONTACT_IF_MATCH = UPDATE_CONTACT.where(Contact.version.in_(bindparam("versions", expanding=True)))
+DELETE_CONTACT = (delete(Contact).where(Contact.id == bindparam("contact_id"), Contact.user_id == bindparam("owner_id"))
+                  .returning(*RESPONSE_COLUMNS)
+                  .execution_options(synchronize_session=False))
+_BIRTHDAY_ORDER = (Contact.birthday_ordinal < bindparam("start_ordinal"), Contact.birthday_ordinal, Contact.id)
+CONTACTS_BY_BIRTHDAY = (select(*RESPONSE_COLUMNS)
+                        .where(Contact.birthday_ordinal.between(bindparam("start_ordinal"), bindparam("end_ordinal")))
+                        .order_by(*_BIRTHDAY_ORDER))
+# вiкно переходить через новий рiк: спочатку кiнець цього року, потiм початок наступного
+CONTACTS_BY_BIRTHDAY_NEW_YEAR = (select(*RESPONSE_COLUMNS)
+                                 .where(or_(Contact.birthday_ordinal >= bindparam("start_ordinal"),
+                                            Contact.birthday_ordinal <= bindparam("end_ordinal")))
+                                 .order_by(*_BIRTHDAY_ORDER))
+
+
+async def get_contacts(limit: int, offset: int, db: AsyncSession, user: User, cursor: str | None = None,
+                       sort: str = "id"):
     """
     The get_contacts function returns a list of contacts for the user.
+        If the cursor is given, the page is read with keyset pagination and the offset is ignored.
     
     :param limit: int: Limit the number of results returned
     :param offset: int: Specify the number of records to skip before returning results
     :param db: AsyncSession: Pass the database session into the function
     :param user: User: Filter the contacts by user
-    :return: A list of contacts
+    :param cursor: str | None: The cursor of the next page
+    :param sort: str: The sort key of the page, id or created_at
+    :return: A list of the contact rows with RESPONSE_COLUMNS
     :doc-author: Trelent
     """
-    # user=user це посиланя на властивiсть класу [Contact] -> Contact.user; оскiльки у функцiю заходить модель User
-    # то [sqlalchemy] зрозумiє цю властивiсть через Mapped["User"] = relationship("User", ... 
-    # АЛЕ, можна скористатися й таким записом user_id = user.id  
-    statement = select(Contact).filter_by(user=user).offset(offset).limit(limit)
+    # фiльтруємо за user_id = user.id, а не user=user: з кешу приходить не ORM-модель [User],
+    # а її знiмок [UserSnapshot], який [sqlalchemy] не вмiє порiвнювати зi зв'язком Contact.user
+    statement = paginate(select(*RESPONSE_COLUMNS).where(Contact.user_id == user.id), limit, offset, cursor, sort)
     contacts = await db.execute(statement)
-    return contacts.scalars().all()
+    return contacts.all()
 
 
-async def get_contacts_all(limit: int, offset: int, db: AsyncSession):
+async def get_contacts_all(limit: int, offset: int, db: AsyncSession, cursor: str | None = None, sort: str = "id"):
     """
     The get_contacts_all function returns a list of all contacts in the database.
     The limit and offset parameters are used to paginate the results.
+    If the cursor is given, the page is read with keyset pagination and the offset is ignored.
     
     
     :param limit: int: Limit the number of results returned
     :param offset: int: Set the offset for the query
     :param db: AsyncSession: Pass the database session to the function
-    :return: A list of contact objects
+    :param cursor: str | None: The cursor of the next page
+    :param sort: str: The sort key of the page, id or created_at
+    :return: A list of the contact rows with RESPONSE_COLUMNS
     :doc-author: Trelent
     """
-    statement = select(Contact).offset(offset).limit(limit)
+    statement = paginate(select(*RESPONSE_COLUMNS), limit, offset, cursor, sort)
     contacts = await db.execute(statement)
-    return contacts.scalars().all()
+    return contacts.all()
 
 
 async def get_contact(contact_id: int, db: AsyncSession, user: User):
@@ -52,12 +101,26 @@ async def get_contact(contact_id: int, db: AsyncSession, user: User):
     :param contact_id: int: Get the contact with that id
     :param db: AsyncSession: Pass the database session to the function
     :param user: User: Get the user object from the database
-    :return: A contact object
+    :return: The contact row with RESPONSE_COLUMNS or None
     :doc-author: Trelent
     """
-    statement = select(Contact).filter_by(id=contact_id, user=user)
-    contact = await db.execute(statement)
-    return contact.scalar_one_or_none()
+    contact = await db.execute(CONTACT_BY_ID, {"contact_id": contact_id, "owner_id": user.id})
+    return contact.one_or_none()
+
+
+async def get_contact_version(contact_id: int, db: AsyncSession, user: User) -> int | None:
+    """
+    The get_contact_version function reads only the version of the contact,
+        which is enough to answer the conditional request without loading the whole row and the joined user.
+    
+    :param contact_id: int: Get the contact with that id
+    :param db: AsyncSession: Pass the database session to the function
+    :param user: User: The owner of the contact
+    :return: The version of the contact or None, if there is no such contact
+    :doc-author: Trelent
+    """
+    params = {"contact_id": contact_id, "owner_id": user.id}
+    return (await db.execute(CONTACT_VERSION, params)).scalar_one_or_none()
 
 
 async def create_contact(body: ContactSchema, db: AsyncSession, user: User):
@@ -67,23 +130,119 @@ async def create_contact(body: ContactSchema, db: AsyncSession, user: User):
     :param body: ContactSchema: Validate the request body
     :param db: AsyncSession: Access the database
     :param user: User: Get the user id from the request
-    :return: A contact object
+    :return: The row of the new contact with RESPONSE_COLUMNS
     :doc-author: Trelent
     """
     # Метод [model_dump()] у Pydantic моделях використовується для перетворення моделі на словник.
     # (first_name=body.first_name, last_name=body.last_name, ...)
     # Параметр <exclude_unset> = True вказує, що в результуючий словник повинні бути включені тільки поля,
     # які були встановлені (тобто не мають значення за замовчуванням).
-    contact = Contact(**body.model_dump(exclude_unset=True), user=user)
-    db.add(contact)
+    # INSERT ... RETURNING одразу повертає рядок з id та значеннями за замовчуванням,
+    # тож refresh() (ще один SELECT з JOIN users) не потрiбен. <birthday_ordinal> заповнює default колонки.
+    statement = (insert(Contact).values(**body.model_dump(exclude_unset=True), user_id=user.id)
+                 .returning(*RESPONSE_COLUMNS))
+    contact = (await db.execute(statement)).one()
     await db.commit()
-    await db.refresh(contact)
+    # закешованi сторiнки списку контактiв користувача бiльше не актуальнi
+    await bump_list_version(user.id)
+    await sessionmanager.pin_primary(user.id)
     return contact
 
 
-async def update_contact(contact_id: int, body: ContactSchema, db: AsyncSession, user: User):
+async def create_contacts_bulk(bodies: list[ContactSchema], db: AsyncSession, user: User) -> set[str]:
+    """
+    The create_contacts_bulk function inserts the chunk of contacts with one multi-row INSERT ... ON CONFLICT (email)
+        DO NOTHING and commits it. The contacts, whose email already exists, are skipped.
+    
+    :param bodies: list[ContactSchema]: The validated contacts of the chunk
+    :param db: AsyncSession: Access the database
+    :param user: User: The owner of the contacts
+    :return: The emails of the inserted contacts
+    :doc-author: Trelent
+    """
+    if not bodies:
+        return set()
+    # <email> унiкальний для всiєї таблицi, тож DO UPDATE перезаписав би чужий контакт - конфлiкт лише пропускаємо.
+    # <birthday_ordinal> заповнює default колонки, бо Core INSERT оминає @validates моделi.
+    insert = postgresql.insert if dialect_name(db) == 'postgresql' else sqlite.insert
+    statement = insert(Contact).on_conflict_do_nothing(index_elements=[Contact.email]).returning(Contact.email)
+    # executemany з RETURNING SQLAlchemy збирає у multi-row INSERT ... VALUES (...), (...) ("insertmanyvalues")
+    rows = [{**body.model_dump(exclude_unset=True), "user_id": user.id} for body in bodies]
+    inserted = set((await db.execute(statement, rows)).scalars())
+    await db.commit()
+    if inserted:
+        await bump_list_version(user.id)
+        await sessionmanager.pin_primary(user.id)
+    return inserted
+
+
+def _bulk_where(where: ContactBulkFilterSchema, db: AsyncSession, user: User) -> list:
+    conditions = [Contact.user_id == user.id]
+    if where.ids is not None:
+        # на Postgres список id передається одним параметром-масивом: id = ANY(:ids),
+        # тож текст запиту (i його план у кешi) не залежить вiд довжини списку
+        if dialect_name(db) == 'postgresql':
+            conditions.append(Contact.id == any_(bindparam('ids', where.ids, type_=postgresql.ARRAY(Integer))))
+        else:
+            conditions.append(Contact.id.in_(where.ids))
+    if where.crm_status is not None:
+        conditions.append(Contact.crm_status == where.crm_status)
+    return conditions
+
+
+async def update_contacts_bulk(where: ContactBulkFilterSchema, values: ContactPatchSchema, db: AsyncSession,
+                               user: User) -> int:
+    """
+    The update_contacts_bulk function sets the given fields of all contacts of the user, which match the filter,
+        with one UPDATE ... WHERE user_id = :uid AND ... statement.
+    
+    :param where: ContactBulkFilterSchema: The ids and / or the status of the contacts
+    :param values: ContactPatchSchema: The fields to set
+    :param db: AsyncSession: Access the database
+    :param user: User: The owner of the contacts
+    :return: The number of the updated contacts
+    :doc-author: Trelent
+    """
+    fields = values.model_dump(exclude_none=True)
+    if 'birth_date' in fields:
+        # UPDATE оминає @validates моделi, тож <birthday_ordinal> оновлюється явно
+        fields['birthday_ordinal'] = birthday_ordinal(fields['birth_date'])
+    statement = (update(Contact).where(*_bulk_where(where, db, user)).values(**fields, version=Contact.version + 1)
+                 .execution_options(synchronize_session=False))
+    result = await db.execute(statement)
+    await db.commit()
+    if result.rowcount:
+        await bump_list_version(user.id)
+        await sessionmanager.pin_primary(user.id)
+    return result.rowcount
+
+
+async def delete_contacts_bulk(where: ContactBulkFilterSchema, db: AsyncSession, user: User) -> int:
+    """
+    The delete_contacts_bulk function deletes all contacts of the user, which match the filter,
+        with one DELETE ... WHERE user_id = :uid AND ... statement.
+    
+    :param where: ContactBulkFilterSchema: The ids and / or the status of the contacts
+    :param db: AsyncSession: Access the database
+    :param user: User: The owner of the contacts
+    :return: The number of the deleted contacts
+    :doc-author: Trelent
+    """
+    statement = delete(Contact).where(*_bulk_where(where, db, user)).execution_options(synchronize_session=False)
+    result = await db.execute(statement)
+    await db.commit()
+    if result.rowcount:
+        await bump_list_version(user.id)
+        await sessionmanager.pin_primary(user.id)
+    return result.rowcount
+
+
+async def update_contact(contact_id: int, body: ContactSchema, db: AsyncSession, user: User,
+                         versions: list[int] | None = None):
     """
     The update_contact function updates a contact in the database.
+        The contact is changed with one conditional UPDATE ... RETURNING, which also increments its version;
+        if the versions are given (If-Match), the row is updated only when its current version is one of them.
         Args:
             contact_id (int): The id of the contact to update.
             body (ContactSchema): A ContactSchema object containing all of the information for updating a Contact object.  This is passed as JSON data in an HTTP request body, and it is deserialized into this schema by Pydantic before being passed to this function.  See models/contact_schema for more details on what fields are required or optional when creating or updating contacts via ReST API calls.
@@ -92,21 +251,23 @@ async def update_contact(contact_id: int, body: ContactSchema, db: AsyncSession,
     :param body: ContactSchema: Get the information from the body of the request
     :param db: AsyncSession: Pass the database session to the function
     :param user: User: Ensure that the user can only update their own contacts
-    :return: The contact object
+    :param versions: list[int] | None: The expected versions of the contact, None - any version
+    :return: The row of the updated contact with RESPONSE_COLUMNS or None, if the contact is not found or its version does not match
     :doc-author: Trelent
     """
-    statement = select(Contact).filter_by(id=contact_id, user=user)
-    result = await db.execute(statement)
-    contact = result.scalar_one_or_none()
+    # UPDATE оминає @validates моделi, тож <birthday_ordinal> рахується явно
+    params = {"contact_id": contact_id, "owner_id": user.id, "new_first_name": body.first_name,
+              "new_last_name": body.last_name, "new_email": body.email, "new_phone_number": body.phone_number,
+              "new_birth_date": body.birth_date, "new_birthday_ordinal": birthday_ordinal(body.birth_date),
+              "new_crm_status": body.crm_status}
+    statement = UPDATE_CONTACT
+    if versions is not None:
+        statement, params["versions"] = UPDATE_CONTACT_IF_MATCH, versions
+    contact = (await db.execute(statement, params)).one_or_none()
+    await db.commit()
     if contact:
-        contact.first_name = body.first_name
-        contact.last_name = body.last_name
-        contact.email = body.email
-        contact.phone_number = body.phone_number
-        contact.birth_date = body.birth_date
-        contact.crm_status = body.crm_status
-        await db.commit()
-        await db.refresh(contact)
+        await bump_list_version(user.id)
+        await sessionmanager.pin_primary(user.id)
     return contact
 
 
@@ -117,15 +278,15 @@ async def delete_contact(contact_id: int, db: AsyncSession, user: User):
     :param contact_id: int: Specify the contact to delete
     :param db: AsyncSession: Pass the database session into the function
     :param user: User: Pass the user object to the function
-    :return: A contact object
+    :return: The row of the deleted contact with RESPONSE_COLUMNS or None
     :doc-author: Trelent
     """
-    statement = select(Contact).filter_by(id=contact_id, user=user)
-    contact = await db.execute(statement)
-    contact = contact.scalar_one_or_none()
+    # DELETE ... RETURNING видаляє та повертає контакт за один запит, без попереднього SELECT
+    contact = (await db.execute(DELETE_CONTACT, {"contact_id": contact_id, "owner_id": user.id})).one_or_none()
     if contact:
-        await db.delete(contact)
         await db.commit()
+        await bump_list_version(user.id)
+        await sessionmanager.pin_primary(user.id)
     return contact
 
 
@@ -138,13 +299,13 @@ async def search_contact_by_firstname(contact_first_name: str, db: AsyncSession)
     
     :param contact_first_name: str: Pass the contact first name to search for
     :param db: AsyncSession: Pass the database session to the function
-    :return: A list of contact objects
+    :return: A list of the contact rows with RESPONSE_COLUMNS
     :doc-author: Trelent
     """
-    statement = select(Contact).where(Contact.first_name.ilike(f'%{contact_first_name}%'))
+    statement = search_statement(["first_name"], contact_first_name, dialect_name(db), RESPONSE_COLUMNS)
     result = await db.execute(statement)
     if result:
-        return result.scalars().all()
+        return result.all()
     # raise ValueError("204 No Content. The Search did not get results.")
     raise HTTPException(status_code=204, detail="No Content. The Search did not get results.")
 
@@ -158,13 +319,13 @@ async def search_contact_by_lastname(contact_last_name: str, db: AsyncSession):
     
     :param contact_last_name: str: Search for a contact by last name
     :param db: AsyncSession: Pass the database session to the function
-    :return: A list of contact objects
+    :return: A list of the contact rows with RESPONSE_COLUMNS
     :doc-author: Trelent
     """
-    statement = select(Contact).where(Contact.last_name.ilike(f'%{contact_last_name}%'))
+    statement = search_statement(["last_name"], contact_last_name, dialect_name(db), RESPONSE_COLUMNS)
     result = await db.execute(statement)
     if result:
-        return result.scalars().all()
+        return result.all()
     # raise ValueError("204 No Content. The Search did not get results.")
     raise HTTPException(status_code=204, detail="No Content. The Search did not get results.")
 
@@ -177,13 +338,13 @@ async def search_contact_by_email(contact_email: str, db: AsyncSession):
     
     :param contact_email: str: Pass the email to search for
     :param db: AsyncSession: Pass the database session to the function
-    :return: A list of contacts
+    :return: A list of the contact rows with RESPONSE_COLUMNS
     :doc-author: Trelent
     """
-    statement = select(Contact).where(Contact.email.ilike(f'%{contact_email}%'))
+    statement = search_statement(["email"], contact_email, dialect_name(db), RESPONSE_COLUMNS)
     result = await db.execute(statement)
     if result:
-        return result.scalars().all()
+        return result.all()
     # raise ValueError("204 No Content. The Search did not get results.")
     raise HTTPException(status_code=204, detail="No Content. The Search did not get results.")
 
@@ -191,55 +352,64 @@ async def search_contact_by_email(contact_email: str, db: AsyncSession):
 async def search_contact_complex(query: str, db: AsyncSession):
     """
     The search_contact_complex function is a complex search function that searches for contacts by first name, last name, and email.
-    It takes in a query string and an AsyncSession object as parameters. It returns the result of the database query.
+    It takes in a query string and an AsyncSession object as parameters. It returns the result of the database query,
+    the most relevant contacts go first.
     
     :param query: str: Search for contacts that have a first name, last name or email
     :param db: AsyncSession: Pass the database session to the function
-    :return: A list of contact objects
+    :return: A list of the contact rows with RESPONSE_COLUMNS
     :doc-author: Trelent
     """
-    statement = select(Contact).where(or_(
-        Contact.first_name.ilike(f'%{query}%'),
-        Contact.last_name.ilike(f'%{query}%'),
-        Contact.email.ilike(f'%{query}%')
-    ))
+    statement = search_statement(["first_name", "last_name", "email"], query, dialect_name(db), RESPONSE_COLUMNS)
     result = await db.execute(statement)
-    return result.scalars().all()
+    return result.all()
 
 
 """ У FastAPI є спеціальні класи і функції для повернення помилок користувача і їх відображення в Swagger.
     Щоб повернути помилку користувача з кодом відповіді <422> (Unprocessable Entity) і відповідним повідомленням,
     можна використати клас [HTTPException] з FastAPI. """
 
-async def search_contact_by_birthdate(forward_shift_days: int, db: AsyncSession):
+def birthday_window(current_date: date, forward_shift_days: int) -> tuple[int, int]:
+    """
+    The birthday_window function returns the first and the last birthday ordinal (month * 100 + day)
+    of the window, which starts at current_date and lasts forward_shift_days days.
+        If the window crosses the new year, the first ordinal is greater than the last one.
+        In a common year the contacts born on 29 February celebrate on 28 February,
+        so the window, which ends on 28 February, also takes the ordinal 229.
+    
+    :param current_date: date: The first day of the window
+    :param forward_shift_days: int: The number of days to shift forward
+    :return: The first and the last birthday ordinal of the window
+    :doc-author: Trelent
+    """
+    end_of_shift_date = current_date + timedelta(forward_shift_days)
+    start_ordinal = birthday_ordinal(current_date)
+    end_ordinal = birthday_ordinal(end_of_shift_date)
+    if end_ordinal == 228 and not calendar.isleap(end_of_shift_date.year):
+        end_ordinal = 229
+    return start_ordinal, end_ordinal
+
+
+async def search_contact_by_birthdate(forward_shift_days: int, db: AsyncSession, current_date: date | None = None):
     """
     The search_contact_by_birthdate function searches for contacts whose birthdays are within the next &lt;forward_shift_days&gt; days.
-    The function returns a list of Contact objects that match the search criteria.
+    The function returns a list of Contact objects that match the search criteria, the nearest birthdays go first.
+    The search is a range over the indexed Contact.birthday_ordinal column (two ranges, if the window crosses the new year).
     
     :param forward_shift_days: int: Specify the number of days to shift forward from today
     :param db: AsyncSession: Pass the database connection to the function
-    :return: A list of contact objects
+    :param current_date: date | None: The first day of the window, today by default
+    :return: A list of the contact rows with RESPONSE_COLUMNS
     :doc-author: Trelent
     """
     if forward_shift_days > 364:
         # raise ValueError("The <forward_shift_days> parameter should be 364 or less.")
         raise HTTPException(status_code=422, detail="The <forward_shift_days> parameter should be 364 or less.")
-    current_date = datetime.now().date()
-    end_of_shift_date = current_date + timedelta(forward_shift_days)
-    # statement = select(Contact).where(between(Contact.birth_date, current_date, end_of_shift_date))
-    # statement = select(Contact).where(Contact.birth_date.between(current_date, end_of_shift_date))
-    # statement = select(Contact).where(and_(func.extract("month", Contact.birth_date) == current_date.month,
-    #                                     func.extract("day", Contact.birth_date) >= current_date.day,
-    #                                     func.extract("day", Contact.birth_date) <= end_of_shift_date.day))
-    # if current_date.year == end_of_shift_date.year:
-    statement = select(Contact).where(or_(
-                and_(func.extract("month", Contact.birth_date) == current_date.month,
-                    func.extract("day", Contact.birth_date) >= current_date.day,),
-                and_(func.extract("month", Contact.birth_date) <= end_of_shift_date.month,
-                    func.extract("day", Contact.birth_date) <= end_of_shift_date.day)))
-
-    result = await db.execute(statement)
+    current_date = current_date or datetime.now().date()
+    start_ordinal, end_ordinal = birthday_window(current_date, forward_shift_days)
+    statement = CONTACTS_BY_BIRTHDAY if start_ordinal <= end_ordinal else CONTACTS_BY_BIRTHDAY_NEW_YEAR
+    result = await db.execute(statement, {"start_ordinal": start_ordinal, "end_ordinal": end_ordinal})
     if result:
-        return result.scalars().all()
+        return result.all()
     # raise ValueError("204 No Content. The Search did not get results.")
     raise HTTPException(status_code=204, detail="No Content. The Search did not get results.")
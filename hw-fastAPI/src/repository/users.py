@@ -1,11 +1,17 @@
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from libgravatar import Gravatar
 
 from src.database.db import get_db
 from src.entity.models import User
 from src.schemas.user import UserSchema
+from src.services.user_cache import invalidate_user
+
+# get_user_by_email виконується майже на кожен запит (src/services/auth.py), тож запит будується один раз:
+# його cache key [sqlalchemy] запам'ятовує на самому об'єктi, а скомпiльований SQL береться з кешу engine,
+# змiнюється лише параметр <email>
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
 
 
 async def get_user_by_email(email: str, db: AsyncSession = Depends(get_db)):
@@ -18,8 +24,7 @@ async def get_user_by_email(email: str, db: AsyncSession = Depends(get_db)):
     :return: A user object
     :doc-author: Trelent
     """
-    statement = select(User).filter_by(email=email)
-    user = await db.execute(statement)
+    user = await db.execute(USER_BY_EMAIL, {"email": email})
     user = user.scalar_one_or_none()
     return user
 
@@ -59,6 +64,8 @@ async def update_token(user: User, token: str | None, db: AsyncSession):
     """
     user.refresh_token = token
     await db.commit()
+    # закешований <user> мiстить старий <refresh_token> - скидаємо його в усiх воркерах
+    await invalidate_user(user.email)
 
 
 # async def confirmed_email(email: str, db: AsyncSession) -> None:
@@ -82,6 +89,7 @@ async def confirmed_email(email: str, db: AsyncSession) -> None:
         user.confirmed = True
         await db.commit()
         await db.refresh(user)
+        await invalidate_user(email)
     else:
         raise ValueError("User not found for email: {}".format(email))
     
@@ -104,4 +112,5 @@ async def update_avatar_url(email: str, url: str | None, db: AsyncSession) -> Us
     user.avatar = url
     await db.commit()
     await db.refresh(user)
+    await invalidate_user(email)
     return user
\ No newline at end of file
@@ -32,6 +32,11 @@ router = APIRouter(prefix='/auth', tags=['auth'])
 get_refresh_token = HTTPBearer()
 
 
+def client_ip(request: Request) -> str | None:
+    # черга bcrypt дiлиться мiж клiєнтами за IP, тож одне джерело перебору паролiв не займає її цiлком
+    return request.client.host if request.client else None
+
+
 # Email про підтвердження рестрації відправляється тут за допомогою класу [BackgroundTasks]
 @router.post("/signup", response_model=UserResponseSchema, status_code=status.HTTP_201_CREATED)
 async def signup(body: UserSchema, bg_task: BackgroundTasks, request: Request, db: AsyncSession = Depends(get_db)):
@@ -50,7 +55,8 @@ async def signup(body: UserSchema, bg_task: BackgroundTasks, request: Request, d
     exist_user = await rep_users.get_user_by_email(body.email, db)
     if exist_user:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=messages.ACCOUNT_EXIST)
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.get_password_hash_async(body.password, ip=client_ip(request),
+                                                               account=body.email.lower())
     new_user = await rep_users.create_user(body, db)
     # TODO send email notification
     # Функція [send_email()] приймає <user.email>, <user.username> та <host>. <host> потрібно взяти з класу Request ->
@@ -60,12 +66,13 @@ async def signup(body: UserSchema, bg_task: BackgroundTasks, request: Request, d
 
 
 @router.post("/login", response_model=TokenSchema)
-async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+async def login(request: Request, body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """
     The login function is used to authenticate a user.
     It takes the username and password from the request body,
     and returns an access token if successful.
     
+    :param request: Request: Get the IP of the client for the hashing queue
     :param body: OAuth2PasswordRequestForm: Get the username and password from the request body
     :param db: AsyncSession: Get a database session
     :return: A dict with the access_token and refresh_token
@@ -78,7 +85,8 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession =
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.WRONG_CREDENTIALS)
     if not user.confirmed:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.EMAIL_NOT_CONFIRMED)
-    if not auth_service.verify_password(body.password, user.password):
+    if not await auth_service.verify_password_async(body.password, user.password, ip=client_ip(request),
+                                                    account=user.email.lower()):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.WRONG_CREDENTIALS)
     # Generate JWT
     access_token = await auth_service.create_access_token(data={"sub": user.email, "DB-class": "PSQL"})
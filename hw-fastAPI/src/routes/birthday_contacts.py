@@ -8,17 +8,21 @@ from src.repository import contacts as rep_contacts
 from src.schemas.contact import ContactSchema, ContactUpdateSchema, ContactResponseSchema
 from src.services.auth import auth_service
 from src.services.roles import RoleAccess
+from src.services.serializers import contacts_serializer
+from src.services.negotiation import NegotiatedRoute
+from src.services.replicas import read_db
 
-router = APIRouter(prefix='/birthday', tags=['birthday'])
+router = APIRouter(prefix='/birthday', tags=['birthday'], route_class=NegotiatedRoute)
 
 # Цей функтор буде пропускати тiльки тi запити, ролi в користувачiв яких спiвпадають
 access_elevated = RoleAccess([Role.admin, Role.moderator])
 
 
 # Знайдена міцна залежність між шляхом {shift_days} та назвою змінної у функції -> search_contact_by_birthdate(shift_days, ... 
-@router.get("/{shift_days}", response_model=list[ContactResponseSchema], dependencies=[Depends(access_elevated)])
+@router.get("/{shift_days}", response_model=list[ContactResponseSchema],
+            dependencies=[Depends(access_elevated)])
 async def search_contact_by_birthdate(shift_days: int = Path(..., description="Кількість найближчих днів у запитi"),
-                                      db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)):
+                                      db: AsyncSession = Depends(read_db), user: User = Depends(auth_service.get_current_user)):
     """
     The search_contact_by_birthdate function is used to search contacts by birthdate.
         The function takes a shift_days parameter, which is the number of days from today's date.
@@ -32,4 +36,4 @@ async def search_contact_by_birthdate(shift_days: int = Path(..., description="
     :doc-author: Trelent
     """
     contacts = await rep_contacts.search_contact_by_birthdate(shift_days, db)
-    return contacts
\ No newline at end of file
+    return contacts_serializer.response(contacts)
\ No newline at end of file
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Path, Query
-from fastapi_limiter.depends import RateLimiter
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Depends, status, Path, Query, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.repository import contacts as rep_contacts
 from src.entity.models import User, Role
-from src.schemas.contact import ContactSchema, ContactUpdateSchema, ContactResponseSchema
+from src.schemas.contact import (ContactSchema, ContactUpdateSchema, ContactResponseSchema, BulkImportResponseSchema,
+                                 ContactBulkFilterSchema, ContactBulkUpdateSchema, BulkAffectedSchema)
 from src.services.auth import auth_service
 from src.services.roles import RoleAccess
+from src.services.pagination import next_cursor
+from src.services.list_cache import get_page, set_page, page_field
+from src.services.etag import contact_etag, list_etag, etag_matches, not_modified, if_match_versions
+from src.services.bulk_import import import_contacts, media_type
+from src.services.export import export_contacts, MEDIA_TYPES
+from src.services.serializers import contacts_serializer, response_format
+from src.services.negotiation import NegotiatedRoute
+from src.services.replicas import read_db
+from src.services.rate_limit import RateLimiter
 from src.conf import messages
 
-router = APIRouter(prefix='/contacts', tags=['contacts'])
+router = APIRouter(prefix='/contacts', tags=['contacts'], route_class=NegotiatedRoute)
 
 # Цей функтор буде пропускати тiльки тi запити, ролi в користувачiв яких спiвпадають
 access_elevated = RoleAccess([Role.admin, Role.moderator])
@@ -19,66 +31,193 @@ access_elevated = RoleAccess([Role.admin, Role.moderator])
 @router.get("/", response_model=list[ContactResponseSchema], description="No more than 10 requests per minute",
             dependencies=[Depends(RateLimiter(times=10, seconds=60))])
 async def get_contacts(limit: int = Query(10, ge=10, le=500), offset: int = Query(0, ge=0),
+                    cursor: str | None = Query(None, description="Курсор наступної сторінки з заголовку X-Next-Cursor"),
+                    sort: Literal["id", "created_at"] = Query("id"), if_none_match: str | None = Header(None),
                     db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)):
     """
     The get_contacts function returns a list of contacts.
         The limit and offset parameters are used to paginate the results.
         The user parameter is used to get only the contacts for that user.
+        The cursor of the next page is returned in the X-Next-Cursor header; when the client sends it back,
+        the page is read with keyset pagination and the offset is ignored.
+        The serialized page is cached per user until the next write of the contacts of this user.
+        The ETag of the page is derived from the list version of the user, so If-None-Match gets 304
+        without touching the database.
     
     :param limit: int: Limit the number of contacts returned
     :param ge: Specify that the limit must be greater than or equal to 10
     :param le: Set the maximum value of the limit parameter
     :param offset: int: Specify the number of records to skip
     :param ge: Set a minimum value for the limit parameter
+    :param cursor: str | None: The cursor of the next page
+    :param sort: str: The sort key of the page, id or created_at
+    :param if_none_match: str | None: The ETag, which the client already has
     :param db: AsyncSession: Get the database connection
     :param user: User: Get the current user
     :return: A list of contacts
     :doc-author: Trelent
     """
-    contact = await rep_contacts.get_contacts(limit, offset, db, user)
-    return contact
+    field = page_field(limit, offset, cursor, sort, response_format.get())
+    version, body, cursor_next = await get_page(user.id, field)
+    # без версiї (Redis недоступний) ETag не видається - iнакше не було б чим довести, що сторiнка не змiнилася
+    etag = list_etag(user.id, version, field) if version else None
+    if etag and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    if body is None:
+        contact = await rep_contacts.get_contacts(limit, offset, db, user, cursor, sort)
+        cursor_next = next_cursor(contact, limit, sort)
+        body = contacts_serializer.dump(contact)
+        await set_page(user.id, version, field, body, cursor_next)
+    # готовi байти вiддаються як є, response_model лишається для документацiї OpenAPI
+    headers = {"ETag": etag} if etag else {}
+    if cursor_next:
+        headers["X-Next-Cursor"] = cursor_next
+    return Response(content=body, media_type=response_format.get(), headers=headers)
 
 
-@router.get("/all", response_model=list[ContactResponseSchema], dependencies=[Depends(access_elevated)])
+@router.get("/all", response_model=list[ContactResponseSchema],
+            dependencies=[Depends(access_elevated)])
 async def get_contacts_all(limit: int = Query(10, ge=10, le=500), offset: int = Query(0, ge=0),
-                    db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)):
+                    cursor: str | None = Query(None, description="Курсор наступної сторінки з заголовку X-Next-Cursor"),
+                    sort: Literal["id", "created_at"] = Query("id"),
+                    db: AsyncSession = Depends(read_db), user: User = Depends(auth_service.get_current_user)):
     """
     The get_contacts_all function returns a list of contacts.
         The limit and offset parameters are used to paginate the results.
         The user parameter is used to determine if the current user has access to this endpoint.
+        The cursor of the next page is returned in the X-Next-Cursor header.
     
     :param limit: int: Limit the number of results returned
     :param ge: Specify the minimum value of the parameter
     :param le: Set the maximum value of a parameter
     :param offset: int: Skip the first n records
     :param ge: Specify the minimum value that is allowed
+    :param cursor: str | None: The cursor of the next page
+    :param sort: str: The sort key of the page, id or created_at
     :param db: AsyncSession: Get the database session
     :param user: User: Get the user id from the jwt token
     :return: All contacts in the database
     :doc-author: Trelent
     """
-    contact = await rep_contacts.get_contacts_all(limit, offset, db)
-    return contact
+    contact = await rep_contacts.get_contacts_all(limit, offset, db, cursor, sort)
+    cursor_next = next_cursor(contact, limit, sort)
+    # рядки з репозиторiю вже валiднi, тож вони пишуться в JSON без повторної валiдацiї response_model
+    return contacts_serializer.response(contact, {"X-Next-Cursor": cursor_next} if cursor_next else None)
+
+
+# /export та /bulk оголошено до /{contact_id}, щоб шлях не сприймався як id контакту
+@router.get("/export", response_class=StreamingResponse, description="No more than 3 exports per minute",
+            dependencies=[Depends(RateLimiter(times=3, seconds=60))],
+            responses={200: {"content": {content_type: {} for content_type in MEDIA_TYPES.values()}}})
+async def export_contacts_stream(fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+                                 db: AsyncSession = Depends(get_db),
+                                 user: User = Depends(auth_service.get_current_user)):
+    """
+    The export_contacts_stream function streams all contacts of the user as NDJSON or CSV.
+        The rows are read from the server-side cursor, so the export of any size takes constant memory.
+    
+    :param fmt: Literal["ndjson", "csv"]: The format of the export
+    :param db: AsyncSession: Get the database session
+    :param user: User: Get the current user
+    :return: The streaming response with the contacts
+    :doc-author: Trelent
+    """
+    return StreamingResponse(export_contacts(db, user, fmt), media_type=MEDIA_TYPES[fmt],
+                             headers={"Content-Disposition": f'attachment; filename="contacts.{fmt}"'})
+
+
+@router.post("/bulk", response_model=BulkImportResponseSchema, description="No more than 3 imports per minute",
+             dependencies=[Depends(RateLimiter(times=3, seconds=60))],
+             openapi_extra={"requestBody": {"required": True, "content": {
+                 "text/csv": {"schema": {"type": "string"}},
+                 "application/x-ndjson": {"schema": {"type": "string"}},
+                 "application/msgpack": {"schema": {"type": "string", "format": "binary"}}}}})
+async def import_contacts_bulk(request: Request, db: AsyncSession = Depends(get_db),
+                               user: User = Depends(auth_service.get_current_user)):
+    """
+    The import_contacts_bulk function imports the contacts from the streamed CSV (with the header line),
+        NDJSON or MessagePack (the maps one after another) body. The body is read chunk by chunk,
+        the rows are validated with ContactSchema and inserted in batches; the contacts with the existing email are reported, not overwritten.
+    
+    :param request: Request: Read the body as a stream
+    :param db: AsyncSession: Get the database session
+    :param user: User: Get the current user
+    :return: The number of the inserted and failed rows with the per-row error report
+    :doc-author: Trelent
+    """
+    fmt = media_type(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=messages.BULK_UNSUPPORTED_TYPE)
+    return await import_contacts(request.stream(), fmt, db, user)
+
+
+@router.patch("/bulk", response_model=BulkAffectedSchema, description="No more than 5 requests per minute",
+              dependencies=[Depends(RateLimiter(times=5, seconds=60))])
+async def update_contacts_bulk(body: ContactBulkUpdateSchema, db: AsyncSession = Depends(get_db),
+                               user: User = Depends(auth_service.get_current_user)):
+    """
+    The update_contacts_bulk function sets the given fields of the contacts, chosen by ids and / or status,
+        with one UPDATE. Only the contacts of the current user are changed.
+    
+    :param body: ContactBulkUpdateSchema: The filter and the fields to set
+    :param db: AsyncSession: Get the database session
+    :param user: User: Get the current user
+    :return: The number of the updated contacts
+    :doc-author: Trelent
+    """
+    affected = await rep_contacts.update_contacts_bulk(body.where, body.values, db, user)
+    return {"affected": affected}
+
+
+@router.delete("/bulk", response_model=BulkAffectedSchema, description="No more than 5 requests per minute",
+               dependencies=[Depends(RateLimiter(times=5, seconds=60))])
+async def delete_contacts_bulk(body: ContactBulkFilterSchema, db: AsyncSession = Depends(get_db),
+                               user: User = Depends(auth_service.get_current_user)):
+    """
+    The delete_contacts_bulk function deletes the contacts, chosen by ids and / or status, with one DELETE.
+        Only the contacts of the current user are deleted.
+    
+    :param body: ContactBulkFilterSchema: The filter of the contacts
+    :param db: AsyncSession: Get the database session
+    :param user: User: Get the current user
+    :return: The number of the deleted contacts
+    :doc-author: Trelent
+    """
+    affected = await rep_contacts.delete_contacts_bulk(body, db, user)
+    return {"affected": affected}
 
 
 @router.get("/{contact_id}", response_model=ContactResponseSchema, description="No more than 10 requests per minute",
             dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def get_contact(contact_id: int = Path(ge=1), db: AsyncSession = Depends(get_db),
+async def get_contact(response: Response, contact_id: int = Path(ge=1),
+                      if_none_match: str | None = Header(None), db: AsyncSession = Depends(read_db),
                       user: User = Depends(auth_service.get_current_user)):
     """
     The get_contact function is used to retrieve a single contact from the database.
     It takes an integer as its only argument, which represents the ID of the contact
     to be retrieved. It returns a Contact object.
+    The response carries the ETag; if the client sends it back in If-None-Match and the contact
+    did not change, 304 is returned after reading only the version of the contact.
     
+    :param response: Response: Set the ETag header
     :param contact_id: int: Specify the id of the contact to be retrieved
+    :param if_none_match: str | None: The ETag, which the client already has
     :param db: AsyncSession: Get the database session
     :param user: User: Get the current user from the auth_service
     :return: The contact object with the given id
     :doc-author: Trelent
     """
+    if if_none_match:
+        version = await rep_contacts.get_contact_version(contact_id, db, user)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.ENTITY_NOT_FOUND)
+        etag = contact_etag(contact_id, version, response_format.get())
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
     contact = await rep_contacts.get_contact(contact_id, db, user)
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.ENTITY_NOT_FOUND)
+    response.headers["ETag"] = contact_etag(contact.id, contact.version, response_format.get())
     return contact
 
 
@@ -101,27 +240,37 @@ async def create_contact(body: ContactSchema, db: AsyncSession = Depends(get_db)
     return contact
 
 
-@router.put("/{contact_id}", description="No more than 5 requests per minute",
+@router.put("/{contact_id}", response_model=ContactResponseSchema, description="No more than 5 requests per minute",
             dependencies=[Depends(RateLimiter(times=5, seconds=60))])
-async def update_contact(body: ContactSchema, contact_id: int = Path(ge=1), db: AsyncSession = Depends(get_db),
+async def update_contact(body: ContactSchema, response: Response, contact_id: int = Path(ge=1),
+                         if_match: str | None = Header(None), db: AsyncSession = Depends(get_db),
                          user: User = Depends(auth_service.get_current_user)):
     """
     The update_contact function updates a contact in the database.
         It takes an id, body and db as parameters. The id is used to find the contact in the database,
         while body contains all of the information that will be updated for that contact. 
+        With If-Match (the ETag from GET) the contact is updated only if nobody changed it in the meantime,
+        otherwise 412 is returned.
         
         Args: 
     
     :param body: ContactSchema: Get the data from the request body
+    :param response: Response: Set the ETag header of the new version
     :param contact_id: int: Get the contact id from the url
+    :param if_match: str | None: The ETag of the version, which the client has changed
     :param db: AsyncSession: Pass the database connection to the function
     :param user: User: Get the current user from the auth_service
     :return: The contact that was updated
     :doc-author: Trelent
     """
-    contact = await rep_contacts.update_contact(contact_id, body, db, user)
+    versions = if_match_versions(if_match, contact_id) if if_match else None
+    contact = await rep_contacts.update_contact(contact_id, body, db, user, versions)
     if contact is None:
+        # умовний UPDATE не вiдрiзняє "немає контакту" вiд "iнша версiя" - це з'ясовується лише при невдачi
+        if versions is not None and await rep_contacts.get_contact_version(contact_id, db, user) is not None:
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=messages.CONTACT_CHANGED)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="ENTITY NOT FOUND.")
+    response.headers["ETag"] = contact_etag(contact.id, contact.version, response_format.get())
     return contact
 
 
@@ -132,13 +281,13 @@ async def delete_contact(contact_id: int = Path(ge=1), db: AsyncSession = Depend
     """
     The delete_contact function deletes a contact from the database.
         The function takes in an integer representing the id of the contact to be deleted,
-        and returns a dictionary containing information about that contact.
+        and answers 204 without a body.
     
     :param contact_id: int: Specify the contact_id of the contact to be deleted
     :param db: AsyncSession: Pass the database session to the function
     :param user: User: Get the current user from the auth_service
-    :return: The deleted contact
+    :return: Nothing, the response 204 has no body
     :doc-author: Trelent
     """
-    contact = await rep_contacts.delete_contact(contact_id, db, user)
-    return contact
+    # вiдповiдь 204 не має тiла, тож рядок з DELETE ... RETURNING не серiалiзується
+    await rep_contacts.delete_contact(contact_id, db, user)
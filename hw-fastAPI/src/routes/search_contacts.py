@@ -8,8 +8,11 @@ from src.schemas.contact import ContactSchema, ContactUpdateSchema, ContactRespo
 from src.entity.models import User, Role
 from src.services.auth import auth_service
 from src.services.roles import RoleAccess
+from src.services.serializers import contacts_serializer
+from src.services.negotiation import NegotiatedRoute
+from src.services.replicas import read_db
 
-router = APIRouter(prefix='/search', tags=['search'])
+router = APIRouter(prefix='/search', tags=['search'], route_class=NegotiatedRoute)
 
 # Цей функтор буде пропускати тiльки тi запити, ролi в користувачiв яких спiвпадають
 access_elevated = RoleAccess([Role.admin, Role.moderator])
@@ -38,7 +41,7 @@ access_elevated = RoleAccess([Role.admin, Role.moderator])
     буде викликано виняток. """
 @router.get("/by_firstname/{contact_first_name}", response_model=list[ContactResponseSchema])
 async def search_contact_by_firstname(contact_first_name: str = Path(..., description="Ім'я контакту"),
-                              db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)):
+                              db: AsyncSession = Depends(read_db), user: User = Depends(auth_service.get_current_user)):
     """
     The search_contact_by_firstname function searches for contacts by first name.
         The search_contact_by_firstname function is a GET request that takes in the contact's first name as a parameter.
@@ -52,11 +55,11 @@ async def search_contact_by_firstname(contact_first_name: str = Path(..., descri
     :doc-author: Trelent
     """
     contacts = await rep_contacts.search_contact_by_firstname(contact_first_name, db)
-    return contacts
+    return contacts_serializer.response(contacts)
 
 @router.get("/by_lastname/{contact_last_name}", response_model=list[ContactResponseSchema])
 async def search_contact_by_lastname(contact_last_name: str = Path(..., description="Прізвище контакту"),
-                              db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)):
+                              db: AsyncSession = Depends(read_db), user: User = Depends(auth_service.get_current_user)):
     """
     The search_contact_by_lastname function allows you to search for a contact by last name.
     
@@ -68,11 +71,11 @@ async def search_contact_by_lastname(contact_last_name: str = Path(..., descript
     :doc-author: Trelent
     """
     contacts = await rep_contacts.search_contact_by_lastname(contact_last_name, db)
-    return contacts
+    return contacts_serializer.response(contacts)
 
 @router.get("/by_email/{contact_email}", response_model=list[ContactResponseSchema])
 async def search_contact_by_email(contact_email: str = Path(..., description="Електронна адреса контакту"),
-                              db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)):
+                              db: AsyncSession = Depends(read_db), user: User = Depends(auth_service.get_current_user)):
     """
     The search_contact_by_email function searches for a contact by email.
     
@@ -84,13 +87,14 @@ async def search_contact_by_email(contact_email: str = Path(..., description="Е
     :doc-author: Trelent
     """
     contacts = await rep_contacts.search_contact_by_email(contact_email, db)
-    return contacts
+    return contacts_serializer.response(contacts)
 
 
 # Знайдена міцна залежність між шляхом {value} та назвою змінної у функції -> search_contact_complex(value, ... 
-@router.get("/by_complex/{value}", response_model=list[ContactResponseSchema], dependencies=[Depends(access_elevated)])
+@router.get("/by_complex/{value}", response_model=list[ContactResponseSchema],
+            dependencies=[Depends(access_elevated)])
 async def search_contact_complex(value: str = Path(..., description="Здійснює пошук у полях контакту: Ім'я, Прізвище та Електронна адреса"),
-                              db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)):
+                              db: AsyncSession = Depends(read_db), user: User = Depends(auth_service.get_current_user)):
     """
     The search_contact_complex function is used to search for contacts by name, surname and email.
         The function takes a string value as an argument and returns a list of contacts that match the search criteria.
@@ -104,4 +108,4 @@ async def search_contact_complex(value: str = Path(..., description="Здійс
     :doc-author: Trelent
     """
     contacts = await rep_contacts.search_contact_complex(value, db)
-    return contacts
\ No newline at end of file
+    return contacts_serializer.response(contacts)
\ No newline at end of file
@@ -1,22 +1,30 @@
-import json, pickle
+import re
 
 import cloudinary
 import cloudinary.uploader
 from fastapi import APIRouter, HTTPException, Depends, status, Path, Query, UploadFile, File
-from fastapi_limiter.depends import RateLimiter
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.database.db import get_db, sessionmanager
 from src.conf.config import config
+from src.conf import messages
 from src.repository import users as rep_users
-from src.schemas.user import UserResponseSchema
+from src.schemas.user import UserResponseSchema, UserAgentBanSchema
 from src.entity.models import User, Role
 from src.services.auth import auth_service
-# from src.services.roles import RoleAccess
+from src.services.roles import RoleAccess
+from src.services.rate_limit import RateLimiter
+from src.services.user_cache import user_cache_stats
+from src.services.list_cache import list_cache_stats
+from src.services.user_agents import user_agent_filter, save_patterns
 
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# статистика кешу доступна тiльки адмiнiстраторам
+access_admin = RoleAccess([Role.admin])
+
 cloudinary.config(cloud_name=config.CLOUDINARY_NAME, api_key=config.CLOUDINARY_API_KEY,
                   api_secret=config.CLOUDINARY_API_SECRET, secure=True,)
 
@@ -66,7 +74,75 @@ async def get_current_user(file: UploadFile = File(), user: User = Depends(auth_
     user = await rep_users.update_avatar_url(user.email, resourse_url, db)
 
     # вiдразу кешування <user> з новим URL для аватари
-    auth_service.cache.set(user.email, pickle.dumps(user))
-    auth_service.cache.expire(user.email, 300)
+    return await auth_service.cache_user(user)
+
+@router.get("/cache_stats", dependencies=[Depends(access_admin)])
+async def get_cache_stats():
+    """
+    The get_cache_stats function reports the hit ratio of each tier of the user cache of this worker:
+    the in-process LRU and Redis, the hit ratio of the cache of the verified access tokens
+    and of the cache of the contact listings.
+    
+    :return: A dict with the stats of the local, redis, jwt and contacts caches
+    :doc-author: Trelent
+    """
+    return {**user_cache_stats(), "jwt": auth_service.verified_tokens.stats.as_dict(),
+            "contacts": list_cache_stats()}
+
+
+@router.get("/hash_stats", dependencies=[Depends(access_admin)])
+async def get_hash_stats():
+    """
+    The get_hash_stats function reports the metrics of the password hash queue of this worker:
+    its depth, the admitted and rejected logins / signups and the wait time in the queue.
+    
+    :return: A dict with the metrics of the queue
+    :doc-author: Trelent
+    """
+    return auth_service.password_hasher.admission.stats()
+
+
+@router.get("/pool_stats", dependencies=[Depends(access_admin)])
+async def get_pool_stats():
+    """
+    The get_pool_stats function reports the database pool of this worker: its size, the checked out
+    and overflow connections, the histogram of the waits for a connection and the acquire timeouts.
 
-    return user
\ No newline at end of file
+    :return: A dict with the stats of the pool
+    :doc-author: Trelent
+    """
+    return sessionmanager.pool_stats()
+
+
+@router.get("/banned_user_agents", dependencies=[Depends(access_admin)])
+async def get_banned_user_agents():
+    """
+    The get_banned_user_agents function reports the ban patterns of the user-agents
+    and the cache of the verdicts of this worker.
+
+    :return: A dict with the patterns and the stats of the cache
+    :doc-author: Trelent
+    """
+    return {"patterns": user_agent_filter.patterns, "cache": user_agent_filter.stats()}
+
+
+@router.put("/banned_user_agents", response_model=UserAgentBanSchema, dependencies=[Depends(access_admin)])
+async def put_banned_user_agents(body: UserAgentBanSchema):
+    """
+    The put_banned_user_agents function replaces the ban patterns of the user-agents without the restart:
+    this worker applies them at once, the other workers within USER_AGENT_RELOAD_INTERVAL seconds.
+
+    :param body: UserAgentBanSchema: The new regex patterns
+    :return: The saved patterns
+    :doc-author: Trelent
+    """
+    try:
+        await save_patterns(body.patterns)
+    except re.error as err:
+        # кожен шаблон коректний, але разом вони не компiлюються (наприклад, глобальний (?i) не на початку)
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(err))
+    except RedisError as err:
+        # без Redis iншi воркери не побачать новий список, тож i цей воркер лишає старий
+        print(err)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=messages.REDIS_UNAVAILABLE)
+    return body
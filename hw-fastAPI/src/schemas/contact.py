@@ -2,7 +2,7 @@ import re
 from datetime import datetime
 from datetime import date
 
-from pydantic import BaseModel, EmailStr, Field, validator, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, validator, model_validator, ConfigDict
 from typing import Optional, Literal, Generic
 from src.schemas.user import UserResponseSchema
 
@@ -61,3 +61,59 @@ class ContactResponseSchema(BaseModel):
     # class Config:
     #     from_orm = True
     model_config = ConfigDict(from_attributes = True)
+
+
+class BulkRowErrorSchema(BaseModel):
+    line: int
+    errors: list[str]
+
+
+class BulkImportResponseSchema(BaseModel):
+    inserted: int
+    failed: int
+    errors: list[BulkRowErrorSchema]
+    # звiт обрiзається пiсля BULK_IMPORT_MAX_ERRORS рядкiв
+    errors_truncated: bool = False
+
+
+class ContactBulkFilterSchema(BaseModel):
+    # контакти обираються за списком id та/або за статусом, завжди в межах поточного користувача
+    ids: list[int] | None = Field(None, min_length=1, max_length=10000)
+    crm_status: Literal['operational', 'analitic', 'corporative'] | None = None
+
+    @model_validator(mode='after')
+    def validate_not_empty(self):
+        # порожнiй фiльтр зачепив би всi контакти користувача - такий запит вiдхиляється явно
+        if self.ids is None and self.crm_status is None:
+            raise ValueError('Filter must contain ids or crm_status.')
+        return self
+
+
+class ContactPatchSchema(BaseModel):
+    # <email> унiкальний, тож масово його змiнити неможливо
+    first_name: str | None = Field(None, min_length=3, max_length=32)
+    last_name: str | None = Field(None, min_length=3, max_length=32)
+    phone_number: str | None = Field(None, max_length=24)
+    birth_date: date | None = None
+    crm_status: Literal['operational', 'analitic', 'corporative'] | None = None
+
+    @validator('phone_number')
+    def validate_phone_number(cls, phone):
+        if phone is not None and not phone.isdigit():
+            raise ValueError('Phone number must contain only digits.')
+        return phone
+
+    @model_validator(mode='after')
+    def validate_not_empty(self):
+        if not self.model_dump(exclude_none=True):
+            raise ValueError('At least one field must be set.')
+        return self
+
+
+class ContactBulkUpdateSchema(BaseModel):
+    where: ContactBulkFilterSchema
+    values: ContactPatchSchema
+
+
+class BulkAffectedSchema(BaseModel):
+    affected: int
@@ -32,4 +32,16 @@ class TokenSchema(BaseModel):
 
 
 class RequestEmail(BaseModel):
-    email: EmailStr
\ No newline at end of file
+    email: EmailStr
+
+
+class UserAgentBanSchema(BaseModel):
+    patterns: list[str] = Field(max_length=1000)
+
+    @validator('patterns', each_item=True)
+    def validate_pattern(cls, pattern):
+        try:
+            re.compile(pattern)
+        except re.error as err:
+            raise ValueError(f'Invalid pattern {pattern!r}: {err}')
+        return pattern
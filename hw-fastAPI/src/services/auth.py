@@ -1,25 +1,35 @@
-import pickle
-import redis
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
+from redis.exceptions import RedisError
 
 from src.database.db import get_db
+from src.database.redis_pool import redis_client
+from src.services import user_snapshot
+from src.services.hashing import pwd_context, password_hasher
+from src.services.user_cache import TTLCache, local_users, redis_stats
+from src.services.user_snapshot import UserSnapshot
 from src.repository import users as rep_users
 from src.conf.config import config
 
 
 class Auth:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = pwd_context
+    # bcrypt у async-маршрутах виконується на окремому executor (src/services/hashing.py)
+    password_hasher = password_hasher
     SECRET_KEY = config.SECRET_KEY_JWT
     ALGORITHM = config.ALGORITHM
-    cache = redis.Redis(host=config.REDIS_DOMAIN, port=config.REDIS_PORT, db=0,
-                        password=config.REDIS_PASSWORD,)
+    # асинхронний клiєнт на спiльному пулi: запити до Redis бiльше не блокують event loop
+    cache = redis_client
+    CACHE_TTL = config.USER_CACHE_TTL
+    # вже перевiренi access-токени: ключ - sha256 токена, запис живе до <exp> самого токена
+    verified_tokens = TTLCache(maxsize=config.JWT_CACHE_SIZE, ttl=0)
 
     def verify_password(self, plain_password, hashed_password):
         """
@@ -47,6 +57,36 @@ class Auth:
         """
         return self.pwd_context.hash(password)
 
+    async def verify_password_async(self, plain_password, hashed_password, ip: str | None = None,
+                                    account: str | None = None):
+        """
+        The verify_password_async function is verify_password, which runs on the password hash executor,
+            so one login does not stall the other requests of the worker.
+            If the queue of the executor is full, it raises 429 with Retry-After.
+        
+        :param self: Represent the instance of the class
+        :param plain_password: Store the password that is entered by the user
+        :param hashed_password: Store the hashed password in the database
+        :param ip: str | None: The IP of the client, for the fair share of the queue
+        :param account: str | None: The email of the account, for the fair share of the queue
+        :return: A boolean value
+        :doc-author: Trelent
+        """
+        return await self.password_hasher.verify(plain_password, hashed_password, ip=ip, account=account)
+
+    async def get_password_hash_async(self, password: str, ip: str | None = None, account: str | None = None):
+        """
+        The get_password_hash_async function is get_password_hash, which runs on the password hash executor.
+        
+        :param self: Represent the instance of the class
+        :param password: str: Get the password from the user
+        :param ip: str | None: The IP of the client, for the fair share of the queue
+        :param account: str | None: The email of the account, for the fair share of the queue
+        :return: A string of the hashed password
+        :doc-author: Trelent
+        """
+        return await self.password_hasher.hash(password, ip=ip, account=account)
+
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
     """ Загальний вигляд JWT у Encoded:
@@ -129,6 +169,33 @@ class Auth:
         except JWTError:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials')
 
+    def verify_access_token(self, token: str) -> dict | None:
+        """
+        The verify_access_token function decodes and verifies the access token.
+            The claims of the verified token are memoized under the sha256 digest of the token until its exp,
+            so the token presented again is not parsed and its HMAC is not checked again.
+            The token, which fails the verification, is never cached.
+        
+        :param self: Represent the instance of the class
+        :param token: str: The access token
+        :return: The claims of the token or None, if the token is not a valid access token
+        :doc-author: Trelent
+        """
+        token_key = hashlib.sha256(token.encode()).digest()
+        payload = self.verified_tokens.get(token_key)
+        if payload is not None:
+            return payload
+        try:
+            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+        except JWTError:
+            return None
+        if payload.get('scope') != 'access_token' or payload.get('sub') is None:
+            return None
+        ttl = payload.get('exp', 0) - time.time()
+        if ttl > 0:
+            self.verified_tokens.set(token_key, payload, ttl)
+        return payload
+
     # розiбрати [token] на атоми та виокремити з нього <user.email>
     # [oauth2_scheme] це вiдповiдна дефолтна схема яку використовує [OAuth2PasswordBearer] - визначена у кодi вище
     async def get_current_user(self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
@@ -149,35 +216,60 @@ class Auth:
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},)
 
-        try:
-            # Decode JWT
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
-            if payload['scope'] == 'access_token':
-                email = payload["sub"]
-                if email is None:
-                    raise credentials_exception
-            else:
-                raise credentials_exception
-        except JWTError as e:
+        payload = self.verify_access_token(token)
+        if payload is None:
             raise credentials_exception
+        email = payload["sub"]
 
-        # Кешування <user>
+        # Кешування <user>: спочатку пам'ять процесу, потiм Redis, потiм БД.
+        # У кешi лежить не ORM-об'єкт, а компактний знiмок [UserSnapshot] (src/services/user_snapshot.py)
         user_hash = str(email)
 
-        user = self.cache.get(user_hash)
+        user = local_users.get(user_hash)
+        if user is None:
+            try:
+                payload = await self.cache.get(user_hash)
+            except RedisError as err:
+                # недоступний або повiльний Redis - це просто промах кешу, запит обслуговує БД
+                print(err)
+                payload = None
+            # знiмок iншої версiї формату - теж промах
+            user = user_snapshot.loads(payload) if payload is not None else None
+            if user is None:
+                redis_stats.misses += 1
+            else:
+                redis_stats.hits += 1
+                local_users.set(user_hash, user)
 
         if user is None:
             print("User from database")
             user = await rep_users.get_user_by_email(email, db)
             if user is None:
                 raise credentials_exception
-            self.cache.set(user_hash, pickle.dumps(user))
-            self.cache.expire(user_hash, 300)
+            user = await self.cache_user(user)
         else:
             print("User from cache")
-            user = pickle.loads(user)
         return user
 
+    async def cache_user(self, user) -> UserSnapshot:
+        """
+        The cache_user function puts the snapshot of the user into the in-process cache
+        and into Redis with one SET EX command.
+            The errors of Redis are not raised, because the cache is only an optimization.
+        
+        :param self: Represent the instance of the class
+        :param user: User: The user to cache
+        :return: The read-only snapshot of the user
+        :doc-author: Trelent
+        """
+        snapshot = UserSnapshot.from_user(user)
+        local_users.set(snapshot.email, snapshot)
+        try:
+            await self.cache.set(snapshot.email, user_snapshot.dumps(snapshot), ex=self.CACHE_TTL)
+        except RedisError as err:
+            print(err)
+        return snapshot
+
 
     async def create_email_token(self, data: dict):
         """
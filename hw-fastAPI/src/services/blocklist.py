@@ -0,0 +1,184 @@
+import asyncio
+from bisect import bisect_right
+from socket import AF_INET, AF_INET6, inet_pton
+from typing import Iterable
+
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.database.redis_pool import redis_client
+
+# Black list за замовчуванням, поки не заданий BLOCKLIST_FILE чи BLOCKLIST_REDIS_KEY
+DEFAULT_NETWORKS = ("10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16")
+
+# ::ffff:a.b.c.d - адреса IPv4, яку прислав dual-stack сокет
+_IPV4_MAPPED = 0xFFFF
+
+
+def _parse(line: str) -> tuple[int, int, int]:
+    # 10.0.0.0/8 -> (4, перша адреса, остання адреса); inet_pton у рази швидший за ipaddress.ip_network,
+    # що помiтно на десятках тисяч мереж
+    address, _, prefix = line.partition("/")
+    family, bits = (AF_INET6, 128) if ":" in address else (AF_INET, 32)
+    try:
+        value = int.from_bytes(inet_pton(family, address), "big")
+    except OSError:
+        raise ValueError(f"{line!r} does not appear to be an IPv4 or IPv6 network")
+    length = int(prefix) if prefix else bits
+    if not 0 <= length <= bits:
+        raise ValueError(f"{line!r} has an invalid prefix length")
+    host_bits = bits - length
+    start = value >> host_bits << host_bits
+    return (6 if bits == 128 else 4), start, start | ((1 << host_bits) - 1)
+
+
+def _intervals(ranges: list) -> tuple[list[int], list[int]]:
+    # мережi переводяться в iнтервали [перша адреса, остання адреса], вкладенi та сумiжнi зливаються,
+    # тож пошук адреси - це один bisect по вiдсортованих початках
+    starts, ends = [], []
+    for start, end in sorted(ranges):
+        if ends and start <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+class IPBlocklist:
+    """
+    The IPBlocklist class answers, whether the IP address belongs to one of the blocked networks (CIDR).
+        The networks of each family are compiled into sorted disjoint intervals, so the lookup is
+        O(log n) for tens of thousands of networks. load replaces all networks with one assignment,
+        so the requests running during the reload see either the old or the new list.
+    """
+
+    def __init__(self, networks: Iterable[str] = ()):
+        """
+        The __init__ function compiles the initial networks.
+
+        :param self: Represent the instance of the class
+        :param networks: Iterable[str]: The networks, like 10.0.0.0/8 or 2001:db8::/32
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.load(networks)
+
+    def load(self, networks: Iterable[str]) -> int:
+        """
+        The load function replaces the blocked networks. The empty lines and # comments are skipped,
+            the invalid entries are printed and skipped, so one typo does not unblock the whole list.
+
+        :param self: Represent the instance of the class
+        :param networks: Iterable[str]: The networks or single addresses
+        :return: The number of the loaded networks
+        :doc-author: Trelent
+        """
+        parsed = {4: [], 6: []}
+        for line in networks:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                version, start, end = _parse(line)
+            except ValueError as err:
+                print(err)
+                continue
+            parsed[version].append((start, end))
+        self._tables = (_intervals(parsed[4]), _intervals(parsed[6]))
+        return len(parsed[4]) + len(parsed[6])
+
+    def __contains__(self, host: str) -> bool:
+        """
+        The __contains__ function checks the client address from the ASGI scope.
+            The address is parsed by inet_pton in C, not by ipaddress.ip_address.
+
+        :param self: Represent the instance of the class
+        :param host: str: The IPv4 or IPv6 address
+        :return: True if the address is blocked, False for the other or invalid address
+        :doc-author: Trelent
+        """
+        ipv4, ipv6 = self._tables
+        try:
+            if ":" in host:
+                value = int.from_bytes(inet_pton(AF_INET6, host), "big")
+                if value >> 32 == _IPV4_MAPPED:
+                    starts, ends, value = *ipv4, value & 0xFFFFFFFF
+                else:
+                    starts, ends = ipv6
+            else:
+                value = int.from_bytes(inet_pton(AF_INET, host), "big")
+                starts, ends = ipv4
+        except OSError:
+            return False
+        index = bisect_right(starts, value) - 1
+        return index >= 0 and value <= ends[index]
+
+    def __len__(self):
+        ipv4, ipv6 = self._tables
+        return len(ipv4[0]) + len(ipv6[0])
+
+
+# Один black list на воркер: його перевiряє [BlackListMiddleware], оновлює [watch_blocklist]
+blocklist = IPBlocklist(DEFAULT_NETWORKS)
+
+
+def _read_lines(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as file:
+        return file.readlines()
+
+
+async def read_networks(path: str | None = config.BLOCKLIST_FILE, redis=redis_client,
+                        key: str | None = config.BLOCKLIST_REDIS_KEY) -> list[str] | None:
+    """
+    The read_networks function reads the blocked networks from the file (one per line)
+    and from the Redis set (SADD key 10.0.0.0/8 ...), both of them when both are configured.
+
+    :param path: str | None: The path of the file
+    :param redis: The Redis client
+    :param key: str | None: The key of the Redis set
+    :return: The networks, or None when no source is configured
+    :doc-author: Trelent
+    """
+    if path is None and key is None:
+        return None
+    networks = []
+    if path is not None:
+        # файл може бути великим або лежати на повiльному диску - читаємо його поза event loop
+        networks.extend(await asyncio.to_thread(_read_lines, path))
+    if key is not None:
+        networks.extend(member.decode() if isinstance(member, bytes) else member
+                        for member in await redis.smembers(key))
+    return networks
+
+
+async def watch_blocklist(interval: float = config.BLOCKLIST_RELOAD_INTERVAL, path: str | None = config.BLOCKLIST_FILE,
+                          redis=redis_client, key: str | None = config.BLOCKLIST_REDIS_KEY):
+    """
+    The watch_blocklist function is the background task of a worker, which reloads the blocklist
+    without the restart: at once and then every interval seconds, when the file or the Redis set has changed.
+    While the source is unavailable or unreadable (e.g. not UTF-8) the last loaded list stays in force
+    and the watcher keeps checking it.
+
+    :param interval: float: The pause between the checks in seconds
+    :param path: str | None: The path of the file
+    :param redis: The Redis client
+    :param key: str | None: The key of the Redis set
+    :return: Nothing, it runs until cancelled
+    :doc-author: Trelent
+    """
+    loaded = None
+    while True:
+        try:
+            networks = await read_networks(path, redis, key)
+            if networks is None:
+                return
+            # список перекомпiльовується лише пiсля змiни i поза event loop: десятки тисяч мереж - це помiтна робота
+            current = frozenset(networks)
+            if current != loaded:
+                await asyncio.to_thread(blocklist.load, networks)
+                loaded = current
+        except (RedisError, OSError, ValueError) as err:
+            # UnicodeDecodeError - теж ValueError: зiпсований файл не повинен зупинити перечитування назавжди
+            print(err)
+        await asyncio.sleep(interval)
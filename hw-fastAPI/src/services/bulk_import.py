@@ -0,0 +1,202 @@
+import asyncio
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf import messages
+from src.conf.config import config
+from src.entity.models import User
+from src.repository import contacts as rep_contacts
+from src.schemas.contact import ContactSchema
+from src.services import serializers
+from src.services.negotiation import is_msgpack
+
+CSV_TYPES = ("text/csv",)
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def media_type(content_type: str | None) -> str | None:
+    """
+    The media_type function maps the Content-Type header of the import onto its format.
+
+    :param content_type: str | None: The Content-Type header
+    :return: csv, ndjson, msgpack or None for an unsupported type
+    :doc-author: Trelent
+    """
+    if is_msgpack(content_type):
+        return "msgpack"
+    value = (content_type or "").split(";")[0].strip().lower()
+    if value in CSV_TYPES:
+        return "csv"
+    if value in NDJSON_TYPES:
+        return "ndjson"
+    return None
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """
+    The iter_lines function splits the streamed body into the numbered text lines,
+        so the import never holds more than one network chunk and one line in memory.
+        One record is one line: CSV fields with a quoted line break are not supported.
+
+    :param stream: AsyncIterator[bytes]: The chunks of the request body
+    :return: The pairs (line number, line without the line break), the empty lines are skipped
+    :doc-author: Trelent
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    tail, number = "", 0
+    async for chunk in stream:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail.strip():
+        yield number + 1, tail.rstrip("\r")
+
+
+async def iter_msgpack(stream: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """
+    The iter_msgpack function unpacks the stream of the MessagePack maps, one map per contact, one after another.
+        The unpacker is fed chunk by chunk, so only the unfinished map stays in memory.
+        After the broken data the rest of the stream can not be parsed, so the import stops there.
+
+    :param stream: AsyncIterator[bytes]: The chunks of the request body
+    :return: The triples (number of the map, record, None) or (number of the map, None, parse error)
+    :doc-author: Trelent
+    """
+    unpacker = serializers.msgpack.Unpacker(max_buffer_size=1024 * 1024)
+    number = 0
+    async for chunk in stream:
+        try:
+            unpacker.feed(chunk)
+            for record in unpacker:
+                number += 1
+                if isinstance(record, dict):
+                    yield number, record, None
+                else:
+                    yield number, None, messages.BULK_BAD_MSGPACK
+        except (ValueError, serializers.msgpack.UnpackException):
+            yield number + 1, None, messages.BULK_BAD_MSGPACK
+            return
+
+
+async def iter_records(stream: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """
+    The iter_records function parses the lines of CSV (the first line is the header) or NDJSON into the dicts.
+        The MessagePack body is a stream of maps, their numbers are reported instead of the lines.
+
+    :param stream: AsyncIterator[bytes]: The chunks of the request body
+    :param fmt: str: csv, ndjson or msgpack
+    :return: The triples (line number, record, None) or (line number, None, parse error)
+    :doc-author: Trelent
+    """
+    if fmt == "msgpack":
+        async for item in iter_msgpack(stream):
+            yield item
+        return
+    header = None
+    async for number, line in iter_lines(stream):
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield number, None, messages.BULK_BAD_JSON
+                continue
+            if not isinstance(record, dict):
+                yield number, None, messages.BULK_BAD_JSON
+                continue
+            yield number, record, None
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield number, None, messages.BULK_BAD_CSV_ROW
+            continue
+        # порожнi колонки CSV вважаються не переданими, щоб спрацювали значення за замовчуванням схеми
+        yield number, {name: value for name, value in zip(header, values) if value != ""}, None
+
+
+def _errors(err: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in err.errors()]
+
+
+def validate_chunk(records: list[tuple[int, dict]]) -> tuple[list[tuple[int, ContactSchema]],
+                                                             list[tuple[int, list[str]]]]:
+    """
+    The validate_chunk function validates the chunk of the parsed rows with ContactSchema.
+
+    :param records: list[tuple[int, dict]]: The pairs (line number, record)
+    :return: The valid rows and the errors of the invalid ones, both with the line numbers
+    :doc-author: Trelent
+    """
+    valid, invalid = [], []
+    for line, record in records:
+        try:
+            valid.append((line, ContactSchema.model_validate(record)))
+        except ValidationError as err:
+            invalid.append((line, _errors(err)))
+    return valid, invalid
+
+
+async def import_contacts(stream: AsyncIterator[bytes], fmt: str, db: AsyncSession, user: User,
+                          chunk_size: int = config.BULK_IMPORT_CHUNK_SIZE,
+                          max_errors: int = config.BULK_IMPORT_MAX_ERRORS) -> dict:
+    """
+    The import_contacts function reads the streamed CSV / NDJSON / MessagePack, validates the rows with ContactSchema
+        chunk by chunk and writes the valid rows of every chunk with one multi-row INSERT. Every chunk is committed separately,
+        so the big import does not hold one long transaction.
+
+    :param stream: AsyncIterator[bytes]: The chunks of the request body
+    :param fmt: str: csv, ndjson or msgpack
+    :param db: AsyncSession: Access the database
+    :param user: User: The owner of the contacts
+    :param chunk_size: int: The number of the parsed rows, which are validated and inserted together
+    :param max_errors: int: The max number of the rows in the error report
+    :return: A dict with the number of the inserted and failed rows and the per-row error report
+    :doc-author: Trelent
+    """
+    report = {"inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    def fail(line: int, errors: list[str]):
+        report["failed"] += 1
+        if len(report["errors"]) < max_errors:
+            report["errors"].append({"line": line, "errors": errors})
+        else:
+            report["errors_truncated"] = True
+
+    async def flush(records: list[tuple[int, dict]]):
+        # валiдацiя EmailStr забирає бiльшу частину CPU iмпорту, тож чанк валiдується в окремому потоцi,
+        # а event loop тим часом обслуговує iншi запити
+        chunk, invalid = await asyncio.to_thread(validate_chunk, records)
+        for line, errors in invalid:
+            fail(line, errors)
+        inserted = await rep_contacts.create_contacts_bulk([body for _, body in chunk], db, user)
+        for line, body in chunk:
+            # email з RETURNING зараховується першому рядку з ним, решта (дублi у файлi чи в БД) - конфлiкт
+            if body.email in inserted:
+                inserted.discard(body.email)
+                report["inserted"] += 1
+            else:
+                fail(line, [f"email: {messages.CONTACT_EMAIL_EXISTS}"])
+
+    records = []
+    async for line, record, error in iter_records(stream, fmt):
+        if error is not None:
+            fail(line, [error])
+            continue
+        records.append((line, record))
+        if len(records) >= chunk_size:
+            await flush(records)
+            records = []
+    if records:
+        await flush(records)
+    return report
@@ -0,0 +1,89 @@
+import hashlib
+
+from fastapi import Response, status
+
+from src.services.serializers import JSON, MSGPACK
+
+# JSON та MessagePack одного контакту - рiзнi представлення (Vary: Accept), тож i сильнi ETag у них рiзнi:
+# iнакше кеш, який надсилає ETag усiх своїх варiантiв, отримав би 304 i вiддав би тiло не в тому форматi
+FORMAT_SUFFIXES = {JSON: "", MSGPACK: "-mp"}
+
+
+def contact_etag(contact_id: int, version: int, media_type: str = JSON) -> str:
+    """
+    The contact_etag function builds the strong ETag of one contact from its id, version and the format of the body.
+        The version changes with every update of the contact, so it is also the precondition of If-Match.
+
+    :param contact_id: int: The id of the contact
+    :param version: int: The version of the contact
+    :param media_type: str: The format of the response, application/json or application/msgpack
+    :return: The quoted ETag
+    :doc-author: Trelent
+    """
+    return f'"{contact_id}-{version}{FORMAT_SUFFIXES[media_type]}"'
+
+
+def if_match_versions(if_match: str, contact_id: int) -> list[int] | None:
+    """
+    The if_match_versions function extracts the versions of the contact from the If-Match header.
+        The ETags of both formats name the same version, so each of them is accepted.
+
+    :param if_match: str: The If-Match header
+    :param contact_id: int: The id of the contact
+    :return: The versions (empty, if no ETag belongs to this contact) or None for *, which matches any version
+    :doc-author: Trelent
+    """
+    if if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        # слабкi ETag не пiдходять для If-Match (RFC 9110, сильне порiвняння)
+        tag = tag.strip()
+        if tag.startswith('"') and tag.endswith('"'):
+            owner, _, version = tag[1:-1].partition("-")
+            version, suffix, fmt = version.partition("-")
+            if owner == str(contact_id) and version.isdigit() and suffix + fmt in FORMAT_SUFFIXES.values():
+                versions.append(int(version))
+    return versions
+
+
+def list_etag(user_id: int, version: str, field: str) -> str:
+    """
+    The list_etag function builds the strong ETag of a page of the contacts from the list_version of the user
+        and the parameters of the page: under one version the same page always has the same body.
+
+    :param user_id: int: The id of the user
+    :param version: str: The list_version of the user
+    :param field: str: The parameters of the page (see list_cache.page_field)
+    :return: The quoted ETag
+    :doc-author: Trelent
+    """
+    return f'"{hashlib.blake2b(f"{user_id}:{version}:{field}".encode(), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    The etag_matches function checks the If-None-Match header (one ETag, a list or *) against the current ETag.
+
+    :param if_none_match: str | None: The If-None-Match header
+    :param etag: str: The current ETag
+    :return: True, if the client already has the current representation
+    :doc-author: Trelent
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # слабкi ETag (W/"...") порiвнюються за значенням, як вимагає RFC 9110 для If-None-Match
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """
+    The not_modified function returns 304 Not Modified without a body.
+
+    :param etag: str: The current ETag
+    :return: The response 304
+    :doc-author: Trelent
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
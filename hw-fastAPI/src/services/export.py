@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import config
+from src.entity.models import Contact, User
+
+# тi ж поля, що й у [ContactResponseSchema]
+EXPORT_COLUMNS = (Contact.id, Contact.first_name, Contact.last_name, Contact.email, Contact.phone_number,
+                  Contact.birth_date, Contact.crm_status, Contact.created_at, Contact.updated_at)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _ndjson(rows) -> str:
+    return "".join(json.dumps(dict(zip(EXPORT_FIELDS, map(_value, row))), ensure_ascii=False) + "\n"
+                   for row in rows)
+
+
+def _csv(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows([[_value(value) for value in row] for row in rows])
+    return buffer.getvalue()
+
+
+async def export_contacts(db: AsyncSession, user: User, fmt: str,
+                          batch_size: int = config.EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """
+    The export_contacts function streams all contacts of the user as NDJSON or CSV (with the header line).
+        The rows are read from the server-side cursor batch by batch, as plain tuples of the columns
+        (no ORM objects, no join of the user), and every batch is serialized and sent before the next one is read,
+        so the memory does not depend on the number of the contacts.
+        When the client disconnects, the response cancels the generator and the cursor is closed.
+
+    :param db: AsyncSession: Access the database
+    :param user: User: The owner of the contacts
+    :param fmt: str: ndjson or csv
+    :param batch_size: int: The number of the rows, fetched from the cursor at once
+    :return: The chunks of the export
+    :doc-author: Trelent
+    """
+    serialize = _ndjson if fmt == "ndjson" else _csv
+    if fmt == "csv":
+        yield _csv([EXPORT_FIELDS]).encode()
+    statement = (select(*EXPORT_COLUMNS).where(Contact.user_id == user.id).order_by(Contact.id)
+                 .execution_options(yield_per=batch_size))
+    result = await db.stream(statement)
+    try:
+        async for rows in result.partitions():
+            yield serialize(rows).encode()
+    finally:
+        await result.close()
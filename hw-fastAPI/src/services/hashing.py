@@ -0,0 +1,226 @@
+import asyncio
+import math
+import time
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from src.conf import messages
+from src.conf.config import config
+
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Функцiї на рiвнi модуля, щоб їх можна було передати у [ProcessPoolExecutor] (вони серiалiзуються через pickle)
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _timed(func, *args):
+    # час самого bcrypt у worker; рiзниця з повним часом виклику - це очiкування у черзi executor
+    started = time.perf_counter()
+    return func(*args), time.perf_counter() - started
+
+
+class HashAdmission:
+    def __init__(self, queue_size: int, per_client: int, workers: int):
+        """
+        The __init__ function sets the limits of the admission control in front of the password hash executor:
+            the depth of the whole queue and the share of the queue, which one IP or one account may take.
+
+        :param self: Represent the instance of the class
+        :param queue_size: int: The max number of the hash jobs, which wait or run
+        :param per_client: int: The max number of the hash jobs of one IP and of one account
+        :param workers: int: The number of the workers of the executor, used for Retry-After
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.queue_size = queue_size
+        self.per_client = per_client
+        self.workers = workers
+        self.pending = 0
+        self.by_ip = Counter()
+        self.by_account = Counter()
+        # середнiй час одного bcrypt (EWMA), стартове значення - типовий bcrypt з 12 раундами
+        self.service_time = 0.3
+        self.admitted = 0
+        self.rejected = Counter()
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def retry_after(self) -> int:
+        """
+        The retry_after function estimates in how many seconds the queue will have room again.
+
+        :param self: Represent the instance of the class
+        :return: The number of seconds for the Retry-After header
+        :doc-author: Trelent
+        """
+        return max(1, math.ceil(self.pending * self.service_time / self.workers))
+
+    def _reject(self, reason: str):
+        self.rejected[reason] += 1
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=messages.HASH_QUEUE_FULL,
+                            headers={"Retry-After": str(self.retry_after())})
+
+    @contextmanager
+    def admit(self, ip: str | None = None, account: str | None = None):
+        """
+        The admit function takes a place in the queue for one hash job or rejects it at once with 429,
+            if the queue is full or the IP / account already holds its share of the queue.
+            The counters are changed without await, so inside one event loop no lock is needed.
+
+        :param self: Represent the instance of the class
+        :param ip: str | None: The IP of the client
+        :param account: str | None: The email of the account
+        :return: A context manager, which holds the place while the job runs
+        :doc-author: Trelent
+        """
+        if self.pending >= self.queue_size:
+            self._reject("queue")
+        if ip is not None and self.by_ip[ip] >= self.per_client:
+            self._reject("ip")
+        if account is not None and self.by_account[account] >= self.per_client:
+            self._reject("account")
+        self.pending += 1
+        self.admitted += 1
+        if ip is not None:
+            self.by_ip[ip] += 1
+        if account is not None:
+            self.by_account[account] += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+            # Counter не видаляє нульовi ключi сам, тож прибираємо їх, щоб словники не росли
+            for counter, key in ((self.by_ip, ip), (self.by_account, account)):
+                if key is not None:
+                    counter[key] -= 1
+                    if counter[key] <= 0:
+                        del counter[key]
+
+    def observe(self, wait: float, service: float):
+        """
+        The observe function records the time of one hash job: the wait in the queue and the bcrypt itself.
+
+        :param self: Represent the instance of the class
+        :param wait: float: The seconds in the queue of the executor
+        :param service: float: The seconds of bcrypt
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.service_time += 0.2 * (service - self.service_time)
+
+    def stats(self) -> dict:
+        """
+        The stats function returns the metrics of the queue: depth, admitted and rejected jobs and the wait time.
+
+        :param self: Represent the instance of the class
+        :return: A dict with the metrics
+        :doc-author: Trelent
+        """
+        completed = self.admitted - self.pending
+        return {"depth": self.pending, "queue_size": self.queue_size, "admitted": self.admitted,
+                "rejected": dict(self.rejected), "rejected_total": sum(self.rejected.values()),
+                "wait_avg_ms": round(self.wait_total / completed * 1000, 3) if completed else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "service_ms": round(self.service_time * 1000, 3)}
+
+
+class PasswordHasher:
+    def __init__(self, kind: str, workers: int, queue_size: int = 32, per_client: int = 4):
+        """
+        The __init__ function remembers the kind and the size of the executor, which runs bcrypt,
+            and creates the admission control in front of it. The executor itself is created on the first use.
+
+        :param self: Represent the instance of the class
+        :param kind: str: thread or process
+        :param workers: int: The number of the workers of the executor
+        :param queue_size: int: The max number of the hash jobs, which wait or run
+        :param per_client: int: The max number of the hash jobs of one IP and of one account
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError("Password hash executor must be thread or process.")
+        self.kind = kind
+        self.workers = workers
+        self.admission = HashAdmission(queue_size, per_client, workers)
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        """
+        The executor function returns the executor of the hasher and creates it on the first call.
+
+        :param self: Represent the instance of the class
+        :return: The thread or process pool executor
+        :doc-author: Trelent
+        """
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func, *args, ip: str | None = None, account: str | None = None):
+        with self.admission.admit(ip, account):
+            started = time.perf_counter()
+            result, service = await asyncio.get_running_loop().run_in_executor(self.executor, _timed, func, *args)
+            self.admission.observe(time.perf_counter() - started - service, service)
+        return result
+
+    async def hash(self, password: str, ip: str | None = None, account: str | None = None) -> str:
+        """
+        The hash function hashes the password on the executor, so the event loop keeps serving other requests.
+
+        :param self: Represent the instance of the class
+        :param password: str: The password
+        :param ip: str | None: The IP of the client, for the admission control
+        :param account: str | None: The email of the account, for the admission control
+        :return: The bcrypt hash of the password
+        :doc-author: Trelent
+        """
+        return await self._run(hash_password, password, ip=ip, account=account)
+
+    async def verify(self, plain_password: str, hashed_password: str, ip: str | None = None,
+                     account: str | None = None) -> bool:
+        """
+        The verify function checks the password against the hash on the executor.
+
+        :param self: Represent the instance of the class
+        :param plain_password: str: The password entered by the user
+        :param hashed_password: str: The hash from the database
+        :param ip: str | None: The IP of the client, for the admission control
+        :param account: str | None: The email of the account, for the admission control
+        :return: True, if the password matches the hash
+        :doc-author: Trelent
+        """
+        return await self._run(verify_password, plain_password, hashed_password, ip=ip, account=account)
+
+    def shutdown(self):
+        """
+        The shutdown function stops the executor; the next call creates a new one.
+
+        :param self: Represent the instance of the class
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(config.PASSWORD_HASH_EXECUTOR, config.PASSWORD_HASH_WORKERS,
+                                 config.PASSWORD_HASH_QUEUE_SIZE, config.PASSWORD_HASH_PER_CLIENT)
@@ -0,0 +1,126 @@
+import time
+
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.database.redis_pool import redis_client
+from src.services.user_cache import TierStats
+
+# Сторiнки GET /api/contacts кешуються готовими байтами вiдповiдi в одному hash Redis на користувача:
+# поле "v" - поточна list_version, поле сторiнки (limit, offset, cursor, sort) - "<version>\n<next cursor>\n<body>".
+# Запис контакту замiнює весь hash новою версiєю, тож iнвалiдацiя - це O(1) без сканування ключiв,
+# а сторiнка, зiбрана пiд старою версiєю, просто не збiгається з поточною i є промахом.
+LIST_CACHE_PREFIX = "contacts:list:"
+VERSION_FIELD = "v"
+
+list_stats = TierStats()
+
+
+def _key(user_id: int) -> str:
+    return f"{LIST_CACHE_PREFIX}{user_id}"
+
+
+def page_field(limit: int, offset: int, cursor: str | None, sort: str, media_type: str = "application/json") -> str:
+    """
+    The page_field function builds the name of the field of the cached page from the parameters of the listing.
+        The pages in the other formats than JSON (MessagePack) are cached in their own fields.
+
+    :param limit: int: The size of the page
+    :param offset: int: The offset of the page
+    :param cursor: str | None: The cursor of the page
+    :param sort: str: The sort key
+    :param media_type: str: The format of the cached body
+    :return: The field name
+    :doc-author: Trelent
+    """
+    # з курсором offset iгнорується, тож не входить до ключа
+    field = f"{limit}:{sort}:c:{cursor}" if cursor else f"{limit}:{sort}:o:{offset}"
+    return field if media_type == "application/json" else f"{field}:{media_type}"
+
+
+async def get_page(user_id: int, field: str, redis=redis_client) -> tuple[str, bytes | None, str | None]:
+    """
+    The get_page function reads the current list_version of the user and the cached page in one round trip.
+
+    :param user_id: int: The id of the user
+    :param field: str: The field of the page
+    :param redis: The Redis client
+    :return: The version, the body of the page (None on a miss) and its next cursor
+    :doc-author: Trelent
+    """
+    try:
+        version, cached = await redis.hmget(_key(user_id), [VERSION_FIELD, field])
+    except RedisError as err:
+        print(err)
+        list_stats.misses += 1
+        return "", None, None
+    # версiї ще немає (перший запит або hash вичерпав TTL) - сторiнка збережеться пiд новою унiкальною версiєю,
+    # тож версiя, яку вже бачили клiєнти (ETag), не повториться для iнших даних
+    version = version.decode() if version else str(time.time_ns())
+    if cached:
+        cached_version, next_cursor, body = cached.split(b"\n", 2)
+        if cached_version.decode() == version:
+            list_stats.hits += 1
+            return version, body, next_cursor.decode() or None
+    list_stats.misses += 1
+    return version, None, None
+
+
+async def set_page(user_id: int, version: str, field: str, body: bytes, next_cursor: str | None,
+                   redis=redis_client):
+    """
+    The set_page function stores the serialized page under the version, which was read before the query.
+        If a write bumped the version in the meantime, the stored page never matches and is a miss.
+
+    :param user_id: int: The id of the user
+    :param version: str: The list_version from get_page
+    :param field: str: The field of the page
+    :param body: bytes: The serialized response
+    :param next_cursor: str | None: The cursor of the next page
+    :param redis: The Redis client
+    :return: Nothing
+    :doc-author: Trelent
+    """
+    if not version:
+        return
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            # HSETNX не перезаписує версiю, встановлену записом контакту, - тодi сторiнка просто не збiгається з нею
+            pipe.hsetnx(_key(user_id), VERSION_FIELD, version)
+            pipe.hset(_key(user_id), field, f"{version}\n{next_cursor or ''}\n".encode() + body)
+            pipe.expire(_key(user_id), config.CONTACTS_LIST_CACHE_TTL)
+            await pipe.execute()
+    except RedisError as err:
+        print(err)
+
+
+async def bump_list_version(user_id: int, redis=redis_client):
+    """
+    The bump_list_version function invalidates all cached pages of the user after a write of the contacts.
+        The new version is unique (time in ns), so an old version never comes back, even after the hash expires.
+        The errors of Redis are not raised: the TTL bounds how long the stale pages may be served.
+
+    :param user_id: int: The id of the user
+    :param redis: The Redis client
+    :return: Nothing
+    :doc-author: Trelent
+    """
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            # UNLINK звiльняє старi сторiнки у фонi Redis, тож виклик лишається O(1)
+            pipe.unlink(_key(user_id))
+            pipe.hset(_key(user_id), VERSION_FIELD, str(time.time_ns()))
+            pipe.expire(_key(user_id), config.CONTACTS_LIST_CACHE_TTL)
+            await pipe.execute()
+    except RedisError as err:
+        print(err)
+
+
+def list_cache_stats() -> dict:
+    """
+    The list_cache_stats function reports the hits, misses and hit ratio of the cache of the contact listings.
+
+    :return: A dict with the stats
+    :doc-author: Trelent
+    """
+    return list_stats.as_dict()
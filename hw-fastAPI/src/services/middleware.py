@@ -1,30 +1,69 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 from fastapi.responses import JSONResponse
-from ipaddress import ip_address, ip_network
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from src.conf import messages
+from src.services.blocklist import IPBlocklist, blocklist
+from src.services.user_agents import UserAgentFilter, user_agent_filter
 
-# Black list
-banned_ips = [
-    ip_network("10.0.0.0/8"),
-    ip_network("172.16.0.0/12"),
-    ip_network("192.168.0.0/16"),]
-    # ip_network("127.0.0.1")]
 
+class BlackListMiddleware:
+    """
+    The BlackListMiddleware class answers 403 to the clients from the blocked networks (src/services/blocklist.py).
+        It is the plain ASGI middleware: the address is taken from the scope, the allowed request goes
+        to the app as is, without the task and the stream wrapping of BaseHTTPMiddleware.
+    """
 
-class BlackListMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host
+    def __init__(self, app: ASGIApp, blocklist: IPBlocklist = blocklist):
+        """
+        The __init__ function wraps the app.
 
-        # Проверка, является ли запрос тестовым
-        if client_ip == "testclient":
-            return await call_next(request)
+        :param self: Represent the instance of the class
+        :param app: ASGIApp: The next app of the middleware stack
+        :param blocklist: IPBlocklist: The blocked networks, reloaded in place by watch_blocklist
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.app = app
+        self.blocklist = blocklist
 
-        # Ваш код для проверки бана по IP
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            client = scope.get("client")
+            host = client[0] if client else None
+            # Проверка, является ли запрос тестовым
+            if host is not None and host != "testclient" and host in self.blocklist:
+                response = JSONResponse(status_code=403, content={"detail": messages.BANNED})
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
 
-        for banned_ip in banned_ips:
-            if ip_address(client_ip) in banned_ip:
-                return JSONResponse(status_code=403, content={"detail": "You are banned"})
 
-        response = await call_next(request)
-        return response
\ No newline at end of file
+class UserAgentBanMiddleware:
+    """
+    The UserAgentBanMiddleware class answers 403 to the bots, whose user-agent matches the ban patterns
+        (src/services/user_agents.py). It is the plain ASGI middleware, like BlackListMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp, user_agents: UserAgentFilter = user_agent_filter):
+        """
+        The __init__ function wraps the app.
+
+        :param self: Represent the instance of the class
+        :param app: ASGIApp: The next app of the middleware stack
+        :param user_agents: UserAgentFilter: The ban patterns, changed in place at runtime
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.app = app
+        self.user_agents = user_agents
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            user_agent = ""
+            for name, value in scope["headers"]:
+                if name == b"user-agent":
+                    user_agent = value.decode("latin-1")
+                    break
+            if user_agent in self.user_agents:
+                response = JSONResponse(status_code=403, content={"detail": messages.BANNED})
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
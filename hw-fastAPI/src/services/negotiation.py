@@ -0,0 +1,121 @@
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from src.services import serializers
+from src.services.serializers import JSON, MSGPACK, response_format
+
+# назви MessagePack, якi зустрiчаються у клiєнтiв
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+JSON_TYPES = (JSON, "application/*", "*/*")
+
+
+def _media_types(header: str):
+    for part in header.split(","):
+        media, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        yield media.strip().lower(), quality
+
+
+def preferred_media_type(accept: str | None) -> str:
+    """
+    The preferred_media_type function chooses the format of the response from the Accept header.
+        MessagePack is chosen only when the client names it and prefers it at least as much as JSON,
+        so the browsers and the clients with */* keep getting JSON.
+
+    :param accept: str | None: The Accept header
+    :return: application/msgpack or application/json
+    :doc-author: Trelent
+    """
+    if not accept:
+        return JSON
+    msgpack_quality = json_quality = 0.0
+    for media, quality in _media_types(accept):
+        if media in MSGPACK_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media in JSON_TYPES:
+            json_quality = max(json_quality, quality)
+    return MSGPACK if msgpack_quality > 0 and msgpack_quality >= json_quality else JSON
+
+
+def is_msgpack(content_type: str | None) -> bool:
+    """
+    The is_msgpack function checks, whether the body of the request is MessagePack.
+
+    :param content_type: str | None: The Content-Type header
+    :return: True for MessagePack
+    :doc-author: Trelent
+    """
+    return (content_type or "").split(";")[0].strip().lower() in MSGPACK_TYPES
+
+
+class MsgPackRequest(Request):
+    """
+    The MsgPackRequest class gives the MessagePack body to FastAPI as if it was JSON:
+        the Content-Type is replaced with application/json and json() decodes MessagePack,
+        so the body is validated by the same pydantic schemas as the JSON one.
+    """
+
+    def __init__(self, scope, receive):
+        headers = [(name, value) for name, value in scope["headers"] if name != b"content-type"]
+        super().__init__({**scope, "headers": headers + [(b"content-type", JSON.encode())]}, receive)
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = serializers.msgpack.unpackb(await self.body())
+        return self._json
+
+
+def to_msgpack(response: Response) -> Response:
+    """
+    The to_msgpack function re-encodes the JSON response of FastAPI (response_model, dicts) into MessagePack.
+        The responses without a body (304, 204), the streams and the non-JSON responses are returned as is.
+
+    :param response: Response: The response of the route
+    :return: The MessagePack response
+    :doc-author: Trelent
+    """
+    body = getattr(response, "body", b"")
+    if not body or response.headers.get("content-type", "").split(";")[0] != JSON:
+        return response
+    headers = {name: value for name, value in response.headers.items() if name not in ("content-length", "content-type")}
+    return Response(content=serializers.packb(serializers.loads(body)), status_code=response.status_code,
+                    headers=headers, media_type=MSGPACK, background=response.background)
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    The NegotiatedRoute class adds MessagePack to all routes of the router (APIRouter(route_class=NegotiatedRoute)).
+        The body with Content-Type: application/msgpack is decoded before the validation,
+        the response is encoded by Accept: the serializers of the repository rows write MessagePack directly
+        (response_format), the other JSON responses are re-encoded by to_msgpack.
+        The errors (HTTPException, 422) are answered by the exception handlers of the app and stay JSON.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            if self.body_field is not None and is_msgpack(request.headers.get("content-type")):
+                request = MsgPackRequest(request.scope, request.receive)
+            media_type = preferred_media_type(request.headers.get("accept"))
+            token = response_format.set(media_type)
+            try:
+                response = await handler(request)
+            finally:
+                response_format.reset(token)
+            if media_type == MSGPACK and response.headers.get("content-type") != MSGPACK:
+                response = to_msgpack(response)
+            # кешi (CDN, браузер) мають розрiзняти JSON та MessagePack вiдповiдi одного URL
+            response.headers.append("Vary", "Accept")
+            return response
+
+        return negotiated_handler
@@ -0,0 +1,111 @@
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, or_
+
+from src.conf import messages
+from src.entity.models import Contact
+
+
+# Ключi сортування, за якими можливий keyset-пошук. Останнiм завжди йде <id>, щоб порядок був строго однозначним,
+# навiть якщо декiлька контактiв створено в одну й ту саму мить.
+SORT_KEYS = {
+    "id": (Contact.id,),
+    "created_at": (Contact.created_at, Contact.id),
+}
+# <created_at> може бути NULL (старi рядки): вони йдуть в кiнцi на будь-якiй БД. NULLS LAST - типовий порядок
+# iндексу Postgres для ASC, тож iндекс (user_id, created_at, id) i далi вiддає сторiнку без сортування
+SORT_ORDER = {
+    "id": (Contact.id,),
+    "created_at": (Contact.created_at.asc().nulls_last(), Contact.id),
+}
+
+
+def encode_cursor(sort: str, values: list) -> str:
+    """
+    The encode_cursor function packs the sort key and the values of the last row on the page
+    into an opaque url-safe string, which the client sends back to get the next page.
+
+    :param sort: str: The name of the sort key (see SORT_KEYS)
+    :param values: list: The values of the sort columns of the last row
+    :return: An opaque cursor string, NULL values are kept as null
+    :doc-author: Trelent
+    """
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps({"s": sort, "v": values}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    """
+    The decode_cursor function unpacks the cursor created by encode_cursor.
+        If the cursor is damaged, was issued for another sort key or its values have wrong types,
+        HTTPException 422 is raised, so no crafted value reaches the query.
+
+    :param cursor: str: The cursor from the query string
+    :param sort: str: The sort key that the client asks for now
+    :return: The values of the sort columns of the last row of the previous page, created_at may be None
+    :doc-author: Trelent
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        values = data["v"]
+        if data["s"] != sort or not isinstance(values, list) or len(values) != len(SORT_KEYS[sort]):
+            raise ValueError(cursor)
+        # останнiм завжди йде <id>; bool - пiдклас int, але id не буває true / false
+        if not isinstance(values[-1], int) or isinstance(values[-1], bool):
+            raise ValueError(cursor)
+        if sort == "created_at" and values[0] is not None:
+            values[0] = datetime.fromisoformat(values[0])
+        return values
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=messages.INVALID_CURSOR)
+
+
+def paginate(statement: Select, limit: int, offset: int, cursor: str | None = None, sort: str = "id") -> Select:
+    """
+    The paginate function adds ordering and pagination to the statement.
+        Without a cursor the old offset mode is used, so the old clients keep working.
+        With a cursor the statement seeks right after the last row of the previous page (keyset pagination),
+        so the database does not scan and throw away all of the skipped rows.
+        The contacts without created_at go after all others, ordered by id.
+
+    :param statement: Select: The statement to paginate
+    :param limit: int: Limit the number of results returned
+    :param offset: int: The number of records to skip (only in offset mode)
+    :param cursor: str | None: The cursor of the next page
+    :param sort: str: The sort key, id or created_at
+    :return: The paginated statement
+    :doc-author: Trelent
+    """
+    statement = statement.order_by(*SORT_ORDER[sort]).limit(limit)
+    if cursor is None:
+        return statement.offset(offset)
+    values = decode_cursor(cursor, sort)
+    if sort == "id":
+        return statement.where(Contact.id > values[0])
+    if values[0] is None:
+        return statement.where(Contact.created_at.is_(None), Contact.id > values[1])
+    return statement.where(or_(Contact.created_at > values[0],
+                               and_(Contact.created_at == values[0], Contact.id > values[1]),
+                               Contact.created_at.is_(None)))
+
+
+def next_cursor(contacts: list, limit: int, sort: str = "id") -> str | None:
+    """
+    The next_cursor function builds the cursor of the next page from the last row of the current one.
+        If the page is not full, there is nothing more to read and None is returned.
+
+    :param contacts: list: The contacts of the current page
+    :param limit: int: The page size
+    :param sort: str: The sort key, id or created_at
+    :return: The cursor of the next page or None
+    :doc-author: Trelent
+    """
+    if not contacts or len(contacts) < limit:
+        return None
+    last = contacts[-1]
+    return encode_cursor(sort, [getattr(last, column.key) for column in SORT_KEYS[sort]])
@@ -0,0 +1,210 @@
+import asyncio
+import time
+from math import ceil
+
+from fastapi import Request, Response
+from fastapi_limiter import FastAPILimiter
+from fastapi_limiter.depends import RateLimiter as RedisRateLimiter
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.database.redis_pool import redis_client
+
+STRICT = "strict"
+APPROXIMATE = "approximate"
+
+
+class Bucket:
+    __slots__ = ("tat", "times", "milliseconds", "pending", "window", "own", "others")
+
+    def __init__(self, now: float, times: int, milliseconds: int):
+        """
+        The __init__ function creates the empty GCRA state of one key: the next request is allowed right away.
+
+        :param self: Represent the instance of the class
+        :param now: float: The current monotonic time in milliseconds
+        :param times: int: The number of the requests per period
+        :param milliseconds: int: The period in milliseconds
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.times = times
+        self.milliseconds = milliseconds
+        # theoretical arrival time: коли лiмiт ключа повнiстю вiдновиться
+        self.tat = now
+        # пропущенi запити, ще не записанi в Redis
+        self.pending = 0
+        # вiкно Redis, за яке рахуються own та others
+        self.window = None
+        self.own = 0
+        self.others = 0
+
+
+class LocalLimits:
+    """
+    The LocalLimits class keeps the rate limits of one worker in memory (GCRA): the check of a request
+        is a few arithmetic operations without awaits, so it needs neither locks nor the round trip to Redis.
+        The allowed requests are written to Redis in batches by sync, which also charges the local buckets
+        with the requests allowed by the other workers. Between two syncs every worker may let through
+        up to its own limit, so the common limit is approximate.
+    """
+
+    def __init__(self, prefix: str = "fastapi-limiter:approx"):
+        """
+        The __init__ function creates the empty table of the buckets.
+
+        :param self: Represent the instance of the class
+        :param prefix: str: The prefix of the counters in Redis
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.prefix = prefix
+        self.buckets: dict[str, Bucket] = {}
+
+    def hit(self, key: str, times: int, milliseconds: int, now: float | None = None) -> int:
+        """
+        The hit function counts the request of the key, if the limit allows it.
+            The limit of times requests per milliseconds is spread evenly (GCRA), the burst of times requests
+            is allowed after a pause of milliseconds.
+
+        :param self: Represent the instance of the class
+        :param key: str: The key of the client and the route
+        :param times: int: The number of the requests per period
+        :param milliseconds: int: The period in milliseconds
+        :param now: float | None: The current monotonic time in milliseconds, for the tests
+        :return: 0 if the request is allowed, otherwise the milliseconds to wait (as pexpire of fastapi_limiter)
+        :doc-author: Trelent
+        """
+        if times <= 0:
+            return max(milliseconds, 1)
+        now = time.monotonic() * 1000 if now is None else now
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = Bucket(now, times, milliseconds)
+        interval = milliseconds / times
+        tat = max(bucket.tat, now)
+        wait = tat - now - (milliseconds - interval)
+        if wait > 0:
+            return ceil(wait)
+        bucket.tat = tat + interval
+        bucket.pending += 1
+        return 0
+
+    async def sync(self, redis):
+        """
+        The sync function writes the requests allowed since the last sync into Redis with one pipeline.
+            Redis counts the requests of all workers per key in fixed windows of the period;
+            the requests of the other workers, which this worker has not seen yet, are added to its bucket.
+            The requests allowed while the pipeline is running are kept for the next sync.
+
+        :param self: Represent the instance of the class
+        :param redis: The Redis client
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        batch = [(key, bucket, bucket.pending) for key, bucket in self.buckets.items() if bucket.pending]
+        if batch:
+            wall = time.time() * 1000
+            async with redis.pipeline(transaction=False) as pipe:
+                windows = []
+                for key, bucket, count in batch:
+                    window = int(wall // bucket.milliseconds)
+                    windows.append(window)
+                    counter = f"{self.prefix}:{key}:{window}"
+                    pipe.incrby(counter, count)
+                    pipe.pexpire(counter, bucket.milliseconds * 2)
+                totals = (await pipe.execute())[::2]
+            now = time.monotonic() * 1000
+            for (key, bucket, count), window, total in zip(batch, windows, totals):
+                bucket.pending -= count
+                if bucket.window != window:
+                    bucket.window, bucket.own, bucket.others = window, 0, 0
+                bucket.own += count
+                others = int(total) - bucket.own
+                if others > bucket.others:
+                    # чужi запити займають мiсце в локальному лiмiтi так само, як i свої
+                    interval = bucket.milliseconds / bucket.times
+                    bucket.tat = max(bucket.tat, now) + (others - bucket.others) * interval
+                    bucket.others = others
+        self.prune()
+
+    def prune(self, now: float | None = None):
+        """
+        The prune function drops the buckets, which are fully restored and written to Redis:
+            such a bucket is the same as a new one, so the table does not grow with every client ever seen.
+
+        :param self: Represent the instance of the class
+        :param now: float | None: The current monotonic time in milliseconds, for the tests
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        now = time.monotonic() * 1000 if now is None else now
+        for key in [key for key, bucket in self.buckets.items() if not bucket.pending and bucket.tat <= now]:
+            del self.buckets[key]
+
+    def __len__(self):
+        return len(self.buckets)
+
+
+# Один набiр лiмiтiв на воркер, спiльний для всiх маршрутiв
+local_limits = LocalLimits()
+
+
+class RateLimiter(RedisRateLimiter):
+    """
+    The RateLimiter class is the drop-in replacement of fastapi_limiter.depends.RateLimiter
+        with the same arguments, identifier and callback.
+        RATE_LIMIT_MODE=strict checks every request in Redis, as fastapi_limiter does;
+        RATE_LIMIT_MODE=approximate checks it in local_limits of the worker without awaiting Redis.
+    """
+
+    def __init__(self, *args, mode: str | None = None, **kwargs):
+        """
+        The __init__ function takes the arguments of fastapi_limiter.depends.RateLimiter and the mode.
+
+        :param self: Represent the instance of the class
+        :param mode: str | None: strict or approximate, RATE_LIMIT_MODE by default
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        super().__init__(*args, **kwargs)
+        self.mode = mode
+
+    async def __call__(self, request: Request, response: Response):
+        """
+        The __call__ function checks the request as the dependency of the route.
+
+        :param self: Represent the instance of the class
+        :param request: Request: The request
+        :param response: Response: The response
+        :return: Nothing, the callback raises 429 when the limit is exceeded
+        :doc-author: Trelent
+        """
+        if (self.mode or config.RATE_LIMIT_MODE) == STRICT:
+            return await super().__call__(request, response)
+        identifier = self.identifier or FastAPILimiter.identifier
+        callback = self.callback or FastAPILimiter.http_callback
+        # шлях у ключi вже є (default_identifier), метод розрiзняє GET та PUT одного контакту
+        key = f"{await identifier(request)}:{request.method}"
+        pexpire = local_limits.hit(key, self.times, self.milliseconds)
+        if pexpire != 0:
+            return await callback(request, response, pexpire)
+
+
+async def sync_limits(redis=redis_client, interval: float = config.RATE_LIMIT_SYNC_INTERVAL):
+    """
+    The sync_limits function is the background task of a worker in the approximate mode,
+    which writes local_limits into Redis every interval seconds. While Redis is unavailable
+    the requests are limited locally and their counts wait for the next sync.
+
+    :param redis: The Redis client
+    :param interval: float: The pause between the syncs in seconds
+    :return: Nothing, it runs until cancelled
+    :doc-author: Trelent
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await local_limits.sync(redis)
+        except (RedisError, OSError) as err:
+            print(err)
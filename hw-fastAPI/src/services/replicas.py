@@ -0,0 +1,54 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import config
+from src.database.db import acquire, get_db, sessionmanager
+from src.entity.models import User
+from src.services.auth import auth_service
+
+
+class ReadSession:
+    """
+    The ReadSession class is the database dependency of the read-only routes: it gives the route
+        the session of a healthy replica, or the session of the primary (get_db), when there is no healthy replica
+        or the current user has written within DB_READ_YOUR_WRITES_WINDOW (read-your-writes).
+        The connection is checked out in advance with the acquire timeout of the route, like AcquireTimeout.
+    """
+
+    def __init__(self, acquire_timeout: float):
+        """
+        The __init__ function sets the acquire timeout of the route.
+
+        :param self: Represent the instance of the class
+        :param acquire_timeout: float: The maximal wait for a connection in seconds
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.acquire_timeout = acquire_timeout
+
+    async def __call__(self, db: AsyncSession = Depends(get_db),
+                       user: User = Depends(auth_service.get_current_user)):
+        """
+        The __call__ function yields the session for the reads of the user (get_db and the user are cached per request).
+
+        :param self: Represent the instance of the class
+        :param db: AsyncSession: The session of the primary
+        :param user: User: The current user
+        :return: The session of a replica or of the primary
+        :doc-author: Trelent
+        """
+        if await sessionmanager.use_primary(user.id):
+            await acquire(db, self.acquire_timeout)
+            yield db
+            return
+        session = sessionmanager.replica_session()
+        try:
+            await acquire(session, self.acquire_timeout)
+            yield session
+        finally:
+            await session.close()
+
+
+# швидкi читання (/contacts/all, /contacts/{id}, пошук, днi народження): реплiка, а на пулi - краще одразу 503,
+# нiж черга на DB_POOL_TIMEOUT
+read_db = ReadSession(config.DB_ACQUIRE_TIMEOUT)
@@ -0,0 +1,71 @@
+from sqlalchemy import Select, select, or_, func, column, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.entity.models import Contact
+
+
+# Поля контакту, за якими працює пошук
+SEARCH_FIELDS = {
+    "first_name": Contact.first_name,
+    "last_name": Contact.last_name,
+    "email": Contact.email,
+}
+
+# Trigram iндекс не може обслужити запит, коротший за один trigram
+MIN_TRIGRAM_LENGTH = 3
+
+# FTS5 таблиця на SQLite; прихована колонка з назвою таблицi використовується у виразi MATCH
+contacts_fts = table("contacts_fts", column("rowid"), column("rank"), column("contacts_fts"))
+
+
+def _fts_match(fields: list[str], query: str) -> str:
+    """
+    The _fts_match function builds the FTS5 MATCH expression with a column filter,
+    the query is quoted as one phrase, so that its characters are not parsed as the FTS5 syntax.
+
+    :param fields: list[str]: The names of the searched fields
+    :param query: str: The substring to search for
+    :return: The FTS5 MATCH expression
+    :doc-author: Trelent
+    """
+    phrase = '"' + query.replace('"', '""') + '"'
+    return "{" + " ".join(fields) + "} : " + phrase
+
+
+def search_statement(fields: list[str], query: str, dialect: str, entities: tuple = (Contact,)) -> Select:
+    """
+    The search_statement function builds the substring search over the contact fields, ranked by relevance.
+        On Postgres the ilike('%q%') filter is served by the pg_trgm GIN indexes and the rows are ordered
+        by the trigram similarity. On SQLite the FTS5 trigram table is matched and ordered by its bm25 rank.
+        The queries shorter than a trigram (and the other dialects) fall back to the plain ilike('%q%').
+
+    :param fields: list[str]: The names of the searched fields (see SEARCH_FIELDS)
+    :param query: str: The substring to search for
+    :param dialect: str: The name of the database dialect
+    :param entities: tuple: The selected entity or columns, the whole Contact by default
+    :return: The select statement of the contacts
+    :doc-author: Trelent
+    """
+    columns = [SEARCH_FIELDS[field] for field in fields]
+    if dialect == "sqlite" and len(query) >= MIN_TRIGRAM_LENGTH:
+        return (select(*entities)
+                .join(contacts_fts, contacts_fts.c.rowid == Contact.id)
+                .where(contacts_fts.c.contacts_fts.op("MATCH")(_fts_match(fields, query)))
+                .order_by(contacts_fts.c.rank, Contact.id))
+    statement = select(*entities).where(or_(*[column_.ilike(f'%{query}%') for column_ in columns]))
+    if dialect == "postgresql":
+        similarities = [func.similarity(column_, query) for column_ in columns]
+        rank = similarities[0] if len(similarities) == 1 else func.greatest(*similarities)
+        return statement.order_by(rank.desc(), Contact.id)
+    return statement.order_by(Contact.id)
+
+
+def dialect_name(db: AsyncSession) -> str:
+    """
+    The dialect_name function returns the name of the dialect of the database behind the session.
+
+    :param db: AsyncSession: The database session
+    :return: The name of the dialect, e.g. postgresql or sqlite
+    :doc-author: Trelent
+    """
+    return db.get_bind().dialect.name
@@ -0,0 +1,161 @@
+import json
+import operator
+from contextvars import ContextVar
+from datetime import date
+from typing import Iterable
+
+from fastapi import Response
+import msgpack
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from src.schemas.contact import ContactResponseSchema
+
+try:
+    import orjson
+except ImportError:
+    # без orjson той самий JSON дає pydantic_core, лише дещо повiльнiше
+    orjson = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+# формат вiдповiдi поточного запиту: його встановлює [NegotiatedRoute] за заголовком Accept
+response_format: ContextVar[str] = ContextVar("response_format", default=JSON)
+
+
+def dumps(value) -> bytes:
+    """
+    The dumps function encodes the plain python value (dicts, lists, str, int, date, datetime) into compact JSON bytes.
+
+    :param value: The value to encode
+    :return: The JSON bytes
+    :doc-author: Trelent
+    """
+    return orjson.dumps(value) if orjson is not None else to_json(value)
+
+
+def loads(body: bytes):
+    """
+    The loads function decodes the JSON bytes.
+
+    :param body: bytes: The JSON bytes
+    :return: The decoded value
+    :doc-author: Trelent
+    """
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def _msgpack_default(value):
+    # дати пишуться тими ж рядками ISO 8601, що й у JSON, тож клiєнт отримує однаковi данi в обох форматах
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+def packb(value) -> bytes:
+    """
+    The packb function encodes the plain python value into MessagePack bytes.
+
+    :param value: The value to encode
+    :return: The MessagePack bytes
+    :doc-author: Trelent
+    """
+    if orjson is not None:
+        # orjson переводить дати в рядки на C: так швидше, нiж виклик default з Python для кожної дати
+        return msgpack.packb(orjson.loads(orjson.dumps(value)))
+    return msgpack.packb(value, default=_msgpack_default)
+
+
+def encode(value) -> bytes:
+    """
+    The encode function encodes the value in the format of the response of the current request (response_format).
+
+    :param value: The value to encode
+    :return: The JSON or MessagePack bytes
+    :doc-author: Trelent
+    """
+    return packb(value) if response_format.get() == MSGPACK else dumps(value)
+
+
+class ModelSerializer:
+    """
+    The ModelSerializer class writes the trusted rows of the repository straight into the JSON
+        (or MessagePack, see response_format) of the response schema.
+        The rows came from the database through the schema on the way in, so their validation on the way out
+        (EmailStr etc.) is only repeated work: the serializer takes the fields of the schema by name
+        and encodes them with dumps, the bytes are the same as of schema.model_dump_json().
+        Only the schemas without aliases and custom serializers may be written this way.
+    """
+
+    def __init__(self, schema: type[BaseModel]):
+        """
+        The __init__ function prepares the getter of the fields of the schema once, when the module is imported.
+
+        :param self: Represent the instance of the class
+        :param schema: type[BaseModel]: The response schema
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.fields = tuple(schema.model_fields)
+        self._by_name = self._tuple_getter(operator.attrgetter(*self.fields))
+        # getter за позицiями колонок для кожного набору колонок рядка (Row._fields)
+        self._by_position = {}
+
+    def _tuple_getter(self, getter):
+        # attrgetter / itemgetter з одним полем повертає значення, а не кортеж
+        return getter if len(self.fields) > 1 else lambda row: (getter(row),)
+
+    def _getter(self, row):
+        columns = getattr(row, "_fields", None)
+        if columns is None:
+            return self._by_name
+        getter = self._by_position.get(columns)
+        if getter is None:
+            # доступ до Row за iндексом у кiлька разiв швидший, нiж за назвою атрибута
+            getter = self._tuple_getter(operator.itemgetter(*[columns.index(field) for field in self.fields]))
+            self._by_position[columns] = getter
+        return getter
+
+    def to_dict(self, row) -> dict:
+        """
+        The to_dict function takes the fields of the schema from the row (or the ORM object) by name.
+
+        :param self: Represent the instance of the class
+        :param row: The row with the attributes of the schema
+        :return: A dict in the order of the fields of the schema
+        :doc-author: Trelent
+        """
+        return dict(zip(self.fields, self._getter(row)(row)))
+
+    def dump(self, rows: Iterable) -> bytes:
+        """
+        The dump function encodes the rows as the array of the schema in the format of the current response.
+            All rows of one query have the same columns, so the getter is chosen by the first row.
+
+        :param self: Represent the instance of the class
+        :param rows: Iterable: The rows of the repository
+        :return: The JSON or MessagePack bytes
+        :doc-author: Trelent
+        """
+        rows = list(rows)
+        if not rows:
+            return encode([])
+        getter, fields = self._getter(rows[0]), self.fields
+        return encode([dict(zip(fields, getter(row))) for row in rows])
+
+    def response(self, rows: Iterable, headers: dict | None = None) -> Response:
+        """
+        The response function returns the rows as the ready application/json (or application/msgpack) response.
+            The route keeps its response_model for the OpenAPI docs, FastAPI does not touch the returned Response.
+
+        :param self: Represent the instance of the class
+        :param rows: Iterable: The rows of the repository
+        :param headers: dict | None: The extra headers of the response
+        :return: The response with the encoded rows
+        :doc-author: Trelent
+        """
+        return Response(content=self.dump(rows), media_type=response_format.get(), headers=headers)
+
+
+contacts_serializer = ModelSerializer(ContactResponseSchema)
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import re
+from functools import lru_cache
+from typing import Iterable
+
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.database.redis_pool import redis_client
+
+
+def compile_patterns(patterns: Iterable[str]) -> re.Pattern | None:
+    """
+    The compile_patterns function joins the ban patterns into one case-insensitive regex,
+        so the user-agent is scanned once for all of them instead of once per pattern.
+
+    :param patterns: Iterable[str]: The regex patterns, like yandexbot
+    :return: The compiled regex, or None for the empty list
+    :doc-author: Trelent
+    """
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+
+class UserAgentFilter:
+    """
+    The UserAgentFilter class answers, whether the user-agent matches one of the ban patterns.
+        The verdicts are kept in the bounded LRU cache: the clients send the same few user-agent strings,
+        so most of the requests do not run the regex at all. load replaces the patterns together with
+        the cache in one assignment.
+    """
+
+    def __init__(self, patterns: Iterable[str], cache_size: int = 4096):
+        """
+        The __init__ function compiles the initial patterns.
+
+        :param self: Represent the instance of the class
+        :param patterns: Iterable[str]: The regex patterns
+        :param cache_size: int: The maximal number of the cached verdicts
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.cache_size = cache_size
+        self.load(patterns)
+
+    def load(self, patterns: Iterable[str]):
+        """
+        The load function replaces the ban patterns and drops the cached verdicts.
+
+        :param self: Represent the instance of the class
+        :param patterns: Iterable[str]: The regex patterns
+        :return: Nothing
+        :doc-author: Trelent
+        :raises re.error: The pattern is not a valid regex, the old patterns stay in force
+        """
+        patterns = list(patterns)
+        regex = compile_patterns(patterns)
+        search = (lambda user_agent: False) if regex is None else (lambda user_agent: regex.search(user_agent) is not None)
+        self._state = (patterns, lru_cache(maxsize=self.cache_size)(search))
+
+    @property
+    def patterns(self) -> list[str]:
+        return list(self._state[0])
+
+    def __contains__(self, user_agent: str) -> bool:
+        return self._state[1](user_agent)
+
+    def stats(self) -> dict:
+        """
+        The stats function reports the hits, misses and size of the cache of the verdicts.
+
+        :param self: Represent the instance of the class
+        :return: A dict with the hits, misses, hit_ratio and size
+        :doc-author: Trelent
+        """
+        info = self._state[1].cache_info()
+        total = info.hits + info.misses
+        return {"hits": info.hits, "misses": info.misses, "hit_ratio": round(info.hits / total, 4) if total else 0.0,
+                "size": info.currsize}
+
+
+# Окрiм того, яблоки та яблочники не прокатяться
+# USER_AGENT_BAN_LIST=["Macintosh", "iPhone", "iPad", "AppleWebKit"]
+user_agent_filter = UserAgentFilter(config.USER_AGENT_BAN_LIST, config.USER_AGENT_CACHE_SIZE)
+
+
+async def save_patterns(patterns: list[str], redis=redis_client, key: str = config.USER_AGENT_BAN_REDIS_KEY):
+    """
+    The save_patterns function changes the ban patterns at runtime: the patterns are compiled first,
+    then saved to Redis, and only then applied in this worker, so all workers either get the new list
+    (the others in watch_user_agents) or keep the old one.
+
+    :param patterns: list[str]: The regex patterns
+    :param redis: The Redis client
+    :param key: str: The key of the patterns in Redis
+    :return: Nothing
+    :doc-author: Trelent
+    :raises re.error: The patterns do not compile together, nothing is changed
+    :raises RedisError: Redis is unavailable, nothing is changed
+    """
+    compile_patterns(patterns)
+    await redis.set(key, json.dumps(patterns))
+    user_agent_filter.load(patterns)
+
+
+async def watch_user_agents(interval: float = config.USER_AGENT_RELOAD_INTERVAL, redis=redis_client,
+                            key: str = config.USER_AGENT_BAN_REDIS_KEY):
+    """
+    The watch_user_agents function is the background task of a worker, which applies the ban patterns
+    saved in Redis by any worker. Until the patterns are saved, USER_AGENT_BAN_LIST stays in force.
+
+    :param interval: float: The pause between the checks in seconds
+    :param redis: The Redis client
+    :param key: str: The key of the patterns in Redis
+    :return: Nothing, it runs until cancelled
+    :doc-author: Trelent
+    """
+    while True:
+        try:
+            saved = await redis.get(key)
+            if saved is not None:
+                patterns = json.loads(saved)
+                if patterns != user_agent_filter.patterns:
+                    user_agent_filter.load(patterns)
+        except (RedisError, OSError, ValueError, re.error) as err:
+            print(err)
+        await asyncio.sleep(interval)
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.database.redis_pool import redis_client, redis_pubsub_client
+
+
+# Канал Redis pub/sub, у який публiкується <email> змiненого <user>, щоб усi воркери скинули локальну копiю
+INVALIDATION_CHANNEL = "users:invalidate"
+
+
+class TierStats:
+    def __init__(self):
+        """
+        The __init__ function sets the hit and miss counters of one cache tier to zero.
+
+        :param self: Represent the instance of the class
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.hits = 0
+        self.misses = 0
+
+    def as_dict(self) -> dict:
+        """
+        The as_dict function returns the counters of the tier together with its hit ratio.
+
+        :param self: Represent the instance of the class
+        :return: A dict with the hits, misses and hit_ratio
+        :doc-author: Trelent
+        """
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": round(self.hits / total, 4) if total else 0.0}
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        The __init__ function creates an empty bounded LRU cache, whose entries expire after ttl seconds.
+
+        :param self: Represent the instance of the class
+        :param maxsize: int: The maximal number of the entries
+        :param ttl: float: The lifetime of an entry in seconds
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = TierStats()
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        """
+        The get function returns the live entry and marks it as the most recently used one.
+            The expired entry is removed and counted as a miss.
+
+        :param self: Represent the instance of the class
+        :param key: The key of the entry
+        :return: The value or None
+        :doc-author: Trelent
+        """
+        item = self._data.get(key)
+        if item is not None:
+            expires_at, value = item
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.stats.hits += 1
+                return value
+            del self._data[key]
+        self.stats.misses += 1
+        return None
+
+    def set(self, key, value, ttl: float | None = None):
+        """
+        The set function puts the entry into the cache and evicts the least recently used ones over maxsize.
+
+        :param self: Represent the instance of the class
+        :param key: The key of the entry
+        :param value: The value of the entry
+        :param ttl: float | None: The lifetime of this entry in seconds, the ttl of the cache by default
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        """
+        The pop function removes the entry from the cache, if there is one.
+
+        :param self: Represent the instance of the class
+        :param key: The key of the entry
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self._data.pop(key, None)
+
+    def clear(self):
+        """
+        The clear function removes all of the entries.
+
+        :param self: Represent the instance of the class
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Перший рiвень кешу <user> - у пам'ятi процесу, перед Redis. Короткий TTL страхує на випадок,
+# якщо повiдомлення про iнвалiдацiю загубилося.
+local_users = TTLCache(maxsize=config.USER_LOCAL_CACHE_SIZE, ttl=config.USER_LOCAL_CACHE_TTL)
+# Другий рiвень - Redis; лiчильники оновлює [Auth.get_current_user]
+redis_stats = TierStats()
+
+
+async def invalidate_user(email: str, redis=redis_client):
+    """
+    The invalidate_user function drops the cached user from both tiers and tells the other workers to do the same.
+        The errors of Redis are not raised: the local TTL bounds how long the other workers may see the stale user.
+
+    :param email: str: The email of the changed user
+    :param redis: The Redis client
+    :return: Nothing
+    :doc-author: Trelent
+    """
+    local_users.pop(email)
+    try:
+        await redis.delete(email)
+        await redis.publish(INVALIDATION_CHANNEL, email)
+    except RedisError as err:
+        print(err)
+
+
+async def listen_invalidations(redis=redis_pubsub_client, retry_delay: float = 1.0):
+    """
+    The listen_invalidations function is the background task of a worker, which drops the local copies
+    of the users changed by any worker. After the reconnect the local tier is cleared,
+    because the messages sent in the meantime are lost.
+
+    :param redis: The Redis client without the socket timeout
+    :param retry_delay: float: The pause before the reconnect in seconds
+    :return: Nothing, it runs until cancelled
+    :doc-author: Trelent
+    """
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                local_users.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        email = message["data"]
+                        local_users.pop(email.decode() if isinstance(email, bytes) else email)
+        except (RedisError, OSError) as err:
+            print(err)
+            await asyncio.sleep(retry_delay)
+
+
+def user_cache_stats() -> dict:
+    """
+    The user_cache_stats function reports the hits, misses and hit ratio of each tier of the user cache.
+
+    :return: A dict with the stats of the local and redis tiers
+    :doc-author: Trelent
+    """
+    return {"local": {**local_users.stats.as_dict(), "size": len(local_users)}, "redis": redis_stats.as_dict()}
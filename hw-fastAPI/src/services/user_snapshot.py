@@ -0,0 +1,110 @@
+import struct
+
+from src.entity.models import Role
+
+
+# Формат знiмка <user> у кешi (версiя 1):
+# заголовок "!BIB?" - версiя формату, id, код ролi, confirmed;
+# далi три рядки UTF-8 з префiксом довжини "!H": username, email, avatar (довжина 0xFFFF означає None).
+# При змiнi набору полiв пiднiмається SNAPSHOT_VERSION - старi знiмки стають промахом кешу, а не помилкою.
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("!BIB?")
+_LENGTH = struct.Struct("!H")
+_NONE = 0xFFFF
+_ROLES = list(Role)
+_ROLE_CODES = {role: code for code, role in enumerate(_ROLES)}
+
+
+class UserSnapshot:
+    __slots__ = ("id", "username", "email", "role", "avatar", "confirmed")
+
+    def __init__(self, id: int, username: str, email: str, role: Role, avatar: str | None, confirmed: bool):
+        """
+        The __init__ function fills the read-only copy of the user with the fields,
+        which the routes and RoleAccess need.
+
+        :param self: Represent the instance of the class
+        :param id: int: The id of the user
+        :param username: str: The username
+        :param email: str: The email
+        :param role: Role: The role of the user
+        :param avatar: str | None: The url of the avatar
+        :param confirmed: bool: Whether the email is confirmed
+        :return: Nothing
+        :doc-author: Trelent
+        """
+        for name, value in zip(self.__slots__, (id, username, email, role, avatar, confirmed)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __eq__(self, other):
+        return isinstance(other, UserSnapshot) and all(getattr(self, name) == getattr(other, name)
+                                                      for name in self.__slots__)
+
+    def __repr__(self):
+        return f"UserSnapshot(id={self.id!r}, email={self.email!r}, role={self.role!r})"
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        """
+        The from_user function copies the needed fields of the User model (or another snapshot).
+
+        :param cls: Represent the class
+        :param user: User: The user
+        :return: The snapshot of the user
+        :doc-author: Trelent
+        """
+        # роль у БД може бути збережена рядком (наприклад, у тестовому фiкстурi), тож приводимо до [Role]
+        role = user.role if isinstance(user.role, Role) else Role(user.role or Role.user.value)
+        return cls(user.id, user.username, user.email, role, user.avatar, bool(user.confirmed))
+
+
+def _pack_str(value: str | None) -> bytes:
+    if value is None:
+        return _LENGTH.pack(_NONE)
+    raw = value.encode()
+    return _LENGTH.pack(len(raw)) + raw
+
+
+def dumps(user) -> bytes:
+    """
+    The dumps function serializes the user into the compact versioned snapshot.
+
+    :param user: User | UserSnapshot: The user
+    :return: The bytes of the snapshot
+    :doc-author: Trelent
+    """
+    snapshot = user if isinstance(user, UserSnapshot) else UserSnapshot.from_user(user)
+    return (_HEADER.pack(SNAPSHOT_VERSION, snapshot.id, _ROLE_CODES[snapshot.role], snapshot.confirmed)
+            + _pack_str(snapshot.username) + _pack_str(snapshot.email) + _pack_str(snapshot.avatar))
+
+
+def loads(data: bytes) -> UserSnapshot | None:
+    """
+    The loads function restores the user from the snapshot.
+        The snapshot of another version or a damaged one gives None, so the caller treats it as a cache miss.
+
+    :param data: bytes: The bytes of the snapshot
+    :return: The read-only user or None
+    :doc-author: Trelent
+    """
+    try:
+        version, id, role_code, confirmed = _HEADER.unpack_from(data)
+        if version != SNAPSHOT_VERSION:
+            return None
+        offset = _HEADER.size
+        strings = []
+        for _ in range(3):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            if length == _NONE:
+                strings.append(None)
+                continue
+            strings.append(data[offset:offset + length].decode())
+            offset += length
+        username, email, avatar = strings
+        return UserSnapshot(id, username, email, _ROLES[role_code], avatar, confirmed)
+    except (struct.error, IndexError, UnicodeDecodeError, TypeError):
+        return None
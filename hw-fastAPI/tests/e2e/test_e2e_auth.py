@@ -76,6 +76,14 @@ def test_login(client):
     assert "refresh_token" in data
     assert "token_type" in data
 
+def test_login_hash_queue_full(client, monkeypatch):
+    monkeypatch.setattr(auth_service.password_hasher.admission, "queue_size", 0)
+    response = client.post("api/auth/login",
+                           data={"username": user_data.get("email"), "password": user_data.get("password")})
+    assert response.status_code == 429, response.text
+    assert response.json()["detail"] == messages.HASH_QUEUE_FULL
+    assert int(response.headers["Retry-After"]) >= 1
+
 # Це додаткова перевiрка - немає <username> = email
 def test_validation_error_login(client):
     response = client.post("api/auth/login",
@@ -87,7 +95,7 @@ def test_validation_error_login(client):
 
 @pytest.mark.asyncio
 async def test_refresh_token(client, get_token):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         email = await auth_service.decode_refresh_token(get_token[1])
         access_token = await auth_service.create_access_token(data={"sub": email, "DB-class": "PSQL"})
@@ -108,7 +116,7 @@ async def test_refresh_token(client, get_token):
 
 
 def test_refresh_token_invalid_refresh_token(client, get_token):
-    with patch.object(auth_service, 'cache') as redis_mock, \
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock, \
          patch.object(rep_users, 'get_user_by_email') as get_user_mock, \
          patch.object(rep_users, 'update_token') as update_token_mock:
 
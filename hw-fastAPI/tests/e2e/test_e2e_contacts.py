@@ -2,6 +2,7 @@ from datetime import datetime, date
 from unittest.mock import Mock, patch, AsyncMock
 
 import json
+import msgpack
 import pytest
 from requests.models import PreparedRequest
 from sqlalchemy import select
@@ -17,7 +18,7 @@ from src.repository import contacts as rep_contacts
 
 
 def test_get_contacts(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -30,7 +31,7 @@ def test_get_contacts(client, get_token, monkeypatch):
 
 
 def test_get_contacts_all(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -43,7 +44,7 @@ def test_get_contacts_all(client, get_token, monkeypatch):
 
 
 def test_get_contact_notfound(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -56,7 +57,7 @@ def test_get_contact_notfound(client, get_token, monkeypatch):
 
 
 def test_create_contact(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -92,7 +93,7 @@ async def test_get_contact(client, get_token, monkeypatch):
         await session.commit()
         await session.refresh(test_contact1)
 
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -103,7 +104,7 @@ async def test_get_contact(client, get_token, monkeypatch):
 
 
 def test_update_contact(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -125,7 +126,7 @@ def test_update_contact(client, get_token, monkeypatch):
 
 
 def test_delete_contact(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -137,7 +138,7 @@ def test_delete_contact(client, get_token, monkeypatch):
 
 @pytest.mark.asyncio
 async def test_search_contact_by_birthdate(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -200,7 +201,7 @@ async def test_search_contact_by_birthdate(client, get_token, monkeypatch):
 
 @pytest.mark.asyncio
 async def test_search_contact_by_firstname(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -223,7 +224,7 @@ async def test_search_contact_by_firstname(client, get_token, monkeypatch):
 
 @pytest.mark.asyncio
 async def test_search_contact_by_lastname(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -246,7 +247,7 @@ async def test_search_contact_by_lastname(client, get_token, monkeypatch):
 
 @pytest.mark.asyncio
 async def test_search_contact_by_email(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -269,7 +270,7 @@ async def test_search_contact_by_email(client, get_token, monkeypatch):
 
 @pytest.mark.asyncio
 async def test_search_contact_complex(client, get_token, monkeypatch):
-    with patch.object(auth_service, 'cache') as redis_mock:
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
         redis_mock.get.return_value = None
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
         monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
@@ -296,4 +297,271 @@ async def test_search_contact_complex(client, get_token, monkeypatch):
             assert "email" in data[1]
             assert data[1]["first_name"] == "Lenny"
             assert data[1]["last_name"] == "Wolf"
-            assert data[1]["email"] == "wooooooohn@ahtung.de"
\ No newline at end of file
+            assert data[1]["email"] == "wooooooohn@ahtung.de"
+
+def test_import_contacts_bulk(client, get_token, monkeypatch):
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.http_callback", AsyncMock())
+        body = ("first_name,last_name,email,phone_number,birth_date\n"
+                "Freddie,Mercury,freddie@queen.uk,0501112233,1946-09-05\n"
+                "Brian,May,not-an-email,0501112234,1947-07-19\n"
+                "Roger,Taylor,freddie@queen.uk,0501112235,1949-07-26\n")
+        response = client.post("/api/contacts/bulk", content=body, headers={
+            "Authorization": f"Bearer {get_token[0]}", "Content-Type": "text/csv"})
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert data["inserted"] == 1
+        assert data["failed"] == 2
+        assert [error["line"] for error in data["errors"]] == [3, 4]
+        assert data["errors"][1]["errors"] == [f"email: {messages.CONTACT_EMAIL_EXISTS}"]
+
+        body = json.dumps({"first_name": "Roger", "last_name": "Taylor", "email": "roger@queen.uk",
+                           "phone_number": "0501112235", "birth_date": "1949-07-26"}) + "\n"
+        response = client.post("/api/contacts/bulk", content=body, headers={
+            "Authorization": f"Bearer {get_token[0]}", "Content-Type": "application/x-ndjson"})
+        assert response.status_code == 200, response.text
+        assert response.json()["inserted"] == 1
+
+        response = client.get("/api/contacts", headers={"Authorization": f"Bearer {get_token[0]}"})
+        emails = {contact["email"] for contact in response.json()}
+        assert {"freddie@queen.uk", "roger@queen.uk"} <= emails
+
+
+def test_import_contacts_bulk_unsupported_type(client, get_token, monkeypatch):
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.http_callback", AsyncMock())
+        response = client.post("/api/contacts/bulk", json=[], headers={"Authorization": f"Bearer {get_token[0]}"})
+        assert response.status_code == 415, response.text
+        assert response.json()["detail"] == messages.BULK_UNSUPPORTED_TYPE
+
+
+def test_export_contacts(client, get_token, monkeypatch):
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.http_callback", AsyncMock())
+        response = client.get("/api/contacts/export", headers={"Authorization": f"Bearer {get_token[0]}"})
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        emails = [json.loads(line)["email"] for line in response.text.splitlines()]
+        assert "freddie@queen.uk" in emails
+
+        response = client.get("/api/contacts/export?format=csv", headers={"Authorization": f"Bearer {get_token[0]}"})
+        assert response.status_code == 200, response.text
+        lines = response.text.splitlines()
+        assert lines[0].startswith("id,first_name,last_name,email")
+        assert len(lines) == len(emails) + 1
+
+
+def test_update_and_delete_contacts_bulk(client, get_token, monkeypatch):
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.http_callback", AsyncMock())
+        headers = {"Authorization": f"Bearer {get_token[0]}"}
+        contacts = client.get("/api/contacts", headers=headers).json()
+        ids = [contact["id"] for contact in contacts if contact["email"].endswith("@queen.uk")]
+        assert len(ids) == 2
+
+        response = client.patch("/api/contacts/bulk", headers=headers, json={
+            "where": {"ids": ids + [100500]}, "values": {"crm_status": "corporative", "birth_date": "1950-01-01"}})
+        assert response.status_code == 200, response.text
+        assert response.json() == {"affected": 2}
+        contact = client.get(f"/api/contacts/{ids[0]}", headers=headers).json()
+        assert contact["crm_status"] == "corporative"
+        assert contact["birth_date"] == "1950-01-01"
+
+        response = client.patch("/api/contacts/bulk", headers=headers, json={"where": {"ids": ids}, "values": {}})
+        assert response.status_code == 422, response.text
+
+        response = client.request("DELETE", "/api/contacts/bulk", headers=headers, json={"ids": ids})
+        assert response.status_code == 200, response.text
+        assert response.json() == {"affected": 2}
+        response = client.get(f"/api/contacts/{ids[0]}", headers=headers)
+        assert response.status_code == 404
+
+
+def test_get_contacts_cached_page(client, get_token, monkeypatch):
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.http_callback", AsyncMock())
+        cached = b'[{"id": 42, "email": "cached@example.com"}]'
+        monkeypatch.setattr("src.routes.contacts.get_page", AsyncMock(return_value=("7", cached, "next-page")))
+        set_page = AsyncMock()
+        monkeypatch.setattr("src.routes.contacts.set_page", set_page)
+        response = client.get("/api/contacts", headers={"Authorization": f"Bearer {get_token[0]}"})
+        assert response.status_code == 200, response.text
+        assert response.content == cached
+        assert response.headers["X-Next-Cursor"] == "next-page"
+        set_page.assert_not_awaited()
+
+        # промах: сторiнка читається з БД та зберiгається пiд прочитаною версiєю
+        monkeypatch.setattr("src.routes.contacts.get_page", AsyncMock(return_value=("7", None, None)))
+        response = client.get("/api/contacts", headers={"Authorization": f"Bearer {get_token[0]}"})
+        assert response.status_code == 200, response.text
+        args = set_page.await_args.args
+        assert args[1:3] == ("7", "10:id:o:0")
+        assert args[3] == response.content
+
+
+def test_get_contact_not_modified(client, get_token, monkeypatch):
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.http_callback", AsyncMock())
+        headers = {"Authorization": f"Bearer {get_token[0]}"}
+        contact_id = client.get("/api/contacts", headers=headers).json()[0]["id"]
+        response = client.get(f"/api/contacts/{contact_id}", headers=headers)
+        assert response.status_code == 200, response.text
+        etag = response.headers["ETag"]
+
+        # 304 вiддається пiсля читання лише <updated_at>, без повного контакту
+        get_contact = AsyncMock()
+        monkeypatch.setattr("src.routes.contacts.rep_contacts.get_contact", get_contact)
+        response = client.get(f"/api/contacts/{contact_id}", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+        get_contact.assert_not_awaited()
+
+        response = client.get("/api/contacts/100500", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 404
+
+
+def test_get_contacts_not_modified(client, get_token, monkeypatch):
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.http_callback", AsyncMock())
+        monkeypatch.setattr("src.routes.contacts.get_page", AsyncMock(return_value=("7", None, None)))
+        monkeypatch.setattr("src.routes.contacts.set_page", AsyncMock())
+        headers = {"Authorization": f"Bearer {get_token[0]}"}
+        response = client.get("/api/contacts", headers=headers)
+        assert response.status_code == 200, response.text
+        etag = response.headers["ETag"]
+
+        get_contacts = AsyncMock()
+        monkeypatch.setattr("src.routes.contacts.rep_contacts.get_contacts", get_contacts)
+        response = client.get("/api/contacts", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        get_contacts.assert_not_awaited()
+
+        # запис контакту змiнює версiю списку, а з нею й ETag
+        monkeypatch.setattr("src.routes.contacts.get_page", AsyncMock(return_value=("8", b"[]", None)))
+        response = client.get("/api/contacts", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+
+def test_update_contact_if_match(client, get_token, monkeypatch):
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.http_callback", AsyncMock())
+        headers = {"Authorization": f"Bearer {get_token[0]}"}
+        contact = client.get("/api/contacts", headers=headers).json()[0]
+        response = client.get(f"/api/contacts/{contact['id']}", headers=headers)
+        etag = response.headers["ETag"]
+        body = {key: contact[key] for key in ("first_name", "last_name", "email", "phone_number", "birth_date",
+                                              "crm_status")}
+
+        response = client.put(f"/api/contacts/{contact['id']}", headers={**headers, "If-Match": etag},
+                              json={**body, "crm_status": "analitic"})
+        assert response.status_code == 200, response.text
+        assert response.json()["crm_status"] == "analitic"
+        new_etag = response.headers["ETag"]
+        assert new_etag != etag
+
+        # другий пристрiй редагує вже застарiлу версiю
+        response = client.put(f"/api/contacts/{contact['id']}", headers={**headers, "If-Match": etag},
+                              json={**body, "crm_status": "corporative"})
+        assert response.status_code == 412, response.text
+        assert response.json()["detail"] == messages.CONTACT_CHANGED
+        assert client.get(f"/api/contacts/{contact['id']}", headers=headers).json()["crm_status"] == "analitic"
+
+        response = client.get(f"/api/contacts/{contact['id']}", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        response = client.put("/api/contacts/100500", headers={**headers, "If-Match": etag}, json=body)
+        assert response.status_code == 404
+
+
+def test_contacts_msgpack(client, get_token, monkeypatch):
+    with patch.object(auth_service, 'cache', new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.redis", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.identifier", AsyncMock())
+        monkeypatch.setattr("fastapi_limiter.FastAPILimiter.http_callback", AsyncMock())
+        headers = {"Authorization": f"Bearer {get_token[0]}"}
+        msgpack_headers = {**headers, "Accept": "application/msgpack"}
+
+        response = client.get("/api/contacts", headers=msgpack_headers)
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"] == "application/msgpack"
+        assert "Accept" in response.headers["vary"]
+        assert msgpack.unpackb(response.content) == client.get("/api/contacts", headers=headers).json()
+
+        response = client.get("/api/search/by_complex/queen", headers=msgpack_headers)
+        assert response.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == client.get("/api/search/by_complex/queen", headers=headers).json()
+
+        # тiло запиту в MessagePack валiдується тiєю ж схемою, вiдповiдь response_model - теж MessagePack
+        body = {"first_name": "John", "last_name": "Deacon", "email": "john@queen.uk", "phone_number": "0501112236",
+                "birth_date": "1951-08-19"}
+        response = client.post("/api/contacts", content=msgpack.packb(body),
+                               headers={**msgpack_headers, "Content-Type": "application/msgpack"})
+        assert response.status_code == 201, response.text
+        assert response.headers["content-type"] == "application/msgpack"
+        contact = msgpack.unpackb(response.content)
+        assert contact["email"] == "john@queen.uk"
+        assert contact["birth_date"] == "1951-08-19"
+
+        # JSON та MessagePack одного контакту мають рiзнi ETag: 304 лише для ETag того ж формату
+        json_etag = client.get(f"/api/contacts/{contact['id']}", headers=headers).headers["ETag"]
+        response = client.get(f"/api/contacts/{contact['id']}", headers=msgpack_headers)
+        msgpack_etag = response.headers["ETag"]
+        assert msgpack_etag != json_etag
+        response = client.get(f"/api/contacts/{contact['id']}", headers={**msgpack_headers, "If-None-Match": json_etag})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/msgpack"
+        response = client.get(f"/api/contacts/{contact['id']}",
+                              headers={**msgpack_headers, "If-None-Match": f"{json_etag}, {msgpack_etag}"})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == msgpack_etag
+        # If-Match приймає ETag будь-якого формату тiєї ж версiї
+        response = client.put(f"/api/contacts/{contact['id']}", headers={**headers, "If-Match": msgpack_etag},
+                              json={**body, "crm_status": "analitic"})
+        assert response.status_code == 200, response.text
+
+        response = client.patch("/api/contacts/bulk", content=msgpack.packb(
+            {"where": {"ids": [contact["id"]]}, "values": {"crm_status": "analitic"}}),
+            headers={**headers, "Content-Type": "application/msgpack"})
+        assert response.status_code == 200, response.text
+        assert response.json() == {"affected": 1}
+
+        response = client.post("/api/contacts", content=b"\xc1", headers={**headers, "Content-Type": "application/msgpack"})
+        assert response.status_code == 400
+
+        # перший контакт повторює email вже створеного
+        body = msgpack.packb({"first_name": "Johnny", "last_name": "Deacon", "email": "john@queen.uk",
+                              "phone_number": "0501112235", "birth_date": "1951-08-19"}) + msgpack.packb(
+            {"first_name": "Brian", "last_name": "May", "email": "brian@queen.uk", "phone_number": "0501112234",
+             "birth_date": "1947-07-19"})
+        response = client.post("/api/contacts/bulk", content=body, headers={
+            **msgpack_headers, "Content-Type": "application/msgpack"})
+        assert response.status_code == 200, response.text
+        report = msgpack.unpackb(response.content)
+        assert (report["inserted"], report["failed"]) == (1, 1)
+        assert report["errors"][0]["line"] == 1
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from redis.exceptions import RedisError
+from sqlalchemy import text
+
+from src.database import db
+from src.database.db import PIN_PREFIX, DatabaseSessionManager
+from src.services import replicas
+from src.services.replicas import ReadSession
+
+
+class TestReplicas(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.urls = [f"sqlite+aiosqlite:///{os.path.join(self.dir.name, name)}.db"
+                     for name in ("primary", "replica1", "replica2")]
+        self.manager = DatabaseSessionManager(self.urls[0], self.urls[1:])
+        for url, name in zip(self.urls, ("primary", "replica1", "replica2")):
+            manager = DatabaseSessionManager(url)
+            async with manager._engine.begin() as conn:
+                await conn.execute(text("CREATE TABLE node (name TEXT)"))
+                await conn.execute(text(f"INSERT INTO node VALUES ('{name}')"))
+            await manager._engine.dispose()
+
+    async def asyncTearDown(self):
+        await self.manager._engine.dispose()
+        for replica in self.manager.replicas:
+            await replica.engine.dispose()
+        self.dir.cleanup()
+
+    async def node(self, session) -> str:
+        try:
+            return await session.scalar(text("SELECT name FROM node"))
+        finally:
+            await session.close()
+
+    async def test_round_robin(self):
+        nodes = [await self.node(self.manager.replica_session()) for _ in range(4)]
+        self.assertEqual(nodes, ["replica1", "replica2", "replica1", "replica2"])
+
+    async def test_unhealthy_replica(self):
+        with patch.object(self.manager.replicas[0], "_scalar", AsyncMock(side_effect=OSError("down"))):
+            await self.manager.check_replicas()
+        self.assertEqual([replica.healthy for replica in self.manager.replicas], [False, True])
+        nodes = {await self.node(self.manager.replica_session()) for _ in range(3)}
+        self.assertEqual(nodes, {"replica2"})
+        await self.manager.replicas[1].check(max_lag=5, timeout=1)
+        self.manager.replicas[1].healthy = False
+        self.assertEqual(await self.node(self.manager.replica_session()), "primary")
+        self.assertTrue(await self.manager.use_primary(1, AsyncMock()))
+        await self.manager.check_replicas()
+        self.assertTrue(all(replica.healthy for replica in self.manager.replicas))
+
+    async def test_pin_primary(self):
+        redis = AsyncMock()
+        redis.exists.return_value = 0
+        self.assertFalse(await self.manager.use_primary(1, redis))
+        await self.manager.pin_primary(1, redis)
+        redis.set.assert_awaited_once_with(f"{PIN_PREFIX}1", 1, px=int(db.config.DB_READ_YOUR_WRITES_WINDOW * 1000))
+        self.assertTrue(await self.manager.use_primary(1, redis))
+        self.assertFalse(await self.manager.use_primary(2, redis))
+        # пiн iншого воркера видно лише через Redis
+        redis.exists.return_value = 1
+        self.assertTrue(await self.manager.use_primary(2, redis))
+        redis.exists.side_effect = RedisError
+        self.assertTrue(await self.manager.use_primary(3, redis))
+
+    async def test_pins_expire_and_are_bounded(self):
+        redis = AsyncMock()
+        redis.exists.return_value = 0
+        self.manager._pinned.maxsize = 3
+        with patch.object(db.config, "DB_READ_YOUR_WRITES_WINDOW", 0.05):
+            for user_id in range(10):
+                await self.manager.pin_primary(user_id, redis)
+        # користувачi, якi бiльше не читають, не накопичуються у воркерi
+        self.assertEqual(len(self.manager._pinned), 3)
+        self.assertTrue(await self.manager.use_primary(9, redis))
+        self.assertFalse(await self.manager.use_primary(0, redis))
+        await asyncio.sleep(0.06)
+        self.assertFalse(await self.manager.use_primary(9, redis))
+
+    async def test_pin_primary_without_replicas(self):
+        redis = AsyncMock()
+        manager = DatabaseSessionManager(self.urls[0])
+        await manager.pin_primary(1, redis)
+        redis.set.assert_not_awaited()
+        self.assertTrue(await manager.use_primary(1, redis))
+        await manager._engine.dispose()
+
+    async def test_read_session(self):
+        user = MagicMock(id=1)
+        primary = self.manager._session_maker()
+        with patch.object(replicas, "sessionmanager", self.manager), \
+                patch.object(self.manager, "use_primary", AsyncMock(return_value=False)):
+            dependency = ReadSession(1)(primary, user)
+            session = await dependency.__anext__()
+            self.assertEqual(await session.scalar(text("SELECT name FROM node")), "replica1")
+            await dependency.aclose()
+        with patch.object(replicas, "sessionmanager", self.manager), \
+                patch.object(self.manager, "use_primary", AsyncMock(return_value=True)):
+            dependency = ReadSession(1)(primary, user)
+            self.assertIs(await dependency.__anext__(), primary)
+            await dependency.aclose()
+        await primary.close()
@@ -1,13 +1,13 @@
 import unittest
 from unittest.mock import MagicMock, AsyncMock, Mock
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from fastapi import HTTPException
 from sqlalchemy import Date, func, select, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.entity.models import Contact, User
-from src.schemas.contact import ContactSchema, ContactUpdateSchema
+from src.schemas.contact import ContactSchema, ContactUpdateSchema, ContactBulkFilterSchema, ContactPatchSchema
 from src.repository.contacts import *
 
 
@@ -32,14 +32,18 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
                     Contact(id = 3, first_name = "Lesley", last_name = "Nilsen", email = "lesley-joke@ontario.cd",
                             phone_number = "0135550055", birth_date = "02.02.1950", crm_status = "analitic")]
         mocked_contacts = MagicMock()
-        mocked_contacts.scalars.return_value.all.return_value = contacts
+        mocked_contacts.all.return_value = contacts
         self.session.execute.return_value = mocked_contacts
         result = await get_contacts(limit=10, offset=0, db=self.session, user=self.user)
         self.assertEqual(result, contacts)
+        # читаються лише колонки вiдповiдi, без JOIN users
+        statement = str(self.session.execute.call_args.args[0])
+        self.assertIn("SELECT contacts.id, contacts.first_name", statement)
+        self.assertNotIn("users", statement)
 
     async def test_get_contacts_notfound(self):
         mocked_contacts = MagicMock()
-        mocked_contacts.scalars.return_value.all.return_value = list()
+        mocked_contacts.all.return_value = list()
         self.session.execute.return_value = mocked_contacts
         result = await get_contacts(limit=10, offset=0, db=self.session, user=self.user)
         self.assertEqual(result, list())
@@ -52,7 +56,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
                     Contact(id = 3, first_name = "Lesley", last_name = "Nilsen", email = "lesley-joke@ontario.cd",
                             phone_number = "0135550055", birth_date = "02.02.1950", crm_status = "analitic")]
         mocked_contacts = MagicMock()
-        mocked_contacts.scalars.return_value.all.return_value = contacts
+        mocked_contacts.all.return_value = contacts
         self.session.execute.return_value = mocked_contacts
         result = await get_contacts_all(limit=10, offset=0, db=self.session)
         self.assertEqual(result, contacts)
@@ -61,7 +65,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
         contact = Contact(id = 1, first_name = "John", last_name = "Biden", email = "john.biden@whitehouse.gov",
                             phone_number = "0115550011", birth_date = "09.09.1947", crm_status = "corporative")
         mocked_contacts = MagicMock()
-        mocked_contacts.scalar_one_or_none.return_value = contact
+        mocked_contacts.one_or_none.return_value = contact
         self.session.execute.return_value = mocked_contacts
         result = await get_contact(contact_id=1, db=self.session, user=self.user)
         self.assertEqual(result, contact)
@@ -69,7 +73,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
     async def test_get_contact_notfound(self):
         contact_id = 4
         mocked_contacts = MagicMock()
-        mocked_contacts.scalar_one_or_none.return_value = None
+        mocked_contacts.one_or_none.return_value = None
         self.session.execute.return_value = mocked_contacts
         result = await get_contact(contact_id=contact_id, db=self.session, user=self.user)
         self.assertIsNone(result)
@@ -81,8 +85,16 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
         new_data = ContactSchema(id = 1, first_name="John", last_name="Doe", email="john.doe@example.com",
                                     phone_number="1234567890", birth_date="1990-01-01", crm_status="operational")
         new_contact = Contact(**new_data.model_dump(exclude_unset=True), user=self.user)
+        mocked_result = MagicMock()
+        # INSERT ... RETURNING повертає рядок нового контакту
+        mocked_result.one.return_value = new_contact
+        self.session.execute.return_value = mocked_result
         result = await create_contact(body=self.contact, db=self.session, user=self.user)
-        self.assertIsInstance(result, Contact)
+        statement = str(self.session.execute.call_args.args[0])
+        self.assertIn("INSERT INTO contacts", statement)
+        self.assertIn("RETURNING contacts.id", statement)
+        self.session.refresh.assert_not_called()
+        self.session.commit.assert_called_once()
         self.assertEqual(result.first_name, new_contact.first_name)
         self.assertEqual(result.last_name, new_contact.last_name)      
         self.assertEqual(result.email, new_contact.email)
@@ -96,14 +108,20 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
         mocked_contact = ContactSchema(id=contact_id, first_name="John", last_name="Doe", email="john.doe@example.com",
                                  phone_number="1234567890", birth_date="1990-01-01", crm_status="operational")
         mocked_contacts = MagicMock()
-        mocked_contacts.scalar_one_or_none.return_value = Contact(id=contact_id, first_name="John", last_name="Doe",
-                                                                  email="john.doe@example.com", phone_number="1234567890",
-                                                                  birth_date="1990-01-01", crm_status="operational")
+        # UPDATE ... RETURNING повертає вже змiнений рядок
+        mocked_contacts.one_or_none.return_value = Contact(id=contact_id, first_name="John", last_name="Doe",
+                                                           email="john.doe@example.com", phone_number="1234567890",
+                                                           birth_date=date(1990, 1, 1), crm_status="operational",
+                                                           version=2)
         self.session.execute.return_value = mocked_contacts
         # Викликаємо функцію оновлення контакту
         result = await update_contact(contact_id=contact_id, body=self.contact, db=self.session, user=self.user)
+        statement = self.session.execute.call_args.args[0].compile()
+        self.assertIn("version=(contacts.version + :version_1)", str(statement))
+        self.assertIn("RETURNING", str(statement))
+        self.assertNotIn("contacts.version IN", str(statement))
         # Перевіряємо, що результат відповідає очікуванням
-        self.assertIsInstance(result, Contact)
+        self.assertEqual(result.version, 2)
         self.assertEqual(result.first_name, self.contact.first_name)
         self.assertEqual(result.last_name, self.contact.last_name)
         self.assertEqual(result.email, self.contact.email)
@@ -111,10 +129,29 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.birth_date, self.contact.birth_date) 
         self.assertEqual(result.crm_status, self.contact.crm_status)  
 
+    async def test_get_contact_precompiled(self):
+        mocked_result = MagicMock()
+        mocked_result.one_or_none.return_value = None
+        self.session.execute.return_value = mocked_result
+        await get_contact(contact_id=5, db=self.session, user=self.user)
+        # запит будується один раз, змiнюються лише параметри
+        self.assertIs(self.session.execute.call_args.args[0], CONTACT_BY_ID)
+        self.assertEqual(self.session.execute.call_args.args[1], {"contact_id": 5, "owner_id": self.user.id})
+
+    async def test_update_contact_if_match(self):
+        mocked_result = MagicMock()
+        mocked_result.one_or_none.return_value = None
+        self.session.execute.return_value = mocked_result
+        result = await update_contact(contact_id=1, body=self.contact, db=self.session, user=self.user, versions=[3])
+        self.assertIsNone(result)
+        statement = self.session.execute.call_args.args[0].compile()
+        self.assertIn("AND contacts.version IN", str(statement))
+        self.assertEqual(self.session.execute.call_args.args[1]["versions"], [3])
+
     async def test_update_contact_notfound(self):
         contact_id = 4
         mocked_result = MagicMock()
-        mocked_result.scalar_one_or_none.return_value = None
+        mocked_result.one_or_none.return_value = None
         self.session.execute.return_value = mocked_result
         result = await update_contact(contact_id=contact_id, body=self.contact, db=self.session, user=self.user)
         self.assertIsNone(result)
@@ -124,18 +161,20 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
         mocked_contact = Contact(id=contact_id, first_name="John", last_name="Doe", email="john.doe@example.com",
                                  phone_number="1234567890", birth_date="1990.01.01", crm_status="operational")
         mocked_contacts = MagicMock()
-        mocked_contacts.scalar_one_or_none.return_value = mocked_contact
+        mocked_contacts.one_or_none.return_value = mocked_contact
         self.session.execute.return_value = mocked_contacts
         result = await delete_contact(contact_id=contact_id, db=self.session, user=self.user)
-        self.assertIsInstance(result, Contact)
         self.assertEqual(result.id, contact_id)
-        self.session.delete.assert_called_once()
+        # DELETE ... RETURNING замiсть SELECT + session.delete()
+        self.assertIn("DELETE FROM contacts", str(self.session.execute.call_args.args[0]))
+        self.session.execute.assert_called_once()
+        self.session.delete.assert_not_called()
         self.session.commit.assert_called_once()
 
     async def test_delete_contact_notfound(self):
         contact_id = 4
         mocked_contact = MagicMock()
-        mocked_contact.scalar_one_or_none.return_value = None
+        mocked_contact.one_or_none.return_value = None
         self.session.execute.return_value = mocked_contact
         result = await delete_contact(contact_id=contact_id, db=self.session, user=self.user)
         self.assertIsNone(result)
@@ -143,12 +182,43 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
 
 
 
+    async def test_update_contacts_bulk(self):
+        mocked_result = MagicMock()
+        mocked_result.rowcount = 2
+        self.session.execute.return_value = mocked_result
+        result = await update_contacts_bulk(ContactBulkFilterSchema(ids=[1, 2]),
+                                            ContactPatchSchema(birth_date="1990-03-08", crm_status="analitic"),
+                                            db=self.session, user=self.user)
+        self.assertEqual(result, 2)
+        statement = self.session.execute.call_args.args[0].compile()
+        self.assertIn("UPDATE contacts SET birth_date=", str(statement))
+        self.assertIn("WHERE contacts.user_id = :user_id_1 AND contacts.id IN", str(statement))
+        self.assertEqual(statement.params["birthday_ordinal"], 308)
+        self.assertEqual(statement.params["user_id_1"], self.user.id)
+        self.session.commit.assert_called_once()
+
+    async def test_delete_contacts_bulk(self):
+        mocked_result = MagicMock()
+        mocked_result.rowcount = 0
+        self.session.execute.return_value = mocked_result
+        result = await delete_contacts_bulk(ContactBulkFilterSchema(crm_status="analitic"), db=self.session,
+                                            user=self.user)
+        self.assertEqual(result, 0)
+        statement = str(self.session.execute.call_args.args[0])
+        self.assertIn("DELETE FROM contacts WHERE contacts.user_id = :user_id_1 AND contacts.crm_status =", statement)
+
+    def test_bulk_schemas_reject_empty(self):
+        with self.assertRaises(ValueError):
+            ContactBulkFilterSchema()
+        with self.assertRaises(ValueError):
+            ContactPatchSchema()
+
     async def test_search_contact_by_firstname(self):
         contact_id = 1
         mocked_contact = Contact(id=contact_id, first_name="John", last_name="Doe", email="john.doe@example.com",
                                  phone_number="1234567890", birth_date="1990.01.01", crm_status="operational")
         mocked_result = MagicMock()
-        mocked_result.scalars.return_value.all.return_value = mocked_contact
+        mocked_result.all.return_value = mocked_contact
         self.session.execute.return_value = mocked_result
         result = await search_contact_by_firstname(contact_first_name="John", db=self.session)
         self.assertIsInstance(result, Contact)
@@ -162,7 +232,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
     async def test_search_contact_by_firstname_notfound(self):
         # Налаштовуємо сесію, щоб повернути імітацію результату запиту
         mocked_result = MagicMock()
-        mocked_result.scalars.return_value.all.return_value = None
+        mocked_result.all.return_value = None
         self.session.execute.return_value = mocked_result
         # Викликаємо функцію пошуку контакта по імені
         result = await search_contact_by_firstname(contact_first_name="Janet", db=self.session)
@@ -178,7 +248,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
         mocked_contact = Contact(id=contact_id, first_name="John", last_name="Doe", email="john.doe@example.com",
                                  phone_number="1234567890", birth_date="1990.01.01", crm_status="operational")
         mocked_result = MagicMock()
-        mocked_result.scalars.return_value.all.return_value = mocked_contact
+        mocked_result.all.return_value = mocked_contact
         self.session.execute.return_value = mocked_result
         result = await search_contact_by_lastname(contact_last_name="Doe", db=self.session)
         self.assertIsInstance(result, Contact)
@@ -191,7 +261,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
 
     async def test_search_contact_by_lastname_notfound(self):
         mocked_result = MagicMock()
-        mocked_result.scalars.return_value.all.return_value = None
+        mocked_result.all.return_value = None
         self.session.execute.return_value = mocked_result
         result = await search_contact_by_lastname(contact_last_name="Jackson", db=self.session)
         self.assertIsNone(result)
@@ -201,7 +271,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
         mocked_contact = Contact(id=contact_id, first_name="John", last_name="Doe", email="john.doe@example.com",
                                  phone_number="1234567890", birth_date="1990.01.01", crm_status="operational")
         mocked_result = MagicMock()
-        mocked_result.scalars.return_value.all.return_value = mocked_contact
+        mocked_result.all.return_value = mocked_contact
         self.session.execute.return_value = mocked_result
         result = await search_contact_by_email(contact_email="doe", db=self.session)
         self.assertIsInstance(result, Contact)
@@ -214,7 +284,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
 
     async def test_search_contact_by_email_notfound(self):
         mocked_result = MagicMock()
-        mocked_result.scalars.return_value.all.return_value = None
+        mocked_result.all.return_value = None
         self.session.execute.return_value = mocked_result
         result = await search_contact_by_email(contact_email="jack", db=self.session)
         self.assertIsNone(result)
@@ -230,7 +300,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
                     Contact(id = 3, first_name = "Lesley", last_name = "Nilsen", email = "lesley-joke@johnwille.cd",
                     phone_number = "0135550055", birth_date = "03.03.1950", crm_status = "analitic")]
         mocked_result = MagicMock()
-        mocked_result.scalars.return_value.all.return_value = contacts
+        mocked_result.all.return_value = contacts
         self.session.execute.return_value = mocked_result
         result = await search_contact_complex(query="John", db=self.session)
         self.assertEqual(result, contacts)
@@ -238,7 +308,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
 
     async def test_search_contact_complex_notfound(self):
         mocked_result = MagicMock()
-        mocked_result.scalars.return_value.all.return_value = None
+        mocked_result.all.return_value = None
         self.session.execute.return_value = mocked_result
         result = await search_contact_complex(query="Janet", db=self.session)
         self.assertIsNone(result)
@@ -249,7 +319,7 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
                     Contact(id = 3, first_name = "Lesley", last_name = "Nilsen", email = "lesley-joke@johnwille.cd",
                     phone_number = "0135550055", birth_date = "03.03.1950", crm_status = "analitic")]
         mocked_result = MagicMock()
-        mocked_result.scalars.return_value.all.return_value = contacts
+        mocked_result.all.return_value = contacts
         self.session.execute.return_value = mocked_result
         result = await search_contact_by_birthdate(forward_shift_days=100, db=self.session)
         self.assertEqual(result, contacts)
@@ -257,11 +327,30 @@ class TestAsyncContacts(unittest.IsolatedAsyncioTestCase):
 
     async def test_search_contact_by_birthdate_notfound(self):
         mocked_result = MagicMock()
-        mocked_result.scalars.return_value.all.return_value = None
+        mocked_result.all.return_value = None
         self.session.execute.return_value = mocked_result
         result = await search_contact_by_birthdate(forward_shift_days=10, db=self.session)
         self.assertIsNone(result)
 
+    async def test_search_contact_by_birthdate_new_year(self):
+        mocked_result = MagicMock()
+        mocked_result.all.return_value = []
+        self.session.execute.return_value = mocked_result
+        await search_contact_by_birthdate(forward_shift_days=14, db=self.session, current_date=date(2023, 12, 25))
+        statement = str(self.session.execute.call_args.args[0])
+        self.assertIn("contacts.birthday_ordinal >=", statement)
+        self.assertIn("OR contacts.birthday_ordinal <=", statement)
+
+    def test_birthday_window(self):
+        self.assertEqual(birthday_window(date(2024, 10, 17), 10), (1017, 1027))
+        self.assertEqual(birthday_window(date(2023, 12, 25), 14), (1225, 108))
+
+    def test_birthday_window_february_29(self):
+        # у звичайний рiк iменинники 29 лютого святкують 28 лютого
+        self.assertEqual(birthday_window(date(2023, 2, 20), 8), (220, 229))
+        self.assertEqual(birthday_window(date(2024, 2, 20), 8), (220, 228))
+        self.assertEqual(birthday_window(date(2024, 2, 20), 9), (220, 229))
+
     # async def test_search_contact_by_birthdate_error(self):
     #     # Виставляємо <forward_shift_days> більше 364
     #     invalid_shift_days = 365
@@ -0,0 +1,40 @@
+import unittest
+from datetime import datetime, timedelta
+
+from jose import jwt
+
+from src.services.auth import auth_service
+from src.services.user_cache import TTLCache
+
+
+class TestVerifyAccessToken(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.verified_tokens = auth_service.verified_tokens
+        auth_service.verified_tokens = TTLCache(maxsize=16, ttl=0)
+
+    def tearDown(self):
+        auth_service.verified_tokens = self.verified_tokens
+
+    async def test_valid_token_cached(self):
+        token = await auth_service.create_access_token(data={"sub": "user@gmail.com"})
+        self.assertEqual(auth_service.verify_access_token(token)["sub"], "user@gmail.com")
+        self.assertEqual(len(auth_service.verified_tokens), 1)
+        self.assertEqual(auth_service.verify_access_token(token)["sub"], "user@gmail.com")
+        self.assertEqual(auth_service.verified_tokens.stats.hits, 1)
+
+    async def test_refresh_token_not_cached(self):
+        token = await auth_service.create_refresh_token(data={"sub": "user@gmail.com"})
+        self.assertIsNone(auth_service.verify_access_token(token))
+        self.assertEqual(len(auth_service.verified_tokens), 0)
+
+    async def test_bad_signature_not_cached(self):
+        token = jwt.encode({"sub": "user@gmail.com", "scope": "access_token",
+                            "exp": datetime.utcnow() + timedelta(minutes=5)}, "other-secret", algorithm="HS256")
+        self.assertIsNone(auth_service.verify_access_token(token))
+        self.assertEqual(len(auth_service.verified_tokens), 0)
+
+    async def test_expired_token_not_cached(self):
+        token = await auth_service.create_access_token(data={"sub": "user@gmail.com"}, expires_delta=-5)
+        self.assertIsNone(auth_service.verify_access_token(token))
+        self.assertEqual(len(auth_service.verified_tokens), 0)
@@ -0,0 +1,103 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from src.services import blocklist as blocklist_module
+from src.services.blocklist import IPBlocklist, read_networks, watch_blocklist
+from src.services.middleware import BlackListMiddleware
+
+
+class TestIPBlocklist(unittest.TestCase):
+
+    def setUp(self):
+        self.blocklist = IPBlocklist(["10.0.0.0/8", "10.1.0.0/16", "192.168.1.7", "2001:db8::/32", "# comment", ""])
+
+    def test_contains_ipv4(self):
+        self.assertIn("10.255.255.255", self.blocklist)
+        self.assertIn("192.168.1.7", self.blocklist)
+        self.assertNotIn("192.168.1.8", self.blocklist)
+        self.assertNotIn("11.0.0.0", self.blocklist)
+        self.assertNotIn("9.255.255.255", self.blocklist)
+
+    def test_contains_ipv6(self):
+        self.assertIn("2001:db8::1", self.blocklist)
+        self.assertNotIn("2001:db9::1", self.blocklist)
+        # IPv4 вiд dual-stack сокета
+        self.assertIn("::ffff:10.0.0.1", self.blocklist)
+
+    def test_invalid_address(self):
+        self.assertNotIn("testclient", self.blocklist)
+        self.assertNotIn("fe80::1%eth0", self.blocklist)
+
+    def test_merge_intervals(self):
+        # 10.1.0.0/16 вкладена в 10.0.0.0/8
+        self.assertEqual(len(self.blocklist), 3)
+        blocklist = IPBlocklist(["10.0.0.0/25", "10.0.0.128/25"])
+        self.assertEqual(len(blocklist), 1)
+        self.assertIn("10.0.0.200", blocklist)
+
+    def test_load_skips_invalid(self):
+        self.assertEqual(self.blocklist.load(["10.0.0.0/33", "172.16.0.0/12"]), 1)
+        self.assertIn("172.16.0.1", self.blocklist)
+        self.assertNotIn("10.0.0.1", self.blocklist)
+
+
+class TestReload(unittest.IsolatedAsyncioTestCase):
+
+    async def test_read_networks(self):
+        redis = AsyncMock()
+        redis.smembers.return_value = {b"172.16.0.0/12"}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "blocklist.txt"
+            path.write_text("10.0.0.0/8\n")
+            networks = await read_networks(str(path), redis, "blocklist")
+        self.assertEqual(sorted(network.strip() for network in networks), ["10.0.0.0/8", "172.16.0.0/12"])
+        self.assertIsNone(await read_networks(None, redis, None))
+
+    async def test_watch_blocklist(self):
+        blocklist = IPBlocklist()
+        redis = AsyncMock()
+        redis.smembers.return_value = {"10.0.0.0/8"}
+        with patch.object(blocklist_module, "blocklist", blocklist), \
+                patch("src.services.blocklist.asyncio.sleep", AsyncMock(side_effect=[None, StopAsyncIteration])):
+            with self.assertRaises(StopAsyncIteration):
+                await watch_blocklist(1, None, redis, "blocklist")
+        self.assertIn("10.0.0.1", blocklist)
+        self.assertEqual(redis.smembers.await_count, 2)
+
+    async def test_watch_blocklist_bad_file(self):
+        blocklist = IPBlocklist(["10.0.0.0/8"])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "blocklist.txt"
+            path.write_bytes(b"\xff\xfe10.0.0.0/8\n")
+            sleep = AsyncMock(side_effect=[None, StopAsyncIteration])
+            with patch.object(blocklist_module, "blocklist", blocklist), \
+                    patch("src.services.blocklist.asyncio.sleep", sleep):
+                with self.assertRaises(StopAsyncIteration):
+                    await watch_blocklist(1, str(path), AsyncMock(), None)
+        # не-UTF-8 файл не зупиняє watcher, а попереднiй список лишається в силi
+        self.assertEqual(sleep.await_count, 2)
+        self.assertIn("10.0.0.1", blocklist)
+
+
+class TestBlackListMiddleware(unittest.IsolatedAsyncioTestCase):
+
+    async def call(self, host: str) -> list:
+        app, sent = AsyncMock(), []
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = BlackListMiddleware(app, IPBlocklist(["10.0.0.0/8"]))
+        await middleware({"type": "http", "client": (host, 1234), "headers": []}, AsyncMock(), send)
+        return sent if sent else app.await_args
+
+    async def test_banned(self):
+        sent = await self.call("10.0.0.1")
+        self.assertEqual(sent[0]["status"], 403)
+        self.assertEqual(sent[1]["body"], b'{"detail":"You are banned"}')
+
+    async def test_allowed(self):
+        self.assertIsNotNone(await self.call("8.8.8.8"))
+        self.assertIsNotNone(await self.call("testclient"))
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.conf import messages
+from src.entity.models import User
+from src.services import bulk_import, serializers
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+class TestBulkImportParse(unittest.IsolatedAsyncioTestCase):
+
+    def test_media_type(self):
+        self.assertEqual(bulk_import.media_type("text/csv; charset=utf-8"), "csv")
+        self.assertEqual(bulk_import.media_type("application/x-ndjson"), "ndjson")
+        self.assertIsNone(bulk_import.media_type("application/json"))
+        self.assertIsNone(bulk_import.media_type(None))
+
+    async def test_msgpack_records_across_chunks(self):
+        self.assertEqual(bulk_import.media_type("application/msgpack"), "msgpack")
+        raw = b"".join(serializers.packb(item) for item in [{"first_name": "Freddie"}, [1, 2], {"first_name": "Брайан"}])
+        records = await collect(bulk_import.iter_records(stream(raw[:5], raw[5:17], raw[17:]), "msgpack"))
+        self.assertEqual(records, [(1, {"first_name": "Freddie"}, None), (2, None, messages.BULK_BAD_MSGPACK),
+                                   (3, {"first_name": "Брайан"}, None)])
+        # пiсля зiпсованих байтiв потiк не розбирається далi
+        records = await collect(bulk_import.iter_records(stream(serializers.packb({"a": 1}) + b"\xc1\x00"), "msgpack"))
+        self.assertEqual(records, [(1, {"a": 1}, None), (2, None, messages.BULK_BAD_MSGPACK)])
+
+    async def test_lines_split_across_chunks(self):
+        # рядок та багатобайтовий символ UTF-8 розiрванi мiж мережевими чанками
+        raw = "first\r\n\nдругий\nthird".encode()
+        cut = raw.index("д".encode()) + 1
+        lines = await collect(bulk_import.iter_lines(stream(raw[:3], raw[3:cut], raw[cut:])))
+        self.assertEqual(lines, [(1, "first"), (3, "другий"), (4, "third")])
+
+    async def test_csv_records(self):
+        body = b"first_name,last_name,email\nJohn,Doe,john@example.com\nJane,Doe\n"
+        records = await collect(bulk_import.iter_records(stream(body), "csv"))
+        self.assertEqual(records, [(2, {"first_name": "John", "last_name": "Doe", "email": "john@example.com"}, None),
+                                   (3, None, messages.BULK_BAD_CSV_ROW)])
+
+    async def test_ndjson_records(self):
+        body = b'{"first_name": "John"}\n[1, 2]\nnot json\n'
+        records = await collect(bulk_import.iter_records(stream(body), "ndjson"))
+        self.assertEqual(records, [(1, {"first_name": "John"}, None), (2, None, messages.BULK_BAD_JSON),
+                                   (3, None, messages.BULK_BAD_JSON)])
+
+
+class TestImportContacts(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.user = User(id=1, username="test_user", password="qwerty", confirmed=True)
+
+    @staticmethod
+    def row(email: str) -> bytes:
+        return (b'{"first_name": "John", "last_name": "Doe", "email": "%s", "phone_number": "0501234567", '
+                b'"birth_date": "1990-05-17"}\n' % email.encode())
+
+    async def test_chunks_and_report(self):
+        body = (self.row("a@example.com") + self.row("b@example.com") + b'{"first_name": "Jo"}\n'
+                + self.row("c@example.com") + self.row("a@example.com"))
+        bulk = AsyncMock(side_effect=[{"a@example.com", "b@example.com"}, {"c@example.com"}, set()])
+        with patch("src.services.bulk_import.rep_contacts.create_contacts_bulk", bulk):
+            report = await bulk_import.import_contacts(stream(body), "ndjson", self.session, self.user, chunk_size=2)
+        # чанки по 2 розiбранi рядки, невалiдний рядок 3 не потрапляє до INSERT
+        self.assertEqual([len(call.args[0]) for call in bulk.await_args_list], [2, 1, 1])
+        self.assertEqual(report["inserted"], 3)
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual([error["line"] for error in report["errors"]], [3, 5])
+        self.assertEqual(report["errors"][1]["errors"], [f"email: {messages.CONTACT_EMAIL_EXISTS}"])
+        self.assertTrue(any(error.startswith("last_name") for error in report["errors"][0]["errors"]))
+
+    async def test_errors_truncated(self):
+        body = b"[]\n" * 5
+        with patch("src.services.bulk_import.rep_contacts.create_contacts_bulk", AsyncMock()) as bulk:
+            report = await bulk_import.import_contacts(stream(body), "ndjson", self.session, self.user, max_errors=2)
+        bulk.assert_not_awaited()
+        self.assertEqual(report["inserted"], 0)
+        self.assertEqual(report["failed"], 5)
+        self.assertEqual(len(report["errors"]), 2)
+        self.assertTrue(report["errors_truncated"])
@@ -0,0 +1,42 @@
+import unittest
+from src.services.serializers import JSON, MSGPACK
+from src.services.etag import contact_etag, etag_matches, if_match_versions, list_etag, not_modified
+
+
+class TestETag(unittest.TestCase):
+
+    def test_contact_etag(self):
+        self.assertEqual(contact_etag(1, 3), '"1-3"')
+        self.assertNotEqual(contact_etag(1, 3), contact_etag(1, 4))
+        # рiзнi формати тiєї ж версiї - рiзнi сильнi ETag
+        self.assertEqual(contact_etag(1, 3, JSON), '"1-3"')
+        self.assertEqual(contact_etag(1, 3, MSGPACK), '"1-3-mp"')
+        self.assertFalse(etag_matches(contact_etag(1, 3, JSON), contact_etag(1, 3, MSGPACK)))
+
+    def test_if_match_versions(self):
+        self.assertEqual(if_match_versions('"1-3"', 1), [3])
+        self.assertEqual(if_match_versions('"1-3", "1-4"', 1), [3, 4])
+        self.assertEqual(if_match_versions('"1-3-mp", "1-4"', 1), [3, 4])
+        self.assertEqual(if_match_versions('"1-3-xx", "1-3-"', 1), [])
+        # чужий контакт, слабкий та довiльний ETag не збiгаються з жодною версiєю
+        self.assertEqual(if_match_versions('"2-3", W/"1-3", "abc"', 1), [])
+        self.assertIsNone(if_match_versions("*", 1))
+
+    def test_list_etag(self):
+        etag = list_etag(1, "100", "10:id:o:0")
+        self.assertNotEqual(etag, list_etag(1, "101", "10:id:o:0"))
+        self.assertNotEqual(etag, list_etag(1, "100", "10:id:o:10"))
+        self.assertNotEqual(etag, list_etag(2, "100", "10:id:o:0"))
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"a"', '"a"'))
+        self.assertTrue(etag_matches('"b", W/"a"', '"a"'))
+        self.assertTrue(etag_matches("*", '"a"'))
+        self.assertFalse(etag_matches('"b"', '"a"'))
+        self.assertFalse(etag_matches(None, '"a"'))
+
+    def test_not_modified(self):
+        response = not_modified('"a"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], '"a"')
+        self.assertEqual(response.body, b"")
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+import tracemalloc
+import unittest
+from datetime import date, datetime
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.entity.models import Base, Contact, User
+from src.services.export import EXPORT_FIELDS, export_contacts
+
+
+class TestExportContacts(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        async with self.session_maker() as session:
+            self.user = User(username="test_user", email="test@example.com", password="qwerty", confirmed=True)
+            other = User(username="other", email="other@example.com", password="qwerty", confirmed=True)
+            session.add_all([self.user, other])
+            await session.commit()
+            self.other = other
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def fill(self, user: User, start: int, rows: int):
+        async with self.session_maker() as session:
+            await session.execute(insert(Contact), [
+                {"first_name": f"Name{i}", "last_name": "Doe", "email": f"contact{i}@example.com",
+                 "phone_number": f"{i:010d}", "birth_date": date(1990, 5, 17), "created_at": datetime(2024, 1, 1),
+                 "updated_at": datetime(2024, 1, 1), "user_id": user.id} for i in range(start, start + rows)])
+            await session.commit()
+
+    async def export(self, fmt: str, batch_size: int = 1000) -> str:
+        async with self.session_maker() as session:
+            return b"".join([chunk async for chunk in export_contacts(session, self.user, fmt, batch_size)]).decode()
+
+    async def test_ndjson(self):
+        await self.fill(self.user, 0, 3)
+        await self.fill(self.other, 3, 2)
+        rows = [json.loads(line) for line in (await self.export("ndjson", batch_size=2)).splitlines()]
+        self.assertEqual([row["email"] for row in rows], [f"contact{i}@example.com" for i in range(3)])
+        self.assertEqual(tuple(rows[0]), EXPORT_FIELDS)
+        self.assertEqual(rows[0]["birth_date"], "1990-05-17")
+        self.assertEqual(rows[0]["created_at"], "2024-01-01T00:00:00")
+
+    async def test_csv(self):
+        await self.fill(self.user, 0, 2)
+        rows = list(csv.reader(io.StringIO(await self.export("csv"))))
+        self.assertEqual(tuple(rows[0]), EXPORT_FIELDS)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][3], "contact0@example.com")
+
+    async def test_close_early(self):
+        # клiєнт вiдключився пiсля першого чанку: генератор закривається разом з курсором
+        await self.fill(self.user, 0, 10)
+        async with self.session_maker() as session:
+            chunks = export_contacts(session, self.user, "ndjson", batch_size=2)
+            self.assertEqual(len((await anext(chunks)).splitlines()), 2)
+            await chunks.aclose()
+            # сесiя лишається придатною для наступних запитiв
+            self.assertEqual(len((await anext(export_contacts(session, self.user, "ndjson", 5))).splitlines()), 5)
+
+    async def test_memory_flat(self):
+        # пiк пам'ятi експорту не росте з кiлькiстю рядкiв (повний замiр на 1M рядкiв - benchmarks/bench_export.py)
+        peaks = []
+        start = 0
+        for rows in (1_000, 9_000):
+            await self.fill(self.user, start, rows)
+            start += rows
+            tracemalloc.start()
+            size = 0
+            async with self.session_maker() as session:
+                async for chunk in export_contacts(session, self.user, "ndjson", batch_size=100):
+                    size += len(chunk)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            self.assertGreater(size, 0)
+        self.assertLess(peaks[1], peaks[0] * 1.5)
@@ -0,0 +1,83 @@
+import unittest
+
+from fastapi import HTTPException
+
+from src.services import hashing
+from src.services.hashing import HashAdmission, PasswordHasher
+
+
+class TestPasswordHasher(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.hasher = PasswordHasher("thread", 1)
+
+    def tearDown(self):
+        self.hasher.shutdown()
+
+    async def test_hash_and_verify(self):
+        hashed = await self.hasher.hash("12345678")
+        self.assertTrue(hashed.startswith("$2b$"))
+        self.assertTrue(await self.hasher.verify("12345678", hashed))
+        self.assertFalse(await self.hasher.verify("87654321", hashed))
+
+    async def test_compatible_with_sync_hash(self):
+        hashed = hashing.hash_password("12345678")
+        self.assertTrue(await self.hasher.verify("12345678", hashed))
+
+    async def test_shutdown_recreates_executor(self):
+        executor = self.hasher.executor
+        self.hasher.shutdown()
+        self.assertIsNot(self.hasher.executor, executor)
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            PasswordHasher("fiber", 1)
+
+
+class TestHashAdmission(unittest.TestCase):
+
+    def setUp(self):
+        self.admission = HashAdmission(queue_size=3, per_client=2, workers=1)
+
+    def test_queue_full(self):
+        with self.admission.admit("10.0.0.1"), self.admission.admit("10.0.0.2"), self.admission.admit("10.0.0.3"):
+            with self.assertRaises(HTTPException) as err:
+                with self.admission.admit("10.0.0.4"):
+                    pass
+        self.assertEqual(err.exception.status_code, 429)
+        self.assertEqual(err.exception.headers["Retry-After"], "1")
+        self.assertEqual(self.admission.pending, 0)
+        self.assertEqual(self.admission.stats()["rejected"], {"queue": 1})
+
+    def test_per_ip_share(self):
+        with self.admission.admit("10.0.0.1", "a@example.com"), self.admission.admit("10.0.0.1", "b@example.com"):
+            with self.assertRaises(HTTPException):
+                with self.admission.admit("10.0.0.1", "c@example.com"):
+                    pass
+            with self.admission.admit("10.0.0.2", "c@example.com"):
+                self.assertEqual(self.admission.pending, 3)
+        self.assertEqual(self.admission.stats()["rejected"], {"ip": 1})
+        self.assertFalse(self.admission.by_ip)
+
+    def test_per_account_share(self):
+        with self.admission.admit("10.0.0.1", "a@example.com"), self.admission.admit("10.0.0.2", "a@example.com"):
+            with self.assertRaises(HTTPException):
+                with self.admission.admit("10.0.0.3", "a@example.com"):
+                    pass
+        self.assertEqual(self.admission.stats()["rejected"], {"account": 1})
+        self.assertFalse(self.admission.by_account)
+
+    def test_retry_after_grows_with_depth(self):
+        self.admission.service_time = 2.0
+        with self.admission.admit(), self.admission.admit():
+            self.assertEqual(self.admission.retry_after(), 4)
+
+    def test_stats(self):
+        with self.admission.admit():
+            pass
+        self.admission.observe(0.5, 0.3)
+        stats = self.admission.stats()
+        self.assertEqual(stats["depth"], 0)
+        self.assertEqual(stats["admitted"], 1)
+        self.assertEqual(stats["wait_avg_ms"], 500.0)
+        self.assertEqual(stats["rejected_total"], 0)
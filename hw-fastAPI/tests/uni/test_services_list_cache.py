@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import AsyncMock
+
+from redis.exceptions import ConnectionError
+
+from src.services import list_cache
+from src.services.list_cache import bump_list_version, get_page, page_field, set_page
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    async def execute(self):
+        for name, args in self.commands:
+            getattr(self.redis, name)(*args)
+
+
+class FakeRedis:
+    # лише тi команди hash, якi використовує кеш списку контактiв
+    def __init__(self):
+        self.data = {}
+
+    async def hmget(self, key, fields):
+        return [self.data.get(key, {}).get(field) for field in fields]
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = value if isinstance(value, bytes) else str(value).encode()
+
+    def hsetnx(self, key, field, value):
+        if field not in self.data.get(key, {}):
+            self.hset(key, field, value)
+
+    def unlink(self, key):
+        self.data.pop(key, None)
+
+    def expire(self, key, ttl):
+        pass
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class TestListCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        list_cache.list_stats.hits = list_cache.list_stats.misses = 0
+
+    def test_page_field(self):
+        self.assertEqual(page_field(10, 20, None, "id"), "10:id:o:20")
+        # з курсором offset не впливає на ключ
+        self.assertEqual(page_field(10, 20, "abc", "id"), page_field(10, 0, "abc", "id"))
+
+    async def test_miss_then_hit(self):
+        version, body, _ = await get_page(1, "10:id:o:0", redis=self.redis)
+        self.assertIsNone(body)
+        await set_page(1, version, "10:id:o:0", b'[{"id": 1}]', "next", redis=self.redis)
+        self.assertEqual(await get_page(1, "10:id:o:0", redis=self.redis), (version, b'[{"id": 1}]', "next"))
+        self.assertEqual(list_cache.list_cache_stats(), {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    async def test_expired_version_not_reused(self):
+        version, _, _ = await get_page(1, "f", redis=self.redis)
+        await set_page(1, version, "f", b"[]", None, redis=self.redis)
+        self.redis.data.clear()
+        self.assertNotEqual((await get_page(1, "f", redis=self.redis))[0], version)
+
+    async def test_bump_invalidates(self):
+        version, _, _ = await get_page(1, "f", redis=self.redis)
+        await set_page(1, version, "f", b"[]", None, redis=self.redis)
+        await bump_list_version(1, redis=self.redis)
+        new_version, body, _ = await get_page(1, "f", redis=self.redis)
+        self.assertIsNone(body)
+        self.assertNotEqual(new_version, version)
+        # iншi користувачi не зачепленi
+        other_version, _, _ = await get_page(2, "f", redis=self.redis)
+        await set_page(2, other_version, "f", b"[]", None, redis=self.redis)
+        await bump_list_version(1, redis=self.redis)
+        self.assertEqual((await get_page(2, "f", redis=self.redis))[1], b"[]")
+
+    async def test_stale_version_is_miss(self):
+        # запис вiдбувся мiж читанням версiї та збереженням сторiнки
+        version, _, _ = await get_page(1, "f", redis=self.redis)
+        await bump_list_version(1, redis=self.redis)
+        await set_page(1, version, "f", b"[]", None, redis=self.redis)
+        self.assertIsNone((await get_page(1, "f", redis=self.redis))[1])
+
+    async def test_redis_error_is_miss(self):
+        redis = AsyncMock()
+        redis.hmget.side_effect = ConnectionError()
+        self.assertEqual(await get_page(1, "f", redis=redis), ("", None, None))
+        await set_page(1, "", "f", b"[]", None, redis=redis)
+        redis.pipeline.assert_not_called()
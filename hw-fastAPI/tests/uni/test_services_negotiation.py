@@ -0,0 +1,65 @@
+import unittest
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from src.services import negotiation, serializers
+from src.services.negotiation import MsgPackRequest, is_msgpack, preferred_media_type, to_msgpack
+from src.services.serializers import JSON, MSGPACK
+
+
+class TestNegotiation(unittest.IsolatedAsyncioTestCase):
+
+    def test_preferred_media_type(self):
+        self.assertEqual(preferred_media_type(None), JSON)
+        self.assertEqual(preferred_media_type("*/*"), JSON)
+        self.assertEqual(preferred_media_type("application/json"), JSON)
+        self.assertEqual(preferred_media_type("application/msgpack"), MSGPACK)
+        self.assertEqual(preferred_media_type("application/x-msgpack, application/json"), MSGPACK)
+        self.assertEqual(preferred_media_type("application/json, application/msgpack;q=0.5"), JSON)
+        self.assertEqual(preferred_media_type("application/json;q=0.5, application/msgpack"), MSGPACK)
+        self.assertEqual(preferred_media_type("application/msgpack;q=0"), JSON)
+        self.assertEqual(preferred_media_type("application/msgpack;q=abc"), JSON)
+
+    def test_is_msgpack(self):
+        self.assertTrue(is_msgpack("application/msgpack"))
+        self.assertTrue(is_msgpack("Application/X-MsgPack; charset=binary"))
+        self.assertFalse(is_msgpack("application/json"))
+        self.assertFalse(is_msgpack(None))
+
+    async def test_msgpack_request(self):
+        body = serializers.packb({"first_name": "John"})
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        scope = {"type": "http", "method": "POST", "path": "/", "query_string": b"",
+                 "headers": [(b"content-type", b"application/msgpack"), (b"accept", b"*/*")]}
+        request = MsgPackRequest(scope, receive)
+        self.assertEqual(request.headers["content-type"], JSON)
+        self.assertEqual(request.headers["accept"], "*/*")
+        self.assertEqual(await request.json(), {"first_name": "John"})
+
+    def test_to_msgpack(self):
+        # ETag маршрут уже видав для формату MessagePack (contact_etag), to_msgpack його лише переносить
+        response = to_msgpack(JSONResponse({"affected": 2}, status_code=201, headers={"ETag": '"1-2-mp"'}))
+        self.assertEqual(response.media_type, MSGPACK)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.headers["ETag"], '"1-2-mp"')
+        self.assertEqual(serializers.msgpack.unpackb(response.body), {"affected": 2})
+        self.assertEqual(response.headers["content-length"], str(len(response.body)))
+        # без тiла (304) та не JSON вiдповiдi лишаються як є
+        not_modified = Response(status_code=304)
+        self.assertIs(to_msgpack(not_modified), not_modified)
+        csv = Response(b"a,b\n", media_type="text/csv")
+        self.assertIs(to_msgpack(csv), csv)
+
+    def test_serializer_writes_msgpack(self):
+        token = serializers.response_format.set(MSGPACK)
+        try:
+            response = serializers.contacts_serializer.response([])
+        finally:
+            serializers.response_format.reset(token)
+        self.assertEqual(response.media_type, MSGPACK)
+        self.assertEqual(serializers.msgpack.unpackb(response.body), [])
+        self.assertEqual(serializers.contacts_serializer.response([]).body, b"[]")
@@ -0,0 +1,73 @@
+import base64
+import json
+import unittest
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from src.entity.models import Contact
+from src.services.pagination import encode_cursor, decode_cursor, paginate, next_cursor
+
+
+class TestPagination(unittest.TestCase):
+
+    def test_cursor_roundtrip_id(self):
+        cursor = encode_cursor("id", [42])
+        self.assertEqual(decode_cursor(cursor, "id"), [42])
+
+    def test_cursor_roundtrip_created_at(self):
+        created_at = datetime(2024, 1, 2, 3, 4, 5)
+        cursor = encode_cursor("created_at", [created_at, 7])
+        self.assertEqual(decode_cursor(cursor, "created_at"), [created_at, 7])
+
+    def test_cursor_other_sort(self):
+        cursor = encode_cursor("id", [42])
+        with self.assertRaises(HTTPException) as context:
+            decode_cursor(cursor, "created_at")
+        self.assertEqual(context.exception.status_code, 422)
+
+    def test_cursor_damaged(self):
+        with self.assertRaises(HTTPException) as context:
+            decode_cursor("not-a-cursor", "id")
+        self.assertEqual(context.exception.status_code, 422)
+
+    def test_cursor_wrong_types(self):
+        for values in ([{"a": 1}], ["1"], [True], [None], [1.5]):
+            cursor = base64.urlsafe_b64encode(json.dumps({"s": "id", "v": values}).encode()).decode()
+            with self.assertRaises(HTTPException) as context:
+                decode_cursor(cursor, "id")
+            self.assertEqual(context.exception.status_code, 422)
+        for values in ([{"a": 1}, 1], ["2024-01-02", "1"], [5, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps({"s": "created_at", "v": values}).encode()).decode()
+            with self.assertRaises(HTTPException):
+                decode_cursor(cursor, "created_at")
+        cursor = base64.urlsafe_b64encode(json.dumps({"s": "id", "v": {"a": 1}}).encode()).decode()
+        with self.assertRaises(HTTPException):
+            decode_cursor(cursor, "id")
+
+    def test_cursor_null_created_at(self):
+        contacts = [Contact(id=i, created_at=None) for i in range(1, 11)]
+        cursor = next_cursor(contacts, 10, "created_at")
+        self.assertEqual(decode_cursor(cursor, "created_at"), [None, 10])
+        statement = str(paginate(select(Contact), limit=10, offset=0, cursor=cursor, sort="created_at"))
+        self.assertIn("contacts.created_at IS NULL AND contacts.id >", statement)
+        self.assertIn("ORDER BY contacts.created_at ASC NULLS LAST, contacts.id", statement)
+
+    def test_paginate_offset(self):
+        statement = str(paginate(select(Contact), limit=10, offset=20))
+        self.assertIn("ORDER BY contacts.id", statement)
+        self.assertIn("OFFSET", statement)
+
+    def test_paginate_cursor(self):
+        statement = str(paginate(select(Contact), limit=10, offset=20, cursor=encode_cursor("id", [42])))
+        self.assertIn("contacts.id >", statement)
+        self.assertNotIn("OFFSET", statement)
+
+    def test_next_cursor(self):
+        contacts = [Contact(id=i) for i in range(1, 11)]
+        self.assertEqual(decode_cursor(next_cursor(contacts, 10), "id"), [10])
+
+    def test_next_cursor_last_page(self):
+        contacts = [Contact(id=i) for i in range(1, 5)]
+        self.assertIsNone(next_cursor(contacts, 10))
@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+
+from src.services.rate_limit import LocalLimits, RateLimiter, RedisRateLimiter, APPROXIMATE, STRICT
+
+
+def pipeline_redis(totals: list):
+    pipe = MagicMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=False)
+    pipe.execute = AsyncMock(return_value=[value for total in totals for value in (total, True)])
+    redis = MagicMock()
+    redis.pipeline.return_value = pipe
+    return redis, pipe
+
+
+class TestLocalLimits(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.limits = LocalLimits(prefix="test")
+
+    def test_hit_burst_then_wait(self):
+        for _ in range(3):
+            self.assertEqual(self.limits.hit("ip:/path:GET", 3, 60000, now=1000), 0)
+        # наступний запит дозволено, коли вiдновиться одна третина перiоду
+        self.assertEqual(self.limits.hit("ip:/path:GET", 3, 60000, now=1000), 20000)
+        self.assertEqual(self.limits.hit("ip:/path:GET", 3, 60000, now=21000), 0)
+        self.assertEqual(self.limits.hit("other:/path:GET", 3, 60000, now=1000), 0)
+
+    def test_hit_zero_times(self):
+        self.assertEqual(self.limits.hit("ip:/path:GET", 0, 60000, now=1000), 60000)
+
+    async def test_sync_writes_pending(self):
+        self.limits.hit("ip:/path:GET", 3, 60000, now=1000)
+        self.limits.hit("ip:/path:GET", 3, 60000, now=1000)
+        redis, pipe = pipeline_redis([2])
+        with patch("src.services.rate_limit.time.monotonic", return_value=1), \
+                patch("src.services.rate_limit.time.time", return_value=120):
+            await self.limits.sync(redis)
+        pipe.incrby.assert_called_once_with("test:ip:/path:GET:2", 2)
+        pipe.pexpire.assert_called_once_with("test:ip:/path:GET:2", 120000)
+        self.assertEqual(self.limits.buckets["ip:/path:GET"].pending, 0)
+        # свої запити вже врахованi локально, тож лiмiт не змiнився
+        self.assertEqual(self.limits.hit("ip:/path:GET", 3, 60000, now=1000), 0)
+
+    async def test_sync_charges_other_workers(self):
+        self.limits.hit("ip:/path:GET", 3, 60000, now=1000)
+        redis, _ = pipeline_redis([3])
+        with patch("src.services.rate_limit.time.monotonic", return_value=1):
+            await self.limits.sync(redis)
+        # два запити iнших воркерiв вичерпали лiмiт
+        self.assertEqual(self.limits.hit("ip:/path:GET", 3, 60000, now=1000), 20000)
+
+    async def test_sync_keeps_pending_on_error(self):
+        self.limits.hit("ip:/path:GET", 3, 60000, now=1000)
+        redis, pipe = pipeline_redis([])
+        pipe.execute.side_effect = RedisError("down")
+        with self.assertRaises(RedisError):
+            await self.limits.sync(redis)
+        self.assertEqual(self.limits.buckets["ip:/path:GET"].pending, 1)
+
+    def test_prune(self):
+        self.limits.hit("ip:/path:GET", 3, 60000, now=1000)
+        self.limits.buckets["ip:/path:GET"].pending = 0
+        self.limits.prune(now=1000)
+        self.assertEqual(len(self.limits), 1)
+        self.limits.prune(now=21000)
+        self.assertEqual(len(self.limits), 0)
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.request = MagicMock(method="GET")
+        self.identifier = AsyncMock(return_value="127.0.0.1:/api/contacts/")
+        self.callback = AsyncMock(side_effect=HTTPException(status_code=429))
+
+    async def test_approximate(self):
+        limits = LocalLimits()
+        limiter = RateLimiter(times=1, seconds=20, identifier=self.identifier, callback=self.callback, mode=APPROXIMATE)
+        with patch("src.services.rate_limit.local_limits", limits):
+            await limiter(self.request, MagicMock())
+            with self.assertRaises(HTTPException):
+                await limiter(self.request, MagicMock())
+        self.assertEqual(list(limits.buckets), ["127.0.0.1:/api/contacts/:GET"])
+        self.callback.assert_awaited_once()
+
+    async def test_strict(self):
+        limiter = RateLimiter(times=1, seconds=20, mode=STRICT)
+        with patch.object(RedisRateLimiter, "__call__", AsyncMock()) as redis_call:
+            await limiter(self.request, "response")
+        redis_call.assert_awaited_once_with(self.request, "response")
@@ -0,0 +1,24 @@
+import unittest
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.services.search import search_statement
+
+
+class TestSearch(unittest.TestCase):
+
+    def test_search_postgresql_ranked(self):
+        statement = str(search_statement(["first_name", "email"], "ohn", "postgresql")
+                        .compile(dialect=postgresql.dialect()))
+        self.assertIn("contacts.first_name ILIKE", statement)
+        self.assertIn("ORDER BY greatest(similarity(contacts.first_name", statement)
+
+    def test_search_sqlite_fts(self):
+        statement = search_statement(["last_name"], 'wa"m', "sqlite").compile(dialect=sqlite.dialect())
+        self.assertIn("contacts_fts.contacts_fts MATCH", str(statement))
+        self.assertIn('{last_name} : "wa""m"', statement.params.values())
+
+    def test_search_short_query_fallback(self):
+        statement = str(search_statement(["email"], "jo", "sqlite").compile(dialect=sqlite.dialect()))
+        self.assertNotIn("contacts_fts", statement)
+        self.assertIn("lower(contacts.email) LIKE lower(?)", statement)
@@ -0,0 +1,90 @@
+import unittest
+from collections import namedtuple
+from datetime import date, datetime
+from unittest.mock import patch
+
+from pydantic import BaseModel, TypeAdapter
+
+from src.entity.models import Contact
+from src.repository.contacts import RESPONSE_COLUMNS
+from src.schemas.contact import ContactResponseSchema
+from src.services import serializers
+from src.services.serializers import ModelSerializer, contacts_serializer
+
+
+class Row:
+    # рядок з RESPONSE_COLUMNS: атрибути за назвами колонок
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+class TestSerializers(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [Row(id=1, first_name="John", last_name="Doe", email="john.doe@example.com",
+                         phone_number="1234567890", birth_date=date(1990, 1, 1), crm_status="operational",
+                         created_at=datetime(2024, 1, 2, 3, 4, 5), updated_at=datetime(2024, 1, 2, 3, 4, 5, 678),
+                         version=3),
+                     Row(id=2, first_name="Jane", last_name="Roe", email="jane.roe@example.com",
+                         phone_number="0987654321", birth_date=date(1991, 2, 28), crm_status="analitic",
+                         created_at=None, updated_at=None, version=1)]
+
+    def test_dump_matches_response_model(self):
+        adapter = TypeAdapter(list[ContactResponseSchema])
+        expected = adapter.dump_json(adapter.validate_python(self.rows, from_attributes=True))
+        self.assertEqual(contacts_serializer.dump(self.rows), expected)
+        # без orjson байти тi самi
+        with patch.object(serializers, "orjson", None):
+            self.assertEqual(contacts_serializer.dump(self.rows), expected)
+
+    def test_dumps_loads_both_branches(self):
+        value = {"id": 1, "birth_date": date(1990, 1, 1), "created_at": datetime(2024, 1, 2, 3, 4, 5, 678),
+                 "name": "Олена"}
+        encoded = serializers.dumps(value)
+        self.assertIsNotNone(serializers.orjson)
+        with patch.object(serializers, "orjson", None):
+            self.assertEqual(serializers.dumps(value), encoded)
+            fallback = serializers.loads(encoded)
+        self.assertEqual(serializers.loads(encoded), fallback)
+        self.assertEqual(fallback["created_at"], "2024-01-02T03:04:05.000678")
+
+    def test_packb_both_branches(self):
+        value = [{"id": 1, "birth_date": date(1990, 1, 1), "created_at": datetime(2024, 1, 2, 3, 4, 5)}]
+        packed = serializers.packb(value)
+        with patch.object(serializers, "orjson", None):
+            self.assertEqual(serializers.packb(value), packed)
+        self.assertEqual(serializers.msgpack.unpackb(packed),
+                         [{"id": 1, "birth_date": "1990-01-01", "created_at": "2024-01-02T03:04:05"}])
+
+    def test_dump_positional_rows(self):
+        # Row з SQLAlchemy, як i namedtuple, має _fields: значення беруться за позицiями колонок
+        columns = ("version",) + tuple(reversed(contacts_serializer.fields))
+        Positional = namedtuple("Positional", columns)
+        rows = [Positional(**row.__dict__) for row in self.rows]
+        self.assertEqual(contacts_serializer.dump(rows), contacts_serializer.dump(self.rows))
+        self.assertEqual(contacts_serializer.to_dict(rows[0])["email"], "john.doe@example.com")
+
+    def test_dump_skips_extra_attributes(self):
+        self.assertNotIn(b"version", contacts_serializer.dump(self.rows))
+        self.assertEqual(contacts_serializer.dump([]), b"[]")
+
+    def test_dump_orm_object(self):
+        contact = Contact(id=1, first_name="John", last_name="Doe", email="john.doe@example.com",
+                          phone_number="1234567890", birth_date=date(1990, 1, 1), crm_status="operational")
+        self.assertIn(b'"birth_date":"1990-01-01"', contacts_serializer.dump([contact]))
+
+    def test_response_columns_cover_schema(self):
+        self.assertTrue(set(ContactResponseSchema.model_fields) <= {column.key for column in RESPONSE_COLUMNS})
+
+    def test_single_field_schema(self):
+        class IdSchema(BaseModel):
+            id: int
+
+        self.assertEqual(ModelSerializer(IdSchema).dump(self.rows), b'[{"id":1},{"id":2}]')
+
+    def test_response(self):
+        response = contacts_serializer.response(self.rows, {"X-Next-Cursor": "abc"})
+        self.assertEqual(response.media_type, "application/json")
+        self.assertEqual(response.headers["X-Next-Cursor"], "abc")
+        self.assertEqual(response.body, contacts_serializer.dump(self.rows))
+
@@ -0,0 +1,106 @@
+import json
+import re
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+
+from src.routes.users import put_banned_user_agents
+from src.schemas.user import UserAgentBanSchema
+from src.services import user_agents
+from src.services.middleware import UserAgentBanMiddleware
+from src.services.user_agents import UserAgentFilter, save_patterns, watch_user_agents
+
+
+class TestUserAgentFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.filter = UserAgentFilter([r"yandexbot", r"yandex-bot", r"curl/\d"], cache_size=2)
+
+    def test_contains(self):
+        self.assertIn("Mozilla/5.0 (compatible; YandexBot/3.0)", self.filter)
+        self.assertIn("curl/8.1.2", self.filter)
+        self.assertNotIn("curl", self.filter)
+        self.assertNotIn("Mozilla/5.0 (X11; Linux x86_64)", self.filter)
+        self.assertNotIn("", self.filter)
+
+    def test_cache(self):
+        self.assertIn("YandexBot", self.filter)
+        self.assertIn("YandexBot", self.filter)
+        self.assertNotIn("Firefox", self.filter)
+        self.assertNotIn("Chrome", self.filter)
+        self.assertEqual(self.filter.stats(), {"hits": 1, "misses": 3, "hit_ratio": 0.25, "size": 2})
+
+    def test_load(self):
+        self.assertIn("YandexBot", self.filter)
+        self.filter.load(["firefox"])
+        self.assertNotIn("YandexBot", self.filter)
+        self.assertIn("Firefox", self.filter)
+        self.assertEqual(self.filter.patterns, ["firefox"])
+        self.filter.load([])
+        self.assertNotIn("Firefox", self.filter)
+
+
+class TestRuntimePatterns(unittest.IsolatedAsyncioTestCase):
+
+    async def test_save_patterns(self):
+        redis = AsyncMock()
+        ua_filter = UserAgentFilter(["yandexbot"])
+        with patch.object(user_agents, "user_agent_filter", ua_filter):
+            await save_patterns(["googlebot"], redis, "key")
+        self.assertIn("Googlebot/2.1", ua_filter)
+        redis.set.assert_awaited_once_with("key", json.dumps(["googlebot"]))
+
+    async def test_save_patterns_redis_error(self):
+        redis = AsyncMock()
+        redis.set.side_effect = RedisError("down")
+        ua_filter = UserAgentFilter(["yandexbot"])
+        with patch.object(user_agents, "user_agent_filter", ua_filter):
+            with self.assertRaises(RedisError):
+                await save_patterns(["googlebot"], redis, "key")
+            # кожен шаблон коректний, разом - нi: до Redis справа не доходить
+            with self.assertRaises(re.error):
+                await save_patterns(["bot", "(?i)crawler"], redis, "key")
+        self.assertEqual(redis.set.await_count, 1)
+        self.assertEqual(ua_filter.patterns, ["yandexbot"])
+
+    async def test_put_banned_user_agents_redis_error(self):
+        with patch("src.routes.users.save_patterns", AsyncMock(side_effect=RedisError("down"))):
+            with self.assertRaises(HTTPException) as err:
+                await put_banned_user_agents(UserAgentBanSchema(patterns=["googlebot"]))
+        self.assertEqual(err.exception.status_code, 503)
+
+    async def test_watch_user_agents(self):
+        redis = AsyncMock()
+        redis.get.side_effect = [None, json.dumps(["googlebot"])]
+        ua_filter = UserAgentFilter(["yandexbot"])
+        with patch.object(user_agents, "user_agent_filter", ua_filter), \
+                patch("src.services.user_agents.asyncio.sleep", AsyncMock(side_effect=[None, StopAsyncIteration])):
+            with self.assertRaises(StopAsyncIteration):
+                await watch_user_agents(1, redis, "key")
+        self.assertEqual(ua_filter.patterns, ["googlebot"])
+
+
+class TestUserAgentBanMiddleware(unittest.IsolatedAsyncioTestCase):
+
+    async def call(self, headers: list) -> tuple[AsyncMock, list]:
+        app, sent = AsyncMock(), []
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = UserAgentBanMiddleware(app, UserAgentFilter(["yandexbot"]))
+        await middleware({"type": "http", "headers": headers}, AsyncMock(), send)
+        return app, sent
+
+    async def test_banned(self):
+        app, sent = await self.call([(b"host", b"test"), (b"user-agent", b"YandexBot/3.0")])
+        app.assert_not_awaited()
+        self.assertEqual(sent[0]["status"], 403)
+
+    async def test_allowed(self):
+        app, sent = await self.call([(b"user-agent", b"Mozilla/5.0")])
+        app.assert_awaited_once()
+        app, sent = await self.call([])
+        app.assert_awaited_once()
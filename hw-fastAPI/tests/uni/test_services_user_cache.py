@@ -0,0 +1,49 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from src.services import user_cache
+from src.services.user_cache import TTLCache, invalidate_user, local_users, INVALIDATION_CHANNEL
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_ttl_expired(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        with patch("src.services.user_cache.time.monotonic", return_value=1000):
+            cache.set("a", 1)
+        with patch("src.services.user_cache.time.monotonic", return_value=1061):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_stats(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        self.assertEqual(cache.stats.as_dict(), {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+
+class TestInvalidateUser(unittest.IsolatedAsyncioTestCase):
+
+    async def test_invalidate_user(self):
+        redis = AsyncMock()
+        local_users.set("user@gmail.com", b"user")
+        await invalidate_user("user@gmail.com", redis)
+        self.assertIsNone(local_users.get("user@gmail.com"))
+        redis.delete.assert_awaited_once_with("user@gmail.com")
+        redis.publish.assert_awaited_once_with(INVALIDATION_CHANNEL, "user@gmail.com")
+
+    def test_user_cache_stats(self):
+        stats = user_cache.user_cache_stats()
+        self.assertIn("hit_ratio", stats["local"])
+        self.assertIn("hit_ratio", stats["redis"])
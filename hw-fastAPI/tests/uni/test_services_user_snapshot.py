@@ -0,0 +1,49 @@
+import pickle
+import unittest
+
+from src.entity.models import Role, User
+from src.schemas.user import UserResponseSchema
+from src.services import user_snapshot
+from src.services.user_snapshot import UserSnapshot
+
+
+class TestUserSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.user = User(id=7, username="deadpool", email="deadpool@example.com", password="123qwerty",
+                         role=Role.moderator, avatar="127.0.0.1://my_avatar.jpg", confirmed=True)
+
+    def test_roundtrip(self):
+        snapshot = user_snapshot.loads(user_snapshot.dumps(self.user))
+        self.assertEqual(snapshot, UserSnapshot.from_user(self.user))
+        self.assertEqual(snapshot.role, Role.moderator)
+        self.assertTrue(snapshot.confirmed)
+
+    def test_roundtrip_no_avatar(self):
+        self.user.avatar = None
+        snapshot = user_snapshot.loads(user_snapshot.dumps(self.user))
+        self.assertIsNone(snapshot.avatar)
+
+    def test_role_as_string(self):
+        self.user.role = "admin"
+        self.assertEqual(UserSnapshot.from_user(self.user).role, Role.admin)
+
+    def test_read_only(self):
+        snapshot = UserSnapshot.from_user(self.user)
+        with self.assertRaises(AttributeError):
+            snapshot.role = Role.admin
+        with self.assertRaises(AttributeError):
+            snapshot.password = "secret"
+
+    def test_other_version_is_miss(self):
+        payload = bytearray(user_snapshot.dumps(self.user))
+        payload[0] = user_snapshot.SNAPSHOT_VERSION + 1
+        self.assertIsNone(user_snapshot.loads(bytes(payload)))
+        self.assertIsNone(user_snapshot.loads(pickle.dumps(self.user)))
+        self.assertIsNone(user_snapshot.loads(b"\x01"))
+
+    def test_response_schema(self):
+        snapshot = UserSnapshot.from_user(self.user)
+        response = UserResponseSchema.model_validate(snapshot)
+        self.assertEqual(response.email, self.user.email)
+        self.assertEqual(response.role, Role.moderator)